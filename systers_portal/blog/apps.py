@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class BlogConfig(AppConfig):
+    name = 'blog'
+
+    def ready(self):
+        import blog.signals  # noqa # pylint: disable=unused-variable
@@ -0,0 +1,12 @@
+# number of the most recently modified posts listed in a feed
+FEED_ITEMS = 20
+
+# cached feeds are rebuilt after a News or Resource is saved or deleted, the timeout only bounds
+# the memory used by feeds nobody polls anymore. A cache local to each worker process keeps them
+# at most LOCAL_CACHE_TIMEOUT seconds instead, see common.cache.get_cache_timeout.
+FEED_CACHE_KEY = "blog:feed:{0}:{1}"
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+FEED_GENERATION_CACHE_KEY = "blog:feed:generation"
+
+# seconds feed readers and proxies may reuse a feed without revalidating it
+FEED_MAX_AGE = 300
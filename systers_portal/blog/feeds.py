@@ -0,0 +1,132 @@
+import calendar
+import datetime
+import hashlib
+import time
+
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import parse_http_date_safe
+
+from blog.constants import (FEED_ITEMS, FEED_CACHE_KEY, FEED_CACHE_TIMEOUT,
+                            FEED_GENERATION_CACHE_KEY)
+from blog.models import News, Resource
+from common.cache import bump_generation, get_cache_timeout, get_generation
+from community.models import Community
+
+
+def _date_to_datetime(date):
+    return datetime.datetime.combine(date, datetime.time.min, tzinfo=datetime.timezone.utc)
+
+
+class PostFeed(Feed):
+    """RSS feed of the most recently modified public posts of a community, or of all the
+    communities when no community slug is given"""
+    model = None
+    post_type = None
+    list_url_name = None
+
+    def get_object(self, request, slug=None):
+        if slug is None:
+            return None
+        return get_object_or_404(Community, slug=slug)
+
+    def title(self, obj):
+        if obj is None:
+            return "Systers {0}".format(self.post_type)
+        return "{0} {1}".format(obj.name, self.post_type)
+
+    def link(self, obj):
+        if obj is None:
+            return reverse('index')
+        return reverse(self.list_url_name, kwargs={'slug': obj.slug})
+
+    def description(self, obj):
+        if obj is None:
+            return "Latest {0} of the Systers communities".format(self.post_type.lower())
+        return "Latest {0} of the {1} community".format(self.post_type.lower(), obj.name)
+
+    def items(self, obj):
+        posts = self.model.objects.filter(is_public=True)
+        if obj is not None:
+            posts = posts.filter(community=obj)
+        return posts.select_related('community', 'author__user').prefetch_related(
+            'tags').order_by('-date_modified', '-pk')[:FEED_ITEMS]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.content
+
+    def item_author_name(self, item):
+        return str(item.author)
+
+    def item_pubdate(self, item):
+        return _date_to_datetime(item.date_created)
+
+    def item_updateddate(self, item):
+        return _date_to_datetime(item.date_modified)
+
+    def item_categories(self, item):
+        return [item.community.name] + [tag.name for tag in item.tags.all()]
+
+
+class NewsFeed(PostFeed):
+    model = News
+    post_type = "News"
+    list_url_name = 'view_community_news_list'
+
+
+class ResourceFeed(PostFeed):
+    model = Resource
+    post_type = "Resources"
+    list_url_name = 'view_community_resource_list'
+
+
+class AtomNewsFeed(NewsFeed):
+    feed_type = Atom1Feed
+    subtitle = NewsFeed.description
+
+
+class AtomResourceFeed(ResourceFeed):
+    feed_type = Atom1Feed
+    subtitle = ResourceFeed.description
+
+
+def get_cached_feed(feed, request, **kwargs):
+    """Render a feed, or get it from the cache if no post was saved or deleted since it was
+    rendered. The feed is cached per URL.
+
+    :param feed: Feed object
+    :param request: HttpRequest object
+    :param kwargs: keyword arguments of the feed URL
+    :return: dict with the content, content type, ETag and Last-Modified timestamp of the feed
+    :raises Http404: if the community of the feed does not exist
+    """
+    url = request.build_absolute_uri(request.path)
+    key = FEED_CACHE_KEY.format(get_generation(FEED_GENERATION_CACHE_KEY),
+                                hashlib.md5(url.encode('utf-8')).hexdigest())
+    data = cache.get(key)
+    if data is not None:
+        return data
+
+    response = feed(request, **kwargs)
+    last_modified = parse_http_date_safe(response.get('Last-Modified', ''))
+    # date_modified is a date, a feed updated today is only known to be modified by now
+    today = calendar.timegm(timezone.now().date().timetuple())
+    if last_modified is None or last_modified >= today:
+        last_modified = int(time.time())
+    data = {'content': response.content, 'content_type': response['Content-Type'],
+            'etag': '"{0}"'.format(hashlib.md5(response.content).hexdigest()),
+            'last_modified': last_modified}
+    cache.set(key, data, get_cache_timeout(FEED_CACHE_TIMEOUT))
+    return data
+
+
+def clear_feed_cache():
+    """Invalidate all the cached feeds"""
+    bump_generation(FEED_GENERATION_CACHE_KEY)
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from blog.feeds import clear_feed_cache
+from blog.models import News, Resource
+
+
+@receiver(post_save, sender=News, dispatch_uid="clear_feed_cache_on_news_save")
+@receiver(post_delete, sender=News, dispatch_uid="clear_feed_cache_on_news_delete")
+@receiver(m2m_changed, sender=News.tags.through, dispatch_uid="clear_feed_cache_on_news_tags")
+@receiver(post_save, sender=Resource, dispatch_uid="clear_feed_cache_on_resource_save")
+@receiver(post_delete, sender=Resource, dispatch_uid="clear_feed_cache_on_resource_delete")
+@receiver(m2m_changed, sender=Resource.tags.through,
+          dispatch_uid="clear_feed_cache_on_resource_tags")
+@receiver(post_save, sender='community.Community',
+          dispatch_uid="clear_feed_cache_on_community_save")
+def clear_feeds(sender, instance, **kwargs):
+    """Invalidate the cached feeds, which list the posts with their community and tags"""
+    clear_feed_cache()
@@ -0,0 +1,107 @@
+from cities_light.models import Country, City
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from blog.models import News, Resource, Tag
+from community.models import Community
+from users.models import SystersUser
+
+
+class PostFeedViewTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='foo', password='foobar')
+        self.systers_user = SystersUser.objects.get(user=self.user)
+        country = Country.objects.create(name='Bar', continent='AS')
+        location = City.objects.create(name='Foo', display_name='Foo', country=country)
+        self.community = Community.objects.create(name="Foo", slug="foo", order=1,
+                                                  location=location,
+                                                  admin=self.systers_user)
+        self.other_community = Community.objects.create(name="Bar", slug="bar", order=2,
+                                                        location=location,
+                                                        admin=self.systers_user)
+        self.news = News.objects.create(slug="foo-news", title="Foo News",
+                                        author=self.systers_user, content="<p>Hi there!</p>",
+                                        community=self.community)
+        News.objects.create(slug="bar-news", title="Bar News", author=self.systers_user,
+                            content="Hello", community=self.other_community)
+        News.objects.create(slug="private", title="Private News", author=self.systers_user,
+                            content="Secret", community=self.community, is_public=False)
+        Resource.objects.create(slug="foo-resource", title="Foo Resource",
+                                author=self.systers_user, content="Read me",
+                                community=self.community)
+
+    def test_community_news_feed(self):
+        """Test the RSS feed of the public news of a community"""
+        url = reverse('community_news_rss_feed', kwargs={'slug': 'foo'})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/rss+xml; charset=utf-8')
+        self.assertIn('public', response['Cache-Control'])
+        content = response.content.decode('utf-8')
+        self.assertIn('<title>Foo News</title>', content)
+        self.assertIn('http://example.com/community/foo/news/foo-news/', content)
+        self.assertIn('&lt;p&gt;Hi there!&lt;/p&gt;', content)
+        self.assertNotIn('Bar News', content)
+        self.assertNotIn('Private News', content)
+        self.assertNotIn('Foo Resource', content)
+
+        response = self.client.get(reverse('community_news_rss_feed', kwargs={'slug': 'baz'}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_site_feeds(self):
+        """Test the RSS and Atom feeds of the posts of all the communities"""
+        response = self.client.get(reverse('news_atom_feed'))
+        self.assertEqual(response['Content-Type'], 'application/atom+xml; charset=utf-8')
+        content = response.content.decode('utf-8')
+        self.assertIn('Foo News', content)
+        self.assertIn('Bar News', content)
+        self.assertNotIn('Private News', content)
+        response = self.client.get(reverse('resource_rss_feed'))
+        content = response.content.decode('utf-8')
+        self.assertIn('Foo Resource', content)
+        self.assertNotIn('Foo News', content)
+        response = self.client.get(reverse('community_resource_atom_feed',
+                                           kwargs={'slug': 'bar'}))
+        self.assertNotIn('Foo Resource', response.content.decode('utf-8'))
+
+    def test_feed_cache(self):
+        """Test that feeds are served from the cache until a post is saved or deleted"""
+        url = reverse('community_news_rss_feed', kwargs={'slug': 'foo'})
+        response = self.client.get(url)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response['ETag'], etag)
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+        self.news.title = "Renamed News"
+        self.news.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Renamed News', response.content.decode('utf-8'))
+        etag = response['ETag']
+
+        self.news.tags.add(Tag.objects.create(name="Baz"))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertIn('<category>Baz</category>', response.content.decode('utf-8'))
+        etag = response['ETag']
+
+        self.news.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Renamed News', response.content.decode('utf-8'))
+
+    def test_news_list_feed_links(self):
+        """Test that the news list advertises the feeds of the community"""
+        response = self.client.get(reverse('view_community_news_list', kwargs={'slug': 'foo'}))
+        self.assertContains(response, reverse('community_news_rss_feed',
+                                              kwargs={'slug': 'foo'}))
+        self.assertContains(response, reverse('community_news_atom_feed',
+                                              kwargs={'slug': 'foo'}))
@@ -1,14 +1,29 @@
 from django.conf.urls import url
 
+from blog.feeds import NewsFeed, ResourceFeed, AtomNewsFeed, AtomResourceFeed
 from blog.views import (CommunityNewsListView, CommunityNewsView,
                         AddCommunityNewsView, EditCommunityNewsView,
                         DeleteCommunityNewsView, CommunityResourceListView,
                         CommunityResourceView, AddCommunityResourceView,
                         EditCommunityResourcesView,
                         DeleteCommunityResourceView, AddTagView,
-                        AddResourceTypeView)
+                        AddResourceTypeView, PostFeedView)
 
 urlpatterns = [
+    url(r'^news/rss\.xml$', PostFeedView.as_view(feed=NewsFeed()), name="news_rss_feed"),
+    url(r'^news/atom\.xml$', PostFeedView.as_view(feed=AtomNewsFeed()), name="news_atom_feed"),
+    url(r'^resources/rss\.xml$', PostFeedView.as_view(feed=ResourceFeed()),
+        name="resource_rss_feed"),
+    url(r'^resources/atom\.xml$', PostFeedView.as_view(feed=AtomResourceFeed()),
+        name="resource_atom_feed"),
+    url(r'^(?P<slug>[\w-]+)/news/rss\.xml$', PostFeedView.as_view(feed=NewsFeed()),
+        name="community_news_rss_feed"),
+    url(r'^(?P<slug>[\w-]+)/news/atom\.xml$', PostFeedView.as_view(feed=AtomNewsFeed()),
+        name="community_news_atom_feed"),
+    url(r'^(?P<slug>[\w-]+)/resources/rss\.xml$', PostFeedView.as_view(feed=ResourceFeed()),
+        name="community_resource_rss_feed"),
+    url(r'^(?P<slug>[\w-]+)/resources/atom\.xml$',
+        PostFeedView.as_view(feed=AtomResourceFeed()), name="community_resource_atom_feed"),
     url(r'^(?P<slug>[\w-]+)/news/$', CommunityNewsListView.as_view(),
         name="view_community_news_list"),
     url(r'^(?P<slug>[\w-]+)/news/add/$', AddCommunityNewsView.as_view(),
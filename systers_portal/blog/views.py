@@ -1,20 +1,25 @@
+from django.http import HttpResponse
 from django.urls import reverse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from django.views.generic import (ListView, DetailView, CreateView, UpdateView,
-                                  DeleteView)
+                                  DeleteView, View)
 from django.views.generic.detail import SingleObjectMixin
 from braces.views import LoginRequiredMixin, PermissionRequiredMixin
 
-from common.mixins import UserDetailsMixin
+from common.mixins import UserDetailsMixin, IdentityMapMixin, CommunityObjectMixin
 from community.mixins import CommunityMenuMixin
 from community.models import Community
+from blog.constants import FEED_MAX_AGE
+from blog.feeds import get_cached_feed
 from blog.forms import (AddNewsForm, EditNewsForm, AddResourceForm,
                         EditResourceForm, TagForm, ResourceTypeForm)
 from blog.mixins import ResourceTypesMixin
 from blog.models import News, Resource, ResourceType, Tag
 
 
-class CommunityNewsListView(UserDetailsMixin, CommunityMenuMixin,
+class CommunityNewsListView(CommunityObjectMixin, UserDetailsMixin, CommunityMenuMixin,
                             SingleObjectMixin, ListView):
     """List of Community news view"""
     template_name = "blog/post_list.html"
@@ -44,7 +49,7 @@ class CommunityNewsListView(UserDetailsMixin, CommunityMenuMixin,
         return self.object
 
 
-class CommunityNewsView(UserDetailsMixin, CommunityMenuMixin, DetailView):
+class CommunityNewsView(CommunityObjectMixin, UserDetailsMixin, CommunityMenuMixin, DetailView):
     """Single News Community view"""
     template_name = "blog/post.html"
     model = Community
@@ -71,7 +76,7 @@ class CommunityNewsView(UserDetailsMixin, CommunityMenuMixin, DetailView):
         return self.object
 
 
-class AddCommunityNewsView(LoginRequiredMixin, PermissionRequiredMixin,
+class AddCommunityNewsView(IdentityMapMixin, LoginRequiredMixin, PermissionRequiredMixin,
                            CreateView):
     """Add News to a Community view"""
     template_name = "common/add_post.html"
@@ -107,11 +112,11 @@ class AddCommunityNewsView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to add new community
         news. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
+        self.community = self.get_url_community()
         return request.user.has_perm("add_community_news", self.community)
 
 
-class EditCommunityNewsView(LoginRequiredMixin, PermissionRequiredMixin,
+class EditCommunityNewsView(IdentityMapMixin, LoginRequiredMixin, PermissionRequiredMixin,
                             UpdateView):
     """Edit existing Community News view"""
     template_name = "common/edit_post.html"
@@ -137,11 +142,11 @@ class EditCommunityNewsView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to edit community
         news. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
+        self.community = self.get_url_community()
         return request.user.has_perm("change_community_news", self.community)
 
 
-class DeleteCommunityNewsView(LoginRequiredMixin, PermissionRequiredMixin,
+class DeleteCommunityNewsView(IdentityMapMixin, LoginRequiredMixin, PermissionRequiredMixin,
                               DeleteView):
     """Delete existing Community News view"""
     template_name = "common/post_confirm_delete.html"
@@ -167,11 +172,11 @@ class DeleteCommunityNewsView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to delete community
         news. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
+        self.community = self.get_url_community()
         return request.user.has_perm("delete_community_news", self.community)
 
 
-class CommunityResourceListView(UserDetailsMixin, CommunityMenuMixin,
+class CommunityResourceListView(CommunityObjectMixin, UserDetailsMixin, CommunityMenuMixin,
                                 ResourceTypesMixin, SingleObjectMixin,
                                 ListView):
     """List of Community resources view"""
@@ -212,7 +217,7 @@ class CommunityResourceListView(UserDetailsMixin, CommunityMenuMixin,
         return self.object
 
 
-class CommunityResourceView(UserDetailsMixin, CommunityMenuMixin, DetailView):
+class CommunityResourceView(CommunityObjectMixin, UserDetailsMixin, CommunityMenuMixin, DetailView):
     """Resource Community view"""
     template_name = "blog/post.html"
     model = Community
@@ -239,7 +244,7 @@ class CommunityResourceView(UserDetailsMixin, CommunityMenuMixin, DetailView):
         return self.object
 
 
-class AddCommunityResourceView(LoginRequiredMixin, PermissionRequiredMixin,
+class AddCommunityResourceView(IdentityMapMixin, LoginRequiredMixin, PermissionRequiredMixin,
                                CreateView):
     """Add News to a Community view"""
     template_name = "common/add_post.html"
@@ -275,11 +280,11 @@ class AddCommunityResourceView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to add new community
         resource. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
+        self.community = self.get_url_community()
         return request.user.has_perm("add_community_resource", self.community)
 
 
-class EditCommunityResourcesView(LoginRequiredMixin, PermissionRequiredMixin,
+class EditCommunityResourcesView(IdentityMapMixin, LoginRequiredMixin, PermissionRequiredMixin,
                                  UpdateView):
     """Edit existing Community Resource view"""
     template_name = "common/edit_post.html"
@@ -306,12 +311,12 @@ class EditCommunityResourcesView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to edit community
         news. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
+        self.community = self.get_url_community()
         return request.user.has_perm("change_community_resource",
                                      self.community)
 
 
-class DeleteCommunityResourceView(LoginRequiredMixin, PermissionRequiredMixin,
+class DeleteCommunityResourceView(IdentityMapMixin, LoginRequiredMixin, PermissionRequiredMixin,
                                   DeleteView):
     """Delete existing Community Resource view"""
     template_name = "common/post_confirm_delete.html"
@@ -337,12 +342,12 @@ class DeleteCommunityResourceView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to delete community
         resource. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
+        self.community = self.get_url_community()
         return request.user.has_perm("delete_community_resource",
                                      self.community)
 
 
-class AddTagView(LoginRequiredMixin, PermissionRequiredMixin, CreateView):
+class AddTagView(IdentityMapMixin, LoginRequiredMixin, PermissionRequiredMixin, CreateView):
     """Create a new Tag"""
     template_name = "blog/tag_type.html"
     model = Tag
@@ -360,13 +365,12 @@ class AddTagView(LoginRequiredMixin, PermissionRequiredMixin, CreateView):
     def get_context_data(self, **kwargs):
         """Add Community object to the context"""
         context = super(AddTagView, self).get_context_data(**kwargs)
-        context['community'] = get_object_or_404(Community,
-                                                 slug=self.kwargs['slug'])
+        context['community'] = self.get_url_community()
         context['tag_type'] = "tag"
         return context
 
 
-class AddResourceTypeView(LoginRequiredMixin, PermissionRequiredMixin,
+class AddResourceTypeView(IdentityMapMixin, LoginRequiredMixin, PermissionRequiredMixin,
                           CreateView):
     """Create a new Resource Type"""
     template_name = "blog/tag_type.html"
@@ -385,7 +389,24 @@ class AddResourceTypeView(LoginRequiredMixin, PermissionRequiredMixin,
     def get_context_data(self, **kwargs):
         """Add Community object to the context"""
         context = super(AddResourceTypeView, self).get_context_data(**kwargs)
-        context['community'] = get_object_or_404(Community,
-                                                 slug=self.kwargs['slug'])
+        context['community'] = self.get_url_community()
         context['tag_type'] = "Resource Type"
         return context
+
+
+class PostFeedView(View):
+    """RSS or Atom feed of community posts. The rendered feed is cached until a post is saved
+    or deleted, and feed readers revalidating it with its ETag or Last-Modified get a 304
+    response without any database query."""
+    feed = None
+
+    def get(self, request, *args, **kwargs):
+        data = get_cached_feed(self.feed, request, **kwargs)
+        response = get_conditional_response(request, etag=data['etag'],
+                                            last_modified=data['last_modified'])
+        if response is None:
+            response = HttpResponse(data['content'], content_type=data['content_type'])
+        response['ETag'] = data['etag']
+        response['Last-Modified'] = http_date(data['last_modified'])
+        patch_cache_control(response, public=True, max_age=FEED_MAX_AGE)
+        return response
@@ -1,5 +1,19 @@
 from django.contrib import admin
-from common.models import Comment
+from common.models import Comment, EditorUpload, OutgoingEmail, Task
+
+
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'run_at', 'attempts', 'wait_time', 'run_time')
+    list_filter = ('status', 'name')
+
+
+class EditorUploadAdmin(admin.ModelAdmin):
+    list_display = ('name', 'original_name', 'owner', 'size', 'width', 'height', 'created_at')
+    raw_id_fields = ('owner',)
+    search_fields = ('name', 'original_name')
 
 
 admin.site.register(Comment)
+admin.site.register(EditorUpload, EditorUploadAdmin)
+admin.site.register(OutgoingEmail)
+admin.site.register(Task, TaskAdmin)
@@ -0,0 +1,58 @@
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from common.constants import LOCAL_CACHE_TIMEOUT
+
+
+def is_cache_shared(alias='default'):
+    """Check whether a cache is shared by all the worker processes, so that invalidating a key
+    in one process invalidates it for all of them
+
+    :param alias: string alias of the cache in the CACHES setting
+    :return: False if the cache backend keeps its values in the memory of each process
+    """
+    return not isinstance(caches[alias], (LocMemCache, DummyCache))
+
+
+def get_cache_timeout(timeout, alias='default'):
+    """Timeout to cache a value with, so that a value invalidated in another worker process is
+    not served for long. Django's default cache backend is local to each process, values are
+    then kept at most LOCAL_CACHE_TIMEOUT seconds.
+
+    :param timeout: int seconds to cache the value for, None to cache it until it is
+                    invalidated
+    :param alias: string alias of the cache in the CACHES setting
+    :return: int seconds or None
+    """
+    if is_cache_shared(alias):
+        return timeout
+    if timeout is None:
+        return LOCAL_CACHE_TIMEOUT
+    return min(timeout, LOCAL_CACHE_TIMEOUT)
+
+
+def get_generation(key):
+    """Get the generation of a group of cached values, part of their cache keys so that the
+    whole group is invalidated by bumping it
+
+    :param key: string cache key of the generation
+    :return: int generation, starting at 1
+    """
+    generation = cache.get(key)
+    if generation is None:
+        generation = 1
+        cache.add(key, generation, None)
+    return generation
+
+
+def bump_generation(key):
+    """Invalidate a group of cached values by bumping their generation
+
+    :param key: string cache key of the generation
+    """
+    try:
+        cache.incr(key)
+    except ValueError:
+        # no generation yet, nothing is cached under it
+        pass
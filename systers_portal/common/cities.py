@@ -0,0 +1,33 @@
+from cities_light.models import City
+from django.db.models import F, Q
+
+# number of cities returned by one page of the city autocomplete
+CITY_AUTOCOMPLETE_PAGE_SIZE = 20
+
+
+def search_cities(query, country=None, page=1, page_size=CITY_AUTOCOMPLETE_PAGE_SIZE):
+    """Find the cities whose name or one of whose alternate names starts with the query. The
+    lookups are served by the prefix index on the city name and the trigram index on the
+    alternate names, and one page is fetched at a time, so the cost does not grow with the size
+    of the gazetteer. The most populated cities come first.
+
+    :param query: string typed by the user, no city is returned if it is empty
+    :param country: string ISO code of the country the search is restricted to, or None
+    :param page: int number of the page, starting at 1
+    :param page_size: int number of cities per page
+    :return: tuple (list of tuples (pk, label), True if there is a next page)
+    """
+    query = " ".join((query or "").split())
+    if not query:
+        return [], False
+    matches = Q(name__istartswith=query)
+    matches |= Q(alternate_names__istartswith=query)
+    matches |= Q(alternate_names__icontains=";" + query)
+    cities = City.objects.filter(matches)
+    if country:
+        cities = cities.filter(country__code2=country.upper())
+    offset = (page - 1) * page_size
+    rows = list(cities.order_by(F('population').desc(nulls_last=True), 'name', 'pk')
+                .values_list('pk', 'display_name', 'name')[offset:offset + page_size + 1])
+    return ([(pk, display_name or name) for pk, display_name, name in rows[:page_size]],
+            len(rows) > page_size)
@@ -0,0 +1,71 @@
+# seconds a value is cached at most when the cache backend is local to each worker process,
+# invalidating it only clears the cache of the process handling the change
+LOCAL_CACHE_TIMEOUT = 30
+
+# status of an email in the outbox
+OUTBOX_PENDING = "pending"
+OUTBOX_SENT = "sent"
+OUTBOX_DEAD = "dead"
+OUTBOX_STATUS_CHOICES = (
+    (OUTBOX_PENDING, "Pending"),
+    (OUTBOX_SENT, "Sent"),
+    (OUTBOX_DEAD, "Dead"),
+)
+
+# number of emails delivered per transaction by the send_queued_emails command
+OUTBOX_BATCH_SIZE = 100
+# an email failing this many times is dead-lettered
+OUTBOX_MAX_ATTEMPTS = 8
+# seconds before the first retry of a failed email, doubled at each attempt up to the maximum
+OUTBOX_RETRY_DELAY = 60
+OUTBOX_MAX_RETRY_DELAY = 6 * 60 * 60
+
+# status of a background task
+TASK_PENDING = "pending"
+TASK_RUNNING = "running"
+TASK_SUCCEEDED = "succeeded"
+TASK_FAILED = "failed"
+TASK_STATUS_CHOICES = (
+    (TASK_PENDING, "Pending"),
+    (TASK_RUNNING, "Running"),
+    (TASK_SUCCEEDED, "Succeeded"),
+    (TASK_FAILED, "Failed"),
+)
+
+# attempts of a task before it is marked as failed
+TASK_MAX_ATTEMPTS = 3
+# seconds before the first retry of a failed task, doubled at each attempt up to the maximum
+TASK_RETRY_DELAY = 30
+TASK_MAX_RETRY_DELAY = 60 * 60
+# number of tasks a worker claims at once
+TASK_BATCH_SIZE = 10
+# seconds a worker waits before polling again when no task is due
+TASK_POLL_INTERVAL = 1
+# running tasks older than this many seconds are considered abandoned by a dead worker
+TASK_STALE_TIMEOUT = 60 * 60
+
+# formats of the resized variants of uploaded pictures, as (format, Pillow format, MIME type),
+# in the order browsers should prefer them
+IMAGE_VARIANT_FORMATS = (
+    ('webp', 'WEBP', 'image/webp'),
+    ('jpeg', 'JPEG', 'image/jpeg'),
+)
+IMAGE_VARIANT_QUALITY = 80
+# directory next to the uploads the variants are stored in
+IMAGE_VARIANT_DIRECTORY = "variants"
+
+# images uploaded in the rich text editor are downscaled to this width and re-encoded
+UPLOAD_IMAGE_MAX_WIDTH = 1280
+UPLOAD_IMAGE_QUALITY = 80
+# size of the thumbnails of uploaded images shown in the editor's image browser
+UPLOAD_THUMBNAIL_SIZE = (75, 75)
+# Pillow format and file extension uploaded images of each format are re-encoded to, other
+# still images are re-encoded to PNG and animated images are stored as uploaded
+UPLOAD_IMAGE_FORMATS = {
+    'JPEG': ('JPEG', 'jpg'),
+    'MPO': ('JPEG', 'jpg'),
+    'WEBP': ('WEBP', 'webp'),
+}
+UPLOAD_DEFAULT_IMAGE_FORMAT = ('PNG', 'png')
+# number of uploads per page of the editor's file browser
+UPLOAD_BROWSE_PAGE_SIZE = 40
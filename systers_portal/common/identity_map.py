@@ -0,0 +1,56 @@
+from django.shortcuts import get_object_or_404
+
+from community.models import Community
+from users.models import SystersUser
+
+
+class IdentityMap(object):
+    """Objects loaded while handling a single request, keyed by their lookup value.
+
+    Permission checks, views, mixins and templates of the same request get back the same
+    instances, so each Community and SystersUser is queried at most once per request.
+    """
+
+    def __init__(self):
+        self._communities = {}
+        self._systers_users = {}
+
+    def get_community(self, slug):
+        """Get a Community by its slug
+
+        :param slug: string slug of a Community
+        :return: Community object
+        :raises Http404: if no Community matches the slug
+        """
+        community = self._communities.get(slug)
+        if community is None:
+            community = get_object_or_404(Community, slug=slug)
+            self._communities[slug] = community
+        return community
+
+    def get_systers_user(self, user):
+        """Get the SystersUser profile of a User
+
+        :param user: User object
+        :return: SystersUser object, its user attribute being the given User object
+        :raises Http404: if the User has no SystersUser profile
+        """
+        systers_user = self._systers_users.get(user.pk)
+        if systers_user is None:
+            systers_user = get_object_or_404(SystersUser, user=user)
+            # the user is already loaded, reuse it instead of joining it
+            systers_user.user = user
+            self._systers_users[user.pk] = systers_user
+        return systers_user
+
+
+def get_identity_map(request):
+    """Get the identity map of a request, creating it if IdentityMapMiddleware did not run
+
+    :param request: HttpRequest object
+    :return: IdentityMap object
+    """
+    identity_map = getattr(request, 'identity_map', None)
+    if identity_map is None:
+        identity_map = request.identity_map = IdentityMap()
+    return identity_map
@@ -0,0 +1,179 @@
+import logging
+import os
+from io import BytesIO
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models.signals import post_save
+from PIL import Image, ImageOps
+
+from common.constants import (IMAGE_VARIANT_FORMATS, IMAGE_VARIANT_QUALITY,
+                              IMAGE_VARIANT_DIRECTORY)
+from common.tasks import task
+
+logger = logging.getLogger(__name__)
+
+# pictures with variants, by "app_label.ModelName.field_name"
+picture_fields = {}
+
+
+def get_variants_field_name(field_name):
+    """Name of the JSONField storing the variants of a picture field
+
+    :param field_name: string name of the ImageField
+    :return: string name of the JSONField
+    """
+    return "{0}_variants".format(field_name)
+
+
+def get_picture_name(instance, field_name):
+    """Name of the picture stored in an ImageField, some old rows store "False" for no picture
+
+    :param instance: model object
+    :param field_name: string name of the ImageField
+    :return: string name of the picture file, empty if there is no picture
+    """
+    name = getattr(instance, field_name).name or ""
+    return "" if name == "False" else name
+
+
+def register_picture_field(model, field_name, widths, crop=False):
+    """Create resized variants of the pictures uploaded to an ImageField in the background. The
+    model needs a `<field_name>_variants` JSONField, which is excluded from its saves so that a
+    save does not overwrite the variants created since the object was loaded.
+
+    :param model: model class
+    :param field_name: string name of the ImageField
+    :param widths: tuple of int widths of the variants in pixels
+    :param crop: True to crop the variants to squares
+    """
+    key = "{0}.{1}".format(model._meta.label, field_name)
+    picture_fields[key] = {'model': model, 'field_name': field_name, 'widths': widths,
+                           'crop': crop}
+
+    def queue_variants(sender, instance, raw, **kwargs):
+        if not raw:
+            queue_picture_variants(instance, field_name)
+    post_save.connect(queue_variants, sender=model, weak=False,
+                      dispatch_uid="queue_picture_variants:{0}".format(key))
+
+
+def queue_picture_variants(instance, field_name):
+    """Queue the creation of the variants of a picture, unless they exist already. A picture is
+    queued once, as its name is part of the idempotency key of the task.
+
+    :param instance: model object with a picture field registered with register_picture_field
+    :param field_name: string name of the ImageField
+    :return: Task object, None if the variants are up to date
+    """
+    name = get_picture_name(instance, field_name)
+    variants = getattr(instance, get_variants_field_name(field_name))
+    if variants.get('source', "") == name:
+        return None
+    args = [instance._meta.label, instance.pk, field_name, name]
+    if not name:
+        # removing the picture twice must clean up twice, the name is not unique
+        return create_picture_variants.enqueue(args=args)
+    key = "picture_variants:{0}".format(":".join(str(arg) for arg in args))
+    return create_picture_variants.enqueue(args=args, idempotency_key=key)
+
+
+def _prepare(image, mode):
+    if mode == 'RGB' and image.mode in ('RGBA', 'LA', 'P'):
+        # JPEG has no transparency, transparent pixels become white
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    if image.mode != mode:
+        return image.convert(mode)
+    return image
+
+
+def create_variants(name, storage, widths, crop=False):
+    """Create resized copies of a picture in each of the IMAGE_VARIANT_FORMATS. The orientation
+    in the EXIF data is applied to the pixels, then the EXIF data is left out of the variants.
+    Pictures are never enlarged, a picture narrower than a width gets a single variant at its
+    own width instead.
+
+    :param name: string name of the picture in the storage
+    :param storage: Storage object of the picture, the variants are saved next to it
+    :param widths: tuple of int widths of the variants in pixels
+    :param crop: True to crop the variants to squares
+    :return: dict mapping formats to lists of [int width, string name of the variant], by width
+    """
+    directory, filename = os.path.split(name)
+    stem = os.path.splitext(filename)[0]
+    variants = {}
+    with storage.open(name) as picture, Image.open(picture) as image:
+        image = ImageOps.exif_transpose(image)
+        smallest = min(image.size) if crop else image.width
+        sizes = sorted(set(min(width, smallest) for width in widths))
+        for variant_format, pillow_format, _ in IMAGE_VARIANT_FORMATS:
+            mode = 'RGBA' if pillow_format == 'WEBP' and 'A' in image.getbands() else 'RGB'
+            source = _prepare(image, mode)
+            variants[variant_format] = []
+            for width in sizes:
+                if crop:
+                    resized = ImageOps.fit(source, (width, width), Image.LANCZOS)
+                else:
+                    height = max(round(source.height * width / source.width), 1)
+                    resized = source.resize((width, height), Image.LANCZOS)
+                content = BytesIO()
+                if pillow_format == 'JPEG':
+                    resized.save(content, pillow_format, quality=IMAGE_VARIANT_QUALITY,
+                                 optimize=True, progressive=True)
+                else:
+                    resized.save(content, pillow_format, quality=IMAGE_VARIANT_QUALITY, method=6)
+                name = storage.save(
+                    os.path.join(directory, IMAGE_VARIANT_DIRECTORY,
+                                 "{0}-{1}.{2}".format(stem, width, variant_format)),
+                    ContentFile(content.getvalue()))
+                variants[variant_format].append([width, name])
+    return variants
+
+
+def delete_variants(variants, storage):
+    """Delete the files of the variants of a picture
+
+    :param variants: dict mapping formats to lists of [width, name], as created by
+                     create_variants
+    :param storage: Storage object the variants are saved to
+    """
+    for variant_format, _, _ in IMAGE_VARIANT_FORMATS:
+        for _, name in variants.get(variant_format, []):
+            storage.delete(name)
+
+
+@task
+def create_picture_variants(label, pk, field_name, name):
+    """Create the variants of a picture and record them on its object, replacing the variants of
+    the previous picture. Nothing is done if the picture changed since the task was queued, the
+    task of the new picture takes care of it.
+
+    :param label: string label of the model, like "users.SystersUser"
+    :param pk: primary key of the object
+    :param field_name: string name of the ImageField
+    :param name: string name of the picture the task was queued for, empty if it was removed
+    """
+    model = apps.get_model(label)
+    config = picture_fields["{0}.{1}".format(label, field_name)]
+    variants_field_name = get_variants_field_name(field_name)
+    field = model._meta.get_field(field_name)
+    variants = {}
+    if name:
+        variants = create_variants(name, field.storage, config['widths'], config['crop'])
+        variants['source'] = name
+    with transaction.atomic():
+        instance = model.objects.select_for_update().filter(pk=pk).only(
+            field_name, variants_field_name).first()
+        current = instance is not None and get_picture_name(instance, field_name) == name
+        if current:
+            previous = getattr(instance, variants_field_name)
+            model.objects.filter(pk=pk).update(**{variants_field_name: variants})
+    if current:
+        delete_variants(previous, field.storage)
+    else:
+        delete_variants(variants, field.storage)
+        logger.info("Picture of %s %s changed, skipped the variants of %s", label, pk, name)
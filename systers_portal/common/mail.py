@@ -0,0 +1,136 @@
+import base64
+import logging
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.utils import timezone
+
+from common.constants import (OUTBOX_PENDING, OUTBOX_SENT, OUTBOX_DEAD, OUTBOX_BATCH_SIZE,
+                              OUTBOX_MAX_ATTEMPTS, OUTBOX_RETRY_DELAY, OUTBOX_MAX_RETRY_DELAY)
+from common.models import OutgoingEmail
+from common.utils import get_retry_delay
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_EMAIL_BACKEND = 'common.mail.OutboxEmailBackend'
+
+
+class DeliveryError(Exception):
+    """The email backend reported that it did not send a message"""
+
+
+def _encode_attachment(attachment):
+    if not isinstance(attachment, tuple):
+        raise ValueError("Only (filename, content, mimetype) attachments can be queued")
+    filename, content, mimetype = attachment
+    if isinstance(content, str):
+        return [filename, content, mimetype, False]
+    return [filename, base64.b64encode(content).decode('ascii'), mimetype, True]
+
+
+def _decode_attachment(filename, content, mimetype, encoded):
+    return filename, base64.b64decode(content) if encoded else content, mimetype
+
+
+class OutboxEmailBackend(BaseEmailBackend):
+    """Email backend writing the messages to the OutgoingEmail outbox instead of sending them.
+    The rows are inserted in the current transaction, so an email is queued only if the change
+    it is about is committed, and requests never wait for the mail server."""
+
+    def send_messages(self, email_messages):
+        emails = []
+        for message in email_messages:
+            if not message.recipients():
+                continue
+            emails.append(OutgoingEmail(
+                subject=message.subject, body=message.body, from_email=message.from_email,
+                to=list(message.to), cc=list(message.cc), bcc=list(message.bcc),
+                reply_to=list(message.reply_to), headers=dict(message.extra_headers),
+                alternatives=[list(alternative)
+                              for alternative in getattr(message, 'alternatives', [])],
+                attachments=[_encode_attachment(attachment)
+                             for attachment in message.attachments]))
+        OutgoingEmail.objects.bulk_create(emails)
+        return len(emails)
+
+
+def get_delivery_connection(**kwargs):
+    """Get a connection to the backend actually delivering emails, which is the
+    OUTBOX_DELIVERY_BACKEND when emails go through the outbox, the EMAIL_BACKEND otherwise
+
+    :param kwargs: keyword arguments of the backend
+    :return: email backend object
+    """
+    if settings.EMAIL_BACKEND == OUTBOX_EMAIL_BACKEND:
+        return get_connection(settings.OUTBOX_DELIVERY_BACKEND, **kwargs)
+    return get_connection(**kwargs)
+
+
+def to_message(email, connection=None):
+    """Rebuild the message of a queued email
+
+    :param email: OutgoingEmail object
+    :param connection: email backend object the message is sent with
+    :return: EmailMultiAlternatives object
+    """
+    return EmailMultiAlternatives(
+        subject=email.subject, body=email.body, from_email=email.from_email, to=email.to,
+        cc=email.cc, bcc=email.bcc, reply_to=email.reply_to, headers=email.headers,
+        alternatives=[tuple(alternative) for alternative in email.alternatives],
+        attachments=[_decode_attachment(*attachment) for attachment in email.attachments],
+        connection=connection)
+
+
+def send_queued_emails(connection, batch_size=OUTBOX_BATCH_SIZE, now=None):
+    """Deliver a batch of the emails due in the outbox. The batch is locked with SKIP LOCKED,
+    so several workers can drain the outbox together. A failed email, or one the backend reports
+    it did not send, is retried with an exponential backoff, and dead-lettered after
+    OUTBOX_MAX_ATTEMPTS attempts.
+
+    :param connection: open email backend object, kept open across the messages
+    :param batch_size: int maximum number of emails delivered
+    :param now: aware datetime, now by default
+    :return: tuple (int number of sent emails, int number of failed emails), (0, 0) once no
+             email is due
+    """
+    now = now or timezone.now()
+    sent = failed = 0
+    with transaction.atomic():
+        emails = list(OutgoingEmail.objects.select_for_update(skip_locked=True).filter(
+            status=OUTBOX_PENDING, next_attempt_at__lte=now
+        ).order_by('next_attempt_at', 'id')[:batch_size])
+        handled = []
+        for email in emails:
+            handled.append(email)
+            email.attempts += 1
+            try:
+                # backends failing silently or rejecting the message send none
+                if not connection.send_messages([to_message(email, connection)]):
+                    raise DeliveryError("The email backend did not send the message")
+            except Exception as error:
+                logger.warning("Failed to send email %s (attempt %s): %s", email.pk,
+                               email.attempts, error)
+                email.last_error = repr(error)
+                if email.attempts >= OUTBOX_MAX_ATTEMPTS:
+                    email.status = OUTBOX_DEAD
+                else:
+                    email.next_attempt_at = now + get_retry_delay(
+                        email.attempts, OUTBOX_RETRY_DELAY, OUTBOX_MAX_RETRY_DELAY)
+                failed += 1
+                # the connection may have been lost with the message, start a new one and leave
+                # the rest of the batch for later if the server can't be reached
+                try:
+                    connection.close()
+                    connection.open()
+                except Exception:
+                    break
+            else:
+                email.status = OUTBOX_SENT
+                email.sent_at = timezone.now()
+                email.last_error = ""
+                sent += 1
+        OutgoingEmail.objects.bulk_update(handled, ['status', 'attempts', 'next_attempt_at',
+                                                    'last_error', 'sent_at'])
+    return sent, failed
@@ -0,0 +1,44 @@
+import os
+
+from ckeditor_uploader.utils import storage
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from common.models import EditorUpload
+from common.uploads import catalog_file
+from users.models import SystersUser
+
+
+def iter_stored_files(path):
+    directories, files = storage.listdir(path)
+    for filename in files:
+        if not filename.startswith('.') and not os.path.splitext(filename)[0].endswith('_thumb'):
+            yield os.path.join(path, filename)
+    for directory in directories:
+        if not directory.startswith('.'):
+            yield from iter_stored_files(os.path.join(path, directory))
+
+
+class Command(BaseCommand):
+    help = "Record the files uploaded in the rich text editor before the uploads were " \
+           "catalogued. This is the only place the upload storage is scanned, the editor's file " \
+           "browser reads the catalog."
+
+    def handle(self, *args, **options):
+        root = settings.CKEDITOR_UPLOAD_PATH
+        if not storage.exists(root):
+            return
+        catalogued = set(EditorUpload.objects.values_list('name', flat=True))
+        owners = {}
+        added = 0
+        for name in iter_stored_files(root):
+            if name in catalogued:
+                continue
+            # uploads are stored in a directory per user, named after the username
+            username = os.path.relpath(name, root).split(os.sep)[0]
+            if username not in owners:
+                owners[username] = SystersUser.objects.filter(user__username=username).first()
+            catalog_file(name, owners[username], os.path.basename(name),
+                         storage.get_modified_time(name))
+            added += 1
+        self.stdout.write("Catalogued {0} upload(s)".format(added))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from common.images import picture_fields, get_variants_field_name, queue_picture_variants
+
+
+class Command(BaseCommand):
+    help = "Queue the creation of the missing variants of the uploaded pictures, for the " \
+           "pictures uploaded before their variants were created at upload time"
+
+    def handle(self, *args, **options):
+        for key, config in sorted(picture_fields.items()):
+            field_name = config['field_name']
+            objects = config['model'].objects.exclude(**{field_name: ""}).exclude(
+                **{field_name: "False"}).exclude(**{field_name + '__isnull': True}).only(
+                field_name, get_variants_field_name(field_name))
+            queued = sum(queue_picture_variants(instance, field_name) is not None
+                         for instance in objects.iterator())
+            self.stdout.write("Queued {0} {1} picture(s)".format(queued, key))
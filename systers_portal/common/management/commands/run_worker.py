@@ -0,0 +1,94 @@
+import logging
+import os
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from common.constants import TASK_POLL_INTERVAL, TASK_STALE_TIMEOUT
+from common.tasks import claim_tasks, requeue_stale_tasks, run_task
+
+logger = logging.getLogger(__name__)
+
+
+def run_pooled_task(task_id):
+    """Run a task in a thread or a process of the pool, with its own database connection"""
+    close_old_connections()
+    try:
+        return run_task(task_id)
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = "Run the background tasks queued in the database"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4,
+                            help="number of tasks run at the same time")
+        parser.add_argument('--pool', choices=('thread', 'process'), default='thread',
+                            help="run the tasks in threads or in processes, processes suit "
+                                 "CPU bound tasks")
+        parser.add_argument('--interval', type=float, default=TASK_POLL_INTERVAL,
+                            help="seconds to wait before polling again when no task is due")
+        parser.add_argument('--stale-timeout', type=int, default=TASK_STALE_TIMEOUT,
+                            help="seconds after which a running task is requeued")
+        parser.add_argument('--once', action='store_true',
+                            help="exit once no task is due instead of polling for new tasks")
+
+    def create_pool(self, kind, concurrency):
+        if kind == 'process':
+            # the forked processes must not share the connection of the parent
+            connections.close_all()
+            return ProcessPoolExecutor(max_workers=concurrency)
+        return ThreadPoolExecutor(max_workers=concurrency)
+
+    def handle(self, *args, **options):
+        worker = "{0}:{1}".format(socket.gethostname(), os.getpid())
+        concurrency = options['concurrency']
+        pool = self.create_pool(options['pool'], concurrency)
+        requeue_stale_tasks(options['stale_timeout'])
+        statuses = {}
+        # running futures, mapped to the id of their task and the pool running them
+        in_flight = {}
+        try:
+            while True:
+                # new tasks are claimed as soon as a slot of the pool is free
+                task_ids = claim_tasks(worker, concurrency - len(in_flight)) \
+                    if len(in_flight) < concurrency else []
+                if task_ids:
+                    if options['pool'] == 'process':
+                        connections.close_all()
+                    for task_id in task_ids:
+                        in_flight[pool.submit(run_pooled_task, task_id)] = (task_id, pool)
+                elif not in_flight:
+                    if options['once']:
+                        break
+                    time.sleep(options['interval'])
+                    requeue_stale_tasks(options['stale_timeout'])
+                    continue
+                done, _ = wait(in_flight, timeout=options['interval'],
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    task_id, future_pool = in_flight.pop(future)
+                    try:
+                        status = future.result()
+                    except BrokenProcessPool:
+                        # left running, the task is requeued once it is stale
+                        logger.exception("Pool broken while running task %s", task_id)
+                        status = "errored"
+                        if future_pool is pool:
+                            pool.shutdown(wait=False)
+                            pool = self.create_pool(options['pool'], concurrency)
+                    except Exception:
+                        logger.exception("Error while running task %s", task_id)
+                        status = "errored"
+                    statuses[status] = statuses.get(status, 0) + 1
+        finally:
+            pool.shutdown()
+        self.stdout.write("Ran {0} task(s): {1}".format(
+            sum(statuses.values()), ", ".join(
+                "{0} {1}".format(count, status) for status, count in sorted(statuses.items()))))
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from common.constants import OUTBOX_BATCH_SIZE
+from common.mail import get_delivery_connection, send_queued_emails
+
+
+class Command(BaseCommand):
+    help = "Deliver the emails waiting in the outbox over a single connection to the mail server"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=OUTBOX_BATCH_SIZE,
+                            help="number of emails delivered per transaction")
+        parser.add_argument('--interval', type=int, default=None,
+                            help="keep running and deliver the due emails every this many "
+                                 "seconds, instead of exiting once no email is due")
+
+    def process(self, connection, batch_size):
+        try:
+            connection.open()
+        except Exception as error:
+            self.stderr.write("Can't connect to the mail server: {0!r}".format(error))
+            return
+        total_sent = total_failed = 0
+        try:
+            while True:
+                sent, failed = send_queued_emails(connection, batch_size)
+                total_sent += sent
+                total_failed += failed
+                # a batch without any delivered email means the mail server is failing, the
+                # remaining emails wait for the next run
+                if not sent:
+                    break
+        finally:
+            connection.close()
+        if total_sent or total_failed or self.verbosity > 1:
+            self.stdout.write("Sent {0} email(s), {1} failed".format(total_sent, total_failed))
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        # the connection is kept open while the outbox is drained, and closed between runs
+        connection = get_delivery_connection()
+        self.process(connection, options['batch_size'])
+        while options['interval']:
+            time.sleep(options['interval'])
+            self.process(connection, options['batch_size'])
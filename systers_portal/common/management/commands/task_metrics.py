@@ -0,0 +1,24 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from common.tasks import get_task_metrics
+
+
+class Command(BaseCommand):
+    help = "Show the timing metrics of the background tasks, per task name"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=None,
+                            help="only measure the tasks finished in this many last hours")
+
+    def handle(self, *args, **options):
+        since = None
+        if options['hours'] is not None:
+            since = timezone.now() - datetime.timedelta(hours=options['hours'])
+        for metrics in get_task_metrics(since):
+            self.stdout.write(
+                "{name}: {finished} finished, {failed} failed, run {avg_run_time:.3f}s avg "
+                "{max_run_time:.3f}s max, waited {avg_wait_time:.3f}s avg "
+                "{max_wait_time:.3f}s max".format(**metrics))
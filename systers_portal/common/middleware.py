@@ -0,0 +1,12 @@
+from common.identity_map import IdentityMap
+
+
+class IdentityMapMiddleware(object):
+    """Attach an empty IdentityMap to every request as `request.identity_map`"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.identity_map = IdentityMap()
+        return self.get_response(request)
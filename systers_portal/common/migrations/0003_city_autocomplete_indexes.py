@@ -0,0 +1,24 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """Indexes serving the city autocomplete: a prefix index on the city name, usable for any
+    query length, and a trigram index on the semicolon separated alternate names"""
+
+    dependencies = [
+        ('cities_light', '0009_add_subregion'),
+        ('common', '0002_auto_20200724_2045'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunSQL(
+            'CREATE INDEX common_city_name_prefix_idx ON cities_light_city '
+            '(UPPER(name) text_pattern_ops);',
+            'DROP INDEX common_city_name_prefix_idx;'),
+        migrations.RunSQL(
+            'CREATE INDEX common_city_alternate_names_trgm_idx ON cities_light_city '
+            'USING gin (UPPER(alternate_names) gin_trgm_ops);',
+            'DROP INDEX common_city_alternate_names_trgm_idx;'),
+    ]
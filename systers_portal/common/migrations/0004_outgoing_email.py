@@ -0,0 +1,42 @@
+# Generated by Django 3.0.8 on 2026-10-18 18:47
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0003_city_autocomplete_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutgoingEmail',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.TextField(verbose_name='Subject')),
+                ('body', models.TextField(verbose_name='Body')),
+                ('from_email', models.CharField(max_length=255, verbose_name='From')),
+                ('to', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=255), default=list, size=None, verbose_name='To')),
+                ('cc', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=255), default=list, size=None, verbose_name='Cc')),
+                ('bcc', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=255), default=list, size=None, verbose_name='Bcc')),
+                ('reply_to', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=255), default=list, size=None, verbose_name='Reply to')),
+                ('headers', django.contrib.postgres.fields.jsonb.JSONField(default=dict, verbose_name='Headers')),
+                ('alternatives', django.contrib.postgres.fields.jsonb.JSONField(default=list, verbose_name='Alternatives')),
+                ('attachments', django.contrib.postgres.fields.jsonb.JSONField(default=list, verbose_name='Attachments')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('dead', 'Dead')], default='pending', max_length=10, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Attempts')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Next attempt at')),
+                ('last_error', models.TextField(blank=True, verbose_name='Last error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Sent at')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='outgoingemail',
+            index=models.Index(condition=models.Q(status='pending'), fields=['next_attempt_at', 'id'], name='outgoing_email_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 3.0.8 on 2026-10-18 18:50
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0004_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, verbose_name='Name')),
+                ('args', django.contrib.postgres.fields.jsonb.JSONField(default=list, verbose_name='Arguments')),
+                ('kwargs', django.contrib.postgres.fields.jsonb.JSONField(default=dict, verbose_name='Keyword arguments')),
+                ('idempotency_key', models.CharField(blank=True, max_length=255, null=True, unique=True, verbose_name='Idempotency key')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='pending', max_length=10, verbose_name='Status')),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Run at')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Attempts')),
+                ('max_attempts', models.PositiveIntegerField(default=3, verbose_name='Maximum attempts')),
+                ('worker', models.CharField(blank=True, max_length=255, verbose_name='Worker')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Started at')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finished at')),
+                ('wait_time', models.FloatField(blank=True, help_text='Seconds between the time the task was due and its last start', null=True, verbose_name='Seconds waited')),
+                ('run_time', models.FloatField(blank=True, help_text='Seconds the last attempt of the task ran', null=True, verbose_name='Seconds run')),
+                ('last_error', models.TextField(blank=True, verbose_name='Last error')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(status='pending'), fields=['run_at', 'id'], name='task_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['name', 'finished_at'], name='task_name_finished_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 3.0.8 on 2026-10-18 19:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_profile_picture_variants'),
+        ('common', '0005_task'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EditorUpload',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Name')),
+                ('original_name', models.CharField(blank=True, max_length=255, verbose_name='Original name')),
+                ('thumbnail', models.CharField(blank=True, max_length=255, verbose_name='Thumbnail')),
+                ('size', models.BigIntegerField(help_text='Size of the file in bytes', verbose_name='Size')),
+                ('width', models.PositiveIntegerField(blank=True, null=True, verbose_name='Width')),
+                ('height', models.PositiveIntegerField(blank=True, null=True, verbose_name='Height')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Created at')),
+                ('owner', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='editor_uploads', to='users.SystersUser', verbose_name='Owner')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='editorupload',
+            index=models.Index(fields=['owner', '-created_at', '-id'], name='editor_upload_owner_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='editorupload',
+            index=models.Index(fields=['-created_at', '-id'], name='editor_upload_created_idx'),
+        ),
+    ]
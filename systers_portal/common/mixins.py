@@ -1,9 +1,44 @@
 from django.core.exceptions import ImproperlyConfigured
 
-from users.models import SystersUser
+from common.identity_map import get_identity_map
+from membership.utils import get_membership_state
 
 
-class UserDetailsMixin(object):
+class IdentityMapMixin(object):
+    """Mixin allows to load the objects of a request through the request identity map:
+
+    * Community of the URL slug
+    * SystersUser of the request user
+    """
+    community_slug_url_kwarg = 'slug'
+
+    def get_url_community(self):
+        """Get the Community whose slug is in the URL
+
+        :return: Community object
+        :raises Http404: if no Community matches the slug
+        """
+        return get_identity_map(self.request).get_community(
+            self.kwargs[self.community_slug_url_kwarg])
+
+    def get_systers_user(self):
+        """Get the SystersUser of the request user
+
+        :return: SystersUser object
+        :raises Http404: if the request user has no SystersUser profile
+        """
+        return get_identity_map(self.request).get_systers_user(self.request.user)
+
+
+class CommunityObjectMixin(IdentityMapMixin):
+    """Mixin for single object views of a Community, which reuses the Community loaded by the
+    permission checks of the same request instead of querying it again."""
+
+    def get_object(self, queryset=None):
+        return self.get_url_community()
+
+
+class UserDetailsMixin(IdentityMapMixin):
     """Mixin allows to add to the context information about the request user:
 
     * Is user member of the community
@@ -15,11 +50,9 @@ class UserDetailsMixin(object):
         context = super(UserDetailsMixin, self).get_context_data(**kwargs)
         user = self.request.user
         if user.username:
-            community = self.get_community()
-            systers_user = SystersUser.objects.get(user=user)
-            context['is_member'] = systers_user.is_member(community)
-            context['join_request'] = systers_user.get_last_join_request(
-                community)
+            state = get_membership_state(user.pk, self.get_community())
+            context['is_member'] = state.is_member
+            context['join_request'] = state.join_request
         return context
 
     def get_community(self):
@@ -1,8 +1,13 @@
 from django.db import models
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.fields import ArrayField, JSONField
+from django.utils import timezone
 from ckeditor.fields import RichTextField
+from ckeditor_uploader.utils import get_icon_filename, storage
 
+from common.constants import (OUTBOX_PENDING, OUTBOX_STATUS_CHOICES, TASK_PENDING,
+                              TASK_STATUS_CHOICES, TASK_MAX_ATTEMPTS)
 from users.models import SystersUser
 
 
@@ -37,3 +42,110 @@ class Comment(models.Model):
 
     def __str__(self):
         return "Comment by {0} to {1}".format(self.author, self.content_object)
+
+
+class OutgoingEmail(models.Model):
+    """Model to represent an email waiting in the outbox. Emails are written by the
+    OutboxEmailBackend in the transaction of the change they are about, and delivered by the
+    send_queued_emails command."""
+    subject = models.TextField(verbose_name="Subject")
+    body = models.TextField(verbose_name="Body")
+    from_email = models.CharField(max_length=255, verbose_name="From")
+    to = ArrayField(models.CharField(max_length=255), default=list, verbose_name="To")
+    cc = ArrayField(models.CharField(max_length=255), default=list, verbose_name="Cc")
+    bcc = ArrayField(models.CharField(max_length=255), default=list, verbose_name="Bcc")
+    reply_to = ArrayField(models.CharField(max_length=255), default=list,
+                          verbose_name="Reply to")
+    headers = JSONField(default=dict, verbose_name="Headers")
+    alternatives = JSONField(default=list, verbose_name="Alternatives")
+    attachments = JSONField(default=list, verbose_name="Attachments")
+    status = models.CharField(max_length=10, choices=OUTBOX_STATUS_CHOICES,
+                              default=OUTBOX_PENDING, verbose_name="Status")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Attempts")
+    next_attempt_at = models.DateTimeField(default=timezone.now,
+                                           verbose_name="Next attempt at")
+    last_error = models.TextField(blank=True, verbose_name="Last error")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created at")
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name="Sent at")
+
+    class Meta:
+        indexes = [models.Index(fields=['next_attempt_at', 'id'], name='outgoing_email_pending_idx',
+                                condition=models.Q(status=OUTBOX_PENDING))]
+
+    def __str__(self):
+        return "Email {0} to {1}".format(self.subject, ", ".join(self.to))
+
+
+class Task(models.Model):
+    """Model to represent a call of a function registered with common.tasks.task, run in the
+    background by the run_worker command"""
+    name = models.CharField(max_length=255, verbose_name="Name")
+    args = JSONField(default=list, verbose_name="Arguments")
+    kwargs = JSONField(default=dict, verbose_name="Keyword arguments")
+    idempotency_key = models.CharField(max_length=255, unique=True, null=True, blank=True,
+                                       verbose_name="Idempotency key")
+    status = models.CharField(max_length=10, choices=TASK_STATUS_CHOICES, default=TASK_PENDING,
+                              verbose_name="Status")
+    run_at = models.DateTimeField(default=timezone.now, verbose_name="Run at")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Attempts")
+    max_attempts = models.PositiveIntegerField(default=TASK_MAX_ATTEMPTS,
+                                               verbose_name="Maximum attempts")
+    worker = models.CharField(max_length=255, blank=True, verbose_name="Worker")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created at")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="Started at")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Finished at")
+    wait_time = models.FloatField(null=True, blank=True, verbose_name="Seconds waited",
+                                  help_text="Seconds between the time the task was due and its "
+                                            "last start")
+    run_time = models.FloatField(null=True, blank=True, verbose_name="Seconds run",
+                                 help_text="Seconds the last attempt of the task ran")
+    last_error = models.TextField(blank=True, verbose_name="Last error")
+
+    class Meta:
+        indexes = [models.Index(fields=['run_at', 'id'], name='task_pending_idx',
+                                condition=models.Q(status=TASK_PENDING)),
+                   models.Index(fields=['name', 'finished_at'], name='task_name_finished_idx')]
+
+    def __str__(self):
+        return "Task {0} ({1})".format(self.name, self.status)
+
+
+class EditorUpload(models.Model):
+    """Model to represent a file uploaded in the rich text editor. The editor's file browser
+    lists the uploads from this catalog, without scanning the upload storage."""
+    owner = models.ForeignKey(SystersUser, null=True, blank=True, related_name='editor_uploads',
+                              verbose_name="Owner", on_delete=models.SET_NULL)
+    name = models.CharField(max_length=255, unique=True, verbose_name="Name")
+    original_name = models.CharField(max_length=255, blank=True, verbose_name="Original name")
+    thumbnail = models.CharField(max_length=255, blank=True, verbose_name="Thumbnail")
+    size = models.BigIntegerField(verbose_name="Size", help_text="Size of the file in bytes")
+    width = models.PositiveIntegerField(null=True, blank=True, verbose_name="Width")
+    height = models.PositiveIntegerField(null=True, blank=True, verbose_name="Height")
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="Created at")
+
+    class Meta:
+        indexes = [models.Index(fields=['owner', '-created_at', '-id'],
+                                name='editor_upload_owner_idx'),
+                   models.Index(fields=['-created_at', '-id'], name='editor_upload_created_idx')]
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def is_image(self):
+        """True if the upload is an image"""
+        return self.width is not None
+
+    @property
+    def url(self):
+        """URL of the uploaded file"""
+        return storage.url(self.name)
+
+    @property
+    def thumbnail_url(self):
+        """URL of the thumbnail of an image, of the file type icon of other files"""
+        if self.thumbnail:
+            return storage.url(self.thumbnail)
+        if self.is_image:
+            return self.url
+        return get_icon_filename(self.name)
@@ -0,0 +1,88 @@
+from django.contrib.auth.models import Group, Permission
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from guardian.utils import get_group_obj_perms_model
+
+
+def bulk_create_groups(group_names):
+    """Create the groups that do not exist yet with a single INSERT
+
+    :param group_names: list of string group names
+    :return: list of Group objects in the order of group_names
+    """
+    Group.objects.bulk_create([Group(name=name) for name in group_names],
+                              ignore_conflicts=True)
+    groups = Group.objects.in_bulk(group_names, field_name='name')
+    return [groups[name] for name in group_names]
+
+
+def get_permissions(codenames, content_type=None):
+    """Resolve permission codenames with a single query. A codename existing for several models
+    resolves like Permission.objects.filter(codename=codename).first(), in the default ordering
+    of Permission, unless the content type is given.
+
+    :param codenames: iterable of string permission codenames
+    :param content_type: ContentType object the permissions belong to, as for object
+                         permissions, None to search all the models
+    :return: dict mapping codenames to Permission objects
+    :raises Permission.DoesNotExist: if a codename does not match any permission
+    """
+    codenames = set(codenames)
+    queryset = Permission.objects.filter(codename__in=codenames)
+    if content_type is not None:
+        queryset = queryset.filter(content_type=content_type)
+    permissions = {}
+    for permission in queryset:
+        permissions.setdefault(permission.codename, permission)
+    missing = codenames.difference(permissions)
+    if missing:
+        raise Permission.DoesNotExist(
+            "Unknown permission codenames: {0}".format(", ".join(sorted(missing))))
+    return permissions
+
+
+@transaction.atomic
+def bulk_assign_permissions(group_codenames, obj=None, is_object_permission=None):
+    """Grant permissions to groups with one INSERT for model permissions and
+    one INSERT for object permissions.
+
+    :param group_codenames: list of tuples (Group object, list of permission codenames)
+    :param obj: model instance object permissions are granted on, None to grant only model
+                permissions
+    :param is_object_permission: callable taking a codename and returning True if the
+                                 permission is granted on obj rather than on the whole model,
+                                 by default all permissions are object permissions when obj
+                                 is given
+    """
+    content_type = ContentType.objects.get_for_model(obj) if obj is not None else None
+    if is_object_permission is None:
+        def is_object_permission(codename):
+            return obj is not None
+    codenames = set(codename for group, group_codenames_list in group_codenames
+                    for codename in group_codenames_list)
+    object_codenames = set(codename for codename in codenames if is_object_permission(codename))
+    # object permissions belong to the model of obj, model permissions resolve by codename
+    permissions = {}
+    if object_codenames:
+        permissions.update(get_permissions(object_codenames, content_type))
+    if codenames - object_codenames:
+        permissions.update(get_permissions(codenames - object_codenames))
+
+    group_permissions = []
+    object_permissions = []
+    GroupPermission = Group.permissions.through
+    GroupObjectPermission = get_group_obj_perms_model(obj)
+    for group, codenames in group_codenames:
+        for codename in codenames:
+            permission = permissions[codename]
+            if codename in object_codenames:
+                object_permissions.append(GroupObjectPermission(
+                    group=group, permission=permission, content_type=content_type,
+                    object_pk=str(obj.pk)))
+            else:
+                group_permissions.append(GroupPermission(group=group,
+                                                         permission=permission))
+    if group_permissions:
+        GroupPermission.objects.bulk_create(group_permissions, ignore_conflicts=True)
+    if object_permissions:
+        GroupObjectPermission.objects.bulk_create(object_permissions, ignore_conflicts=True)
@@ -0,0 +1,176 @@
+import datetime
+import logging
+import time
+import traceback
+
+from django.db import transaction
+from django.db.models import Avg, Count, F, Max, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from common.constants import (TASK_PENDING, TASK_RUNNING, TASK_SUCCEEDED, TASK_FAILED,
+                              TASK_MAX_ATTEMPTS, TASK_RETRY_DELAY, TASK_MAX_RETRY_DELAY,
+                              TASK_BATCH_SIZE, TASK_STALE_TIMEOUT)
+from common.models import Task
+from common.utils import get_retry_delay
+
+logger = logging.getLogger(__name__)
+
+# functions that can be run as tasks, by task name
+registry = {}
+
+
+def task(func=None, max_attempts=TASK_MAX_ATTEMPTS):
+    """Register a function to be run in the background by the run_worker command. The function
+    gets an `enqueue` attribute taking the same arguments as enqueue_task besides the function.
+    Its arguments must be serializable to JSON.
+
+    :param func: function, the decorator can also be called with keyword arguments only
+    :param max_attempts: int number of attempts of a task before it is marked as failed
+    :return: the function
+    """
+    def register(func):
+        name = "{0}.{1}".format(func.__module__, func.__qualname__)
+        func.task_name = name
+        func.max_attempts = max_attempts
+
+        def enqueue(*args, **kwargs):
+            return enqueue_task(func, *args, **kwargs)
+        func.enqueue = enqueue
+        registry[name] = func
+        return func
+
+    if func is None:
+        return register
+    return register(func)
+
+
+def enqueue_task(func, args=(), kwargs=None, run_at=None, idempotency_key=None):
+    """Add a task to the queue. It is inserted in the current transaction, so it can't run before
+    the changes it is about are committed.
+
+    :param func: function decorated with task
+    :param args: list of positional arguments of the function
+    :param kwargs: dict of keyword arguments of the function
+    :param run_at: aware datetime the task should run at, as soon as possible by default
+    :param idempotency_key: string identifying the task, a task with the key of an existing
+                            task is not added
+    :return: Task object, the existing task if the idempotency key is already used
+    """
+    new_task = Task(name=func.task_name, args=list(args), kwargs=kwargs or {},
+                    run_at=run_at or timezone.now(), max_attempts=func.max_attempts,
+                    idempotency_key=idempotency_key)
+    if idempotency_key is None:
+        new_task.save()
+        return new_task
+    # ON CONFLICT DO NOTHING, concurrent requests enqueuing the same key don't fail
+    Task.objects.bulk_create([new_task], ignore_conflicts=True)
+    return Task.objects.get(idempotency_key=idempotency_key)
+
+
+def get_task_function(name):
+    """Get the function of a task, importing its module if needed
+
+    :param name: string dotted path of the function
+    :return: function
+    :raises ValueError: if the function is not registered as a task
+    """
+    if name not in registry:
+        import_string(name)
+    if name not in registry:
+        raise ValueError("{0} is not registered as a task".format(name))
+    return registry[name]
+
+
+def claim_tasks(worker, limit=TASK_BATCH_SIZE, now=None):
+    """Mark due tasks as running for a worker. The tasks are locked with SKIP LOCKED, so several
+    workers never claim the same task.
+
+    :param worker: string name of the worker
+    :param limit: int maximum number of claimed tasks
+    :param now: aware datetime, now by default
+    :return: list of int ids of the claimed tasks
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        task_ids = list(Task.objects.select_for_update(skip_locked=True).filter(
+            status=TASK_PENDING, run_at__lte=now).order_by('run_at', 'id').values_list(
+            'id', flat=True)[:limit])
+        Task.objects.filter(id__in=task_ids).update(status=TASK_RUNNING, worker=worker,
+                                                    started_at=now)
+    return task_ids
+
+
+def run_task(task_id):
+    """Run a claimed task and record its outcome and timing. A failed task is retried with an
+    exponential backoff until it reaches its maximum number of attempts. The outcome is only
+    recorded if the task is still held by the claim it was run for, a task requeued as stale
+    meanwhile may have been claimed by another worker.
+
+    :param task_id: int id of a running Task
+    :return: string status of the task after the run
+    """
+    claimed = Task.objects.get(pk=task_id)
+    started = time.monotonic()
+    started_at = timezone.now()
+    error = None
+    try:
+        get_task_function(claimed.name)(*claimed.args, **claimed.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+    run_time = time.monotonic() - started
+    finished_at = timezone.now()
+    attempts = claimed.attempts + 1
+    values = {'attempts': attempts, 'started_at': started_at, 'finished_at': finished_at,
+              'run_time': run_time,
+              'wait_time': max((started_at - claimed.run_at).total_seconds(), 0)}
+    if error is None:
+        values.update(status=TASK_SUCCEEDED, last_error="")
+    else:
+        logger.warning("Task %s %s failed (attempt %s):\n%s", task_id, claimed.name, attempts,
+                       error)
+        values.update(last_error=error)
+        if attempts < claimed.max_attempts:
+            values.update(status=TASK_PENDING, run_at=finished_at + get_retry_delay(
+                attempts, TASK_RETRY_DELAY, TASK_MAX_RETRY_DELAY))
+        else:
+            values.update(status=TASK_FAILED)
+    if not Task.objects.filter(pk=task_id, status=TASK_RUNNING, worker=claimed.worker,
+                               started_at=claimed.started_at).update(**values):
+        logger.warning("Task %s %s was requeued while it ran, its outcome is discarded",
+                       task_id, claimed.name)
+    return values['status']
+
+
+def requeue_stale_tasks(timeout=TASK_STALE_TIMEOUT, now=None):
+    """Put back in the queue the tasks left running by workers that died. The abandoned run
+    counts as an attempt, so a task killing its worker every time ends up failed.
+
+    :param timeout: int seconds after which a running task is considered abandoned
+    :param now: aware datetime, now by default
+    :return: int number of requeued tasks
+    """
+    now = now or timezone.now()
+    stale = Task.objects.filter(status=TASK_RUNNING,
+                                started_at__lt=now - datetime.timedelta(seconds=timeout))
+    values = {'attempts': F('attempts') + 1, 'finished_at': now,
+              'last_error': "Abandoned by worker"}
+    stale.filter(attempts__gte=F('max_attempts') - 1).update(status=TASK_FAILED, **values)
+    return stale.update(status=TASK_PENDING, run_at=now, **values)
+
+
+def get_task_metrics(since=None):
+    """Get the timing metrics of the tasks, per task name
+
+    :param since: aware datetime, only the tasks finished after it are measured if given
+    :return: list of dicts with the name, number of finished and failed tasks, average and
+             maximum seconds run and average and maximum seconds waited
+    """
+    tasks = Task.objects.filter(finished_at__isnull=False)
+    if since is not None:
+        tasks = tasks.filter(finished_at__gte=since)
+    return list(tasks.values('name').annotate(
+        finished=Count('id'), failed=Count('id', filter=Q(status=TASK_FAILED)),
+        avg_run_time=Avg('run_time'), max_run_time=Max('run_time'),
+        avg_wait_time=Avg('wait_time'), max_wait_time=Max('wait_time'),
+    ).order_by('name'))
@@ -0,0 +1,36 @@
+from django import template
+
+from common.constants import IMAGE_VARIANT_FORMATS
+from common.images import get_picture_name, get_variants_field_name
+
+
+register = template.Library()
+
+
+@register.inclusion_tag('common/snippets/picture.html')
+def picture(instance, field_name, sizes="100vw", **attrs):
+    """Render a picture with the srcset of its resized variants. Until the variants of a new
+    picture are created in the background, the original picture is rendered instead.
+
+    :param instance: model object with a picture field registered with register_picture_field
+    :param field_name: string name of the ImageField
+    :param sizes: string sizes attribute of the picture
+    :param attrs: attributes of the img element, like class and alt
+    :return: dict context of the picture snippet
+    """
+    field = getattr(instance, field_name)
+    name = get_picture_name(instance, field_name)
+    variants = getattr(instance, get_variants_field_name(field_name))
+    context = {'sources': [], 'src': field.url if name else "", 'srcset': "", 'sizes': sizes,
+               'attrs': attrs}
+    if not name or variants.get('source') != name:
+        return context
+    for variant_format, _, mime_type in IMAGE_VARIANT_FORMATS:
+        srcset = ", ".join("{0} {1}w".format(field.storage.url(variant_name), width)
+                           for width, variant_name in variants.get(variant_format, []))
+        context['sources'].append({'type': mime_type, 'srcset': srcset})
+    # browsers without picture support get the last format, JPEG, which all of them decode
+    fallback = context['sources'].pop()
+    context['srcset'] = fallback['srcset']
+    context['src'] = field.storage.url(variants[IMAGE_VARIANT_FORMATS[-1][0]][0][1])
+    return context
@@ -0,0 +1,33 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from common.cache import bump_generation, get_cache_timeout, get_generation, is_cache_shared
+from common.constants import LOCAL_CACHE_TIMEOUT
+
+SHARED_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+                             'LOCATION': 'foo_cache'}}
+
+
+class CacheTestCase(TestCase):
+    def test_local_cache_timeout(self):
+        """Test that values are cached shortly when the cache is local to each process"""
+        self.assertFalse(is_cache_shared())
+        self.assertEqual(get_cache_timeout(None), LOCAL_CACHE_TIMEOUT)
+        self.assertEqual(get_cache_timeout(3600), LOCAL_CACHE_TIMEOUT)
+        self.assertEqual(get_cache_timeout(10), 10)
+
+    @override_settings(CACHES=SHARED_CACHES)
+    def test_shared_cache_timeout(self):
+        """Test that values are cached for the requested timeout when the cache is shared"""
+        self.assertTrue(is_cache_shared())
+        self.assertIsNone(get_cache_timeout(None))
+        self.assertEqual(get_cache_timeout(3600), 3600)
+
+    def test_generation(self):
+        """Test bumping the generation of a group of cached values"""
+        cache.delete('foo:generation')
+        bump_generation('foo:generation')
+        self.assertEqual(get_generation('foo:generation'), 1)
+        self.assertEqual(get_generation('foo:generation'), 1)
+        bump_generation('foo:generation')
+        self.assertEqual(get_generation('foo:generation'), 2)
@@ -0,0 +1,44 @@
+from cities_light.models import City, Country
+from django.test import TestCase
+
+from common.cities import search_cities
+
+
+class SearchCitiesTestCase(TestCase):
+    def setUp(self):
+        portugal = Country.objects.create(name='Portugal', code2='PT', continent='EU')
+        brazil = Country.objects.create(name='Brazil', code2='BR', continent='SA')
+        self.lisbon = City.objects.create(name='Lisbon', display_name='Lisbon, Portugal',
+                                          alternate_names='Lisboa;Lissabon',
+                                          population=500000, country=portugal)
+        self.lisburn = City.objects.create(name='Lisburn', display_name='Lisburn, Portugal',
+                                           population=45000, country=portugal)
+        self.porto = City.objects.create(name='Porto', display_name='Porto, Portugal',
+                                         population=230000, country=portugal)
+        self.porto_alegre = City.objects.create(name='Porto Alegre',
+                                                display_name='Porto Alegre, Brazil',
+                                                population=1400000, country=brazil)
+
+    def test_search_cities_prefix(self):
+        """Test matching the prefix of the name or of the alternate names"""
+        cities, has_more = search_cities("lis")
+        self.assertEqual(cities, [(self.lisbon.pk, 'Lisbon, Portugal'),
+                                  (self.lisburn.pk, 'Lisburn, Portugal')])
+        self.assertFalse(has_more)
+        self.assertEqual(search_cities("lissab")[0], [(self.lisbon.pk, 'Lisbon, Portugal')])
+        self.assertEqual(search_cities("bon")[0], [])
+        self.assertEqual(search_cities(" ")[0], [])
+
+    def test_search_cities_country(self):
+        """Test restricting the search to a country"""
+        self.assertEqual([pk for pk, label in search_cities("porto")[0]],
+                         [self.porto_alegre.pk, self.porto.pk])
+        self.assertEqual([pk for pk, label in search_cities("porto", country="pt")[0]],
+                         [self.porto.pk])
+
+    def test_search_cities_pages(self):
+        """Test paginating the cities by population"""
+        self.assertEqual(search_cities("l", page_size=1), ([(self.lisbon.pk, 'Lisbon, Portugal')],
+                                                           True))
+        self.assertEqual(search_cities("l", page=2, page_size=1),
+                         ([(self.lisburn.pk, 'Lisburn, Portugal')], False))
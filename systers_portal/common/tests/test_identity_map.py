@@ -0,0 +1,69 @@
+from cities_light.models import Country, City
+from django.contrib.auth.models import User
+from django.http import Http404, HttpResponse
+from django.test import TestCase, RequestFactory
+from django.views.generic import DetailView
+
+from common.identity_map import IdentityMap, get_identity_map
+from common.middleware import IdentityMapMiddleware
+from common.mixins import CommunityObjectMixin
+from community.models import Community
+from users.models import SystersUser
+
+
+class IdentityMapTestCase(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user(username='foo', password='foobar')
+        self.systers_user = SystersUser.objects.get(user=self.user)
+        country = Country.objects.create(name='Bar', continent='AS')
+        location = City.objects.create(name='Foo', display_name='Foo',
+                                       country=country)
+        self.community = Community.objects.create(name="Foo", slug="foo",
+                                                  order=1, location=location,
+                                                  admin=self.systers_user)
+
+    def test_get_community(self):
+        """Test that a community is loaded once per identity map"""
+        identity_map = IdentityMap()
+        with self.assertNumQueries(1):
+            community = identity_map.get_community("foo")
+            self.assertIs(identity_map.get_community("foo"), community)
+        self.assertEqual(community, self.community)
+        self.assertRaises(Http404, identity_map.get_community, "bar")
+
+    def test_get_systers_user(self):
+        """Test that a SystersUser is loaded once per identity map, without its user"""
+        identity_map = IdentityMap()
+        with self.assertNumQueries(1):
+            systers_user = identity_map.get_systers_user(self.user)
+            self.assertIs(identity_map.get_systers_user(self.user), systers_user)
+            self.assertIs(systers_user.user, self.user)
+        self.assertEqual(systers_user, self.systers_user)
+
+    def test_middleware(self):
+        """Test that every request gets its own identity map"""
+        identity_maps = []
+
+        def get_response(request):
+            identity_maps.append(get_identity_map(request))
+            return HttpResponse()
+
+        middleware = IdentityMapMiddleware(get_response)
+        middleware(self.factory.get('/'))
+        middleware(self.factory.get('/'))
+        self.assertIsInstance(identity_maps[0], IdentityMap)
+        self.assertIsNot(identity_maps[0], identity_maps[1])
+
+    def test_community_object_mixin(self):
+        """Test that the view object is the community of the request identity map"""
+        class DummyView(CommunityObjectMixin, DetailView):
+            template_name = "dummy"
+            model = Community
+
+        request = self.factory.get('/dummy/')
+        request.user = self.user
+        community = get_identity_map(request).get_community("foo")
+        with self.assertNumQueries(0):
+            response = DummyView.as_view()(request, slug="foo")
+        self.assertIs(response.context_data['object'], community)
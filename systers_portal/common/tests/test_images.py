@@ -0,0 +1,160 @@
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from cities_light.models import City, Country
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from common.constants import TASK_SUCCEEDED
+from common.models import Task
+from common.tasks import claim_tasks, run_task
+from meetup.models import Meetup
+from users.models import SystersUser
+
+
+def create_upload(name, size, image_format='JPEG', orientation=None):
+    image = Image.new('RGB', size, (200, 30, 30))
+    exif = Image.Exif()
+    exif[0x010f] = "Foo camera"
+    if orientation is not None:
+        exif[0x0112] = orientation
+    content = BytesIO()
+    image.save(content, image_format, exif=exif.tobytes())
+    return SimpleUploadedFile(name, content.getvalue())
+
+
+def run_tasks():
+    return [run_task(task_id) for task_id in claim_tasks('foo')]
+
+
+class PictureVariantsTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        media_settings = override_settings(MEDIA_ROOT=self.media_root)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.addCleanup(shutil.rmtree, self.media_root)
+        self.user = User.objects.create_user(username='foo', password='foobar')
+        self.systers_user = SystersUser.objects.get(user=self.user)
+
+    def test_profile_picture_variants(self):
+        """Test creating the square variants of a profile picture in the background"""
+        self.assertFalse(Task.objects.exists())
+        self.systers_user.profile_picture = create_upload('foo.jpg', (300, 200), orientation=6)
+        self.systers_user.save()
+        self.assertEqual(Task.objects.count(), 1)
+        self.assertEqual(run_tasks(), [TASK_SUCCEEDED])
+
+        variants = SystersUser.objects.get(pk=self.systers_user.pk).profile_picture_variants
+        self.assertEqual(variants['source'], self.systers_user.profile_picture.name)
+        self.assertEqual([width for width, _ in variants['webp']], [100, 200])
+        self.assertEqual([width for width, _ in variants['jpeg']], [100, 200])
+        with default_storage.open(variants['jpeg'][1][1]) as variant, \
+                Image.open(variant) as image:
+            self.assertEqual((image.format, image.size), ('JPEG', (200, 200)))
+            self.assertEqual(len(image.getexif()), 0)
+        with default_storage.open(variants['webp'][0][1]) as variant, \
+                Image.open(variant) as image:
+            self.assertEqual((image.format, image.size), ('WEBP', (100, 100)))
+
+        # the variants are up to date, saving the user again queues nothing
+        self.systers_user.save()
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_meetup_picture_variants(self):
+        """Test creating the variants of a meetup picture, which are never enlarged"""
+        country = Country.objects.create(name='Foo', continent='EU')
+        location = City.objects.create(name='Foo', display_name='Foo', country=country)
+        meetup = Meetup.objects.create(title='Foo', slug='foo', date='2026-10-18', time='18:00',
+                                       description='Foo', meetup_location=location,
+                                       leader=self.systers_user,
+                                       meetup_picture=create_upload('foo.png', (800, 400), 'PNG'))
+        self.assertEqual(run_tasks(), [TASK_SUCCEEDED])
+        meetup = Meetup.objects.get(pk=meetup.pk)
+        self.assertEqual([width for width, _ in meetup.meetup_picture_variants['jpeg']],
+                         [320, 640, 800])
+        with default_storage.open(meetup.meetup_picture_variants['jpeg'][0][1]) as variant, \
+                Image.open(variant) as image:
+            self.assertEqual(image.size, (320, 160))
+
+    def test_replace_picture(self):
+        """Test that the variants of a replaced picture are deleted, and that saving an object
+        loaded before its variants were created does not overwrite them"""
+        stale = SystersUser.objects.get(pk=self.systers_user.pk)
+        self.systers_user.profile_picture = create_upload('foo.jpg', (100, 100))
+        self.systers_user.save()
+        run_tasks()
+        old_variants = SystersUser.objects.get(
+            pk=self.systers_user.pk).profile_picture_variants
+        stale.blog_url = 'http://example.com'
+        stale.profile_picture = self.systers_user.profile_picture.name
+        stale.save()
+        self.assertEqual(SystersUser.objects.get(pk=self.systers_user.pk).profile_picture_variants,
+                         old_variants)
+
+        systers_user = SystersUser.objects.get(pk=self.systers_user.pk)
+        systers_user.profile_picture = create_upload('bar.jpg', (100, 100))
+        systers_user.save()
+        run_tasks()
+        variants = SystersUser.objects.get(pk=self.systers_user.pk).profile_picture_variants
+        self.assertEqual(variants['source'], systers_user.profile_picture.name)
+        self.assertFalse(default_storage.exists(old_variants['jpeg'][0][1]))
+        self.assertTrue(default_storage.exists(variants['jpeg'][0][1]))
+
+        systers_user.profile_picture = None
+        systers_user.save()
+        run_tasks()
+        self.assertEqual(
+            SystersUser.objects.get(pk=self.systers_user.pk).profile_picture_variants, {})
+        self.assertFalse(default_storage.exists(variants['jpeg'][0][1]))
+
+    def test_skip_changed_picture(self):
+        """Test that the task of a picture replaced before it ran creates no variants"""
+        self.systers_user.profile_picture = create_upload('foo.jpg', (100, 100))
+        self.systers_user.save()
+        SystersUser.objects.filter(pk=self.systers_user.pk).update(profile_picture='')
+        with self.assertLogs('common.images', level='INFO'):
+            self.assertEqual(run_tasks(), [TASK_SUCCEEDED])
+        self.assertEqual(
+            SystersUser.objects.get(pk=self.systers_user.pk).profile_picture_variants, {})
+
+    def test_picture_tag(self):
+        """Test rendering the srcset of the variants, or the original picture until they are
+        created"""
+        template = Template('{% load pictures %}{% picture systersuser "profile_picture" '
+                            'sizes="100px" alt="Foo" %}')
+        self.systers_user.profile_picture = create_upload('foo.jpg', (300, 300))
+        self.systers_user.save()
+        html = template.render(Context({'systersuser': self.systers_user}))
+        self.assertIn('src="{0}"'.format(self.systers_user.profile_picture.url), html)
+        self.assertNotIn('srcset', html)
+
+        run_tasks()
+        systers_user = SystersUser.objects.get(pk=self.systers_user.pk)
+        html = template.render(Context({'systersuser': systers_user}))
+        webp, jpeg = (systers_user.profile_picture_variants[variant_format]
+                      for variant_format in ('webp', 'jpeg'))
+        self.assertIn('<source type="image/webp" srcset="/media/{0} 100w, /media/{1} 200w, '
+                      '/media/{2} 300w" sizes="100px" />'.format(*(name for _, name in webp)),
+                      html)
+        self.assertIn('<img src="/media/{0}" srcset="/media/{0} 100w, /media/{1} 200w, '
+                      '/media/{2} 300w" sizes="100px" alt="Foo" />'.format(
+                          *(name for _, name in jpeg)), html)
+
+    def test_queue_picture_variants_command(self):
+        """Test queuing the variants of the pictures uploaded before they were created"""
+        self.systers_user.profile_picture = create_upload('foo.jpg', (100, 100))
+        self.systers_user.save()
+        Task.objects.all().delete()
+        User.objects.create_user(username='bar', password='foobar')
+        out = StringIO()
+        call_command('queue_picture_variants', stdout=out)
+        self.assertIn("Queued 1 users.SystersUser.profile_picture picture(s)", out.getvalue())
+        self.assertIn("Queued 0 meetup.Meetup.meetup_picture picture(s)", out.getvalue())
+        self.assertEqual(run_tasks(), [TASK_SUCCEEDED])
@@ -0,0 +1,208 @@
+import datetime
+import socketserver
+import threading
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.mail import EmailMultiAlternatives, send_mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from common.constants import (OUTBOX_PENDING, OUTBOX_SENT, OUTBOX_DEAD, OUTBOX_MAX_ATTEMPTS,
+                              OUTBOX_RETRY_DELAY, OUTBOX_MAX_RETRY_DELAY)
+from common.mail import send_queued_emails, get_delivery_connection
+from common.models import OutgoingEmail
+from common.utils import get_retry_delay
+
+
+class FailingEmailBackend(EmailBackend):
+    """Email backend refusing the messages sent to fail@example.com"""
+
+    def send_messages(self, messages):
+        if any('fail@example.com' in message.recipients() for message in messages):
+            raise ConnectionError("Mail server unavailable")
+        return super(FailingEmailBackend, self).send_messages(messages)
+
+
+class SilentlyFailingEmailBackend(EmailBackend):
+    """Email backend sending none of the messages sent to fail@example.com, without raising"""
+
+    def send_messages(self, messages):
+        if any('fail@example.com' in message.recipients() for message in messages):
+            return 0
+        return super(SilentlyFailingEmailBackend, self).send_messages(messages)
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP server recording the messages it receives"""
+
+    def reply(self, line):
+        self.wfile.write(line.encode('ascii') + b"\r\n")
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 localhost SMTP stand-in")
+        for line in self.rfile:
+            command = line.decode('utf-8').strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self.reply("250 localhost")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                for data in self.rfile:
+                    if data == b".\r\n":
+                        break
+                    lines.append(data)
+                self.server.messages.append(b"".join(lines).decode('utf-8'))
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("250 OK")
+
+
+class SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        socketserver.ThreadingTCPServer.__init__(self, ('127.0.0.1', 0), SMTPHandler)
+        self.connections = 0
+        self.messages = []
+
+
+@override_settings(EMAIL_BACKEND='common.mail.OutboxEmailBackend',
+                   OUTBOX_DELIVERY_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class OutboxTestCase(TestCase):
+    def test_outbox_backend(self):
+        """Test that sent emails are written to the outbox"""
+        self.assertEqual(send_mail("Foo", "Bar", "from@example.com", ["to@example.com"]), 1)
+        message = EmailMultiAlternatives("Baz", "Qux", "from@example.com", ["to@example.com"],
+                                         headers={'Reply-To': 'reply@example.com'})
+        message.attach_alternative("<p>Qux</p>", "text/html")
+        message.attach("foo.bin", b"\x00\xff", "application/octet-stream")
+        message.send()
+        self.assertEqual(len(mail.outbox), 0)
+        email = OutgoingEmail.objects.get(subject="Baz")
+        self.assertEqual(email.status, OUTBOX_PENDING)
+        self.assertEqual(email.to, ["to@example.com"])
+        self.assertEqual(email.alternatives, [["<p>Qux</p>", "text/html"]])
+
+        connection = get_delivery_connection()
+        self.assertEqual(send_queued_emails(connection), (2, 0))
+        self.assertEqual(len(mail.outbox), 2)
+        message = mail.outbox[1]
+        self.assertEqual(message.subject, "Baz")
+        self.assertEqual(message.alternatives, [("<p>Qux</p>", "text/html")])
+        self.assertEqual(message.attachments,
+                         [("foo.bin", b"\x00\xff", "application/octet-stream")])
+        self.assertEqual(message.extra_headers, {'Reply-To': 'reply@example.com'})
+        self.assertFalse(OutgoingEmail.objects.filter(status=OUTBOX_PENDING).exists())
+        self.assertEqual(send_queued_emails(connection), (0, 0))
+
+    def test_outbox_transaction(self):
+        """Test that the emails of a rolled back transaction are not sent"""
+        try:
+            with transaction.atomic():
+                User.objects.create_user(username='foo', password='foobar')
+                send_mail("Foo", "Bar", "from@example.com", ["to@example.com"])
+                raise ValueError
+        except ValueError:
+            pass
+        self.assertFalse(OutgoingEmail.objects.exists())
+
+    def test_get_retry_delay(self):
+        """Test the exponential backoff of failed emails"""
+        self.assertEqual(get_retry_delay(1, OUTBOX_RETRY_DELAY, OUTBOX_MAX_RETRY_DELAY),
+                         datetime.timedelta(minutes=1))
+        self.assertEqual(get_retry_delay(3, OUTBOX_RETRY_DELAY, OUTBOX_MAX_RETRY_DELAY),
+                         datetime.timedelta(minutes=4))
+        self.assertEqual(get_retry_delay(20, OUTBOX_RETRY_DELAY, OUTBOX_MAX_RETRY_DELAY),
+                         datetime.timedelta(hours=6))
+
+    @override_settings(OUTBOX_DELIVERY_BACKEND='common.tests.test_mail.FailingEmailBackend')
+    def test_retry_and_dead_letter(self):
+        """Test that failed emails are retried later and dead-lettered in the end"""
+        send_mail("Foo", "Bar", "from@example.com", ["fail@example.com"])
+        send_mail("Baz", "Qux", "from@example.com", ["to@example.com"])
+        connection = get_delivery_connection()
+        now = timezone.now()
+        with self.assertLogs('common.mail', level='WARNING'):
+            self.assertEqual(send_queued_emails(connection, now=now), (1, 1))
+        self.assertEqual([message.subject for message in mail.outbox], ["Baz"])
+        email = OutgoingEmail.objects.get(subject="Foo")
+        self.assertEqual(email.status, OUTBOX_PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertEqual(email.next_attempt_at, now + get_retry_delay(
+            1, OUTBOX_RETRY_DELAY, OUTBOX_MAX_RETRY_DELAY))
+        self.assertIn("Mail server unavailable", email.last_error)
+        # not retried before its next attempt
+        self.assertEqual(send_queued_emails(connection, now=now), (0, 0))
+
+        for attempt in range(2, OUTBOX_MAX_ATTEMPTS + 1):
+            now += get_retry_delay(attempt - 1, OUTBOX_RETRY_DELAY, OUTBOX_MAX_RETRY_DELAY)
+            with self.assertLogs('common.mail', level='WARNING'):
+                self.assertEqual(send_queued_emails(connection, now=now), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.status, OUTBOX_DEAD)
+        self.assertEqual(email.attempts, OUTBOX_MAX_ATTEMPTS)
+        self.assertEqual(send_queued_emails(connection, now=now + datetime.timedelta(days=1)),
+                         (0, 0))
+
+    @override_settings(
+        OUTBOX_DELIVERY_BACKEND='common.tests.test_mail.SilentlyFailingEmailBackend')
+    def test_retry_unsent(self):
+        """Test that an email the backend did not send is retried instead of marked as sent"""
+        send_mail("Foo", "Bar", "from@example.com", ["fail@example.com"])
+        now = timezone.now()
+        with self.assertLogs('common.mail', level='WARNING'):
+            self.assertEqual(send_queued_emails(get_delivery_connection(), now=now), (0, 1))
+        email = OutgoingEmail.objects.get()
+        self.assertEqual((email.status, email.attempts, email.sent_at), (OUTBOX_PENDING, 1, None))
+        self.assertIn("did not send", email.last_error)
+        self.assertEqual(email.next_attempt_at, now + get_retry_delay(
+            1, OUTBOX_RETRY_DELAY, OUTBOX_MAX_RETRY_DELAY))
+
+
+class SendQueuedEmailsCommandTestCase(TestCase):
+    def setUp(self):
+        self.server = SMTPServer()
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def test_send_queued_emails(self):
+        """Test that the command delivers the outbox over one SMTP connection"""
+        with self.settings(EMAIL_BACKEND='common.mail.OutboxEmailBackend'):
+            for i in range(5):
+                send_mail("Foo {0}".format(i), "Bar", "from@example.com", ["to@example.com"])
+        out = StringIO()
+        with self.settings(EMAIL_BACKEND='common.mail.OutboxEmailBackend',
+                           OUTBOX_DELIVERY_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+                           EMAIL_HOST='127.0.0.1', EMAIL_PORT=self.server.server_address[1],
+                           EMAIL_USE_TLS=False, EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD=''):
+            call_command('send_queued_emails', '--batch-size=2', stdout=out)
+        self.assertIn("Sent 5 email(s), 0 failed", out.getvalue())
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(len(self.server.messages), 5)
+        self.assertIn("Subject: Foo 0", self.server.messages[0])
+        self.assertEqual(OutgoingEmail.objects.filter(status=OUTBOX_SENT).count(), 5)
+
+    @override_settings(EMAIL_BACKEND='common.mail.OutboxEmailBackend')
+    def test_signup_email(self):
+        """Test that the confirmation email of a signup is queued in the outbox"""
+        response = self.client.post(reverse('account_signup'), {
+            'username': 'foo', 'email': 'foo@example.com', 'password1': 'Foobar1!',
+            'password2': 'Foobar1!'})
+        self.assertEqual(response.status_code, 302)
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.to, ['foo@example.com'])
+        self.assertEqual(email.status, OUTBOX_PENDING)
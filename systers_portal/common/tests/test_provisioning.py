@@ -0,0 +1,66 @@
+from django.contrib.auth.models import Group, Permission, User
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+from guardian.shortcuts import get_perms
+
+from common.provisioning import bulk_create_groups, bulk_assign_permissions, get_permissions
+from users.models import SystersUser
+
+
+class ProvisioningTestCase(TestCase):
+    def test_bulk_create_groups(self):
+        """Test creating groups in bulk, keeping the existing ones"""
+        existing = Group.objects.create(name="Foo: Bar")
+        with self.assertNumQueries(2):
+            groups = bulk_create_groups(["Foo: Baz", "Foo: Bar"])
+        self.assertEqual([group.name for group in groups], ["Foo: Baz", "Foo: Bar"])
+        self.assertEqual(groups[1], existing)
+        self.assertEqual(Group.objects.count(), 2)
+
+    def test_get_permissions(self):
+        """Test resolving permission codenames"""
+        permissions = get_permissions(['add_tag', 'add_resourcetype'])
+        self.assertEqual(permissions['add_tag'].codename, 'add_tag')
+        self.assertEqual(permissions['add_resourcetype'].codename, 'add_resourcetype')
+        self.assertRaises(Permission.DoesNotExist, get_permissions, ['add_tag', 'foo'])
+
+    def test_get_permissions_duplicated_codename(self):
+        """Test that a codename existing for two models resolves like the first permission in
+        the default ordering, or to the permission of the given content type"""
+        systersuser_permission = Permission.objects.get(codename='change_systersuser')
+        duplicate = Permission.objects.create(
+            codename='change_systersuser', name='Change Foo',
+            content_type=ContentType.objects.get_for_model(Group))
+        first = Permission.objects.filter(codename='change_systersuser').first()
+        self.assertEqual(first, duplicate)
+        self.assertEqual(get_permissions(['change_systersuser'])['change_systersuser'], first)
+        permissions = get_permissions(['change_systersuser'],
+                                      systersuser_permission.content_type)
+        self.assertEqual(permissions['change_systersuser'], systersuser_permission)
+
+        user = User.objects.create(username='foo', password='foobar')
+        systers_user = SystersUser.objects.get(user=user)
+        group, = bulk_create_groups(["Foo"])
+        bulk_assign_permissions([(group, ['change_systersuser'])], obj=systers_user)
+        self.assertEqual(get_perms(group, systers_user), ['change_systersuser'])
+        bulk_assign_permissions([(group, ['change_systersuser'])])
+        self.assertEqual(list(group.permissions.all()), [duplicate])
+
+    def test_bulk_assign_permissions(self):
+        """Test granting model and object permissions in bulk"""
+        user = User.objects.create(username='foo', password='foobar')
+        systers_user = SystersUser.objects.get(user=user)
+        group, other_group = bulk_create_groups(["Foo", "Bar"])
+        group_codenames = [(group, ['add_tag', 'change_systersuser']),
+                           (other_group, ['change_systersuser'])]
+        bulk_assign_permissions(group_codenames, obj=systers_user,
+                                is_object_permission=lambda perm: not perm.endswith('tag'))
+        self.assertEqual([p.codename for p in group.permissions.all()], ['add_tag'])
+        self.assertEqual(get_perms(group, systers_user), ['change_systersuser'])
+        self.assertEqual(get_perms(other_group, systers_user), ['change_systersuser'])
+
+        # granting the same permissions again is a no-op
+        bulk_assign_permissions(group_codenames, obj=systers_user,
+                                is_object_permission=lambda perm: not perm.endswith('tag'))
+        self.assertEqual(group.permissions.count(), 1)
+        self.assertEqual(get_perms(group, systers_user), ['change_systersuser'])
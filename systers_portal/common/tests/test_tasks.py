@@ -0,0 +1,182 @@
+import datetime
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import OperationalError
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from common.constants import (TASK_PENDING, TASK_RUNNING, TASK_SUCCEEDED, TASK_FAILED,
+                              TASK_RETRY_DELAY, TASK_MAX_RETRY_DELAY)
+from common.models import Task
+from common.tasks import (task, claim_tasks, run_task, requeue_stale_tasks, get_task_function,
+                          get_task_metrics)
+from common.utils import get_retry_delay
+
+calls = []
+
+
+@task
+def record(value):
+    calls.append(value)
+
+
+@task(max_attempts=2)
+def fail():
+    raise ValueError("Foo")
+
+
+@task
+def requeue():
+    later = timezone.now() + datetime.timedelta(seconds=1)
+    requeue_stale_tasks(timeout=0, now=later)
+    claim_tasks('bar', now=later)
+
+
+def not_a_task():
+    pass
+
+
+class TasksTestCase(TestCase):
+    def setUp(self):
+        del calls[:]
+
+    def test_enqueue(self):
+        """Test adding tasks to the queue"""
+        queued = record.enqueue(args=[1])
+        self.assertEqual(queued.name, 'common.tests.test_tasks.record')
+        self.assertEqual(queued.status, TASK_PENDING)
+        self.assertEqual(queued.args, [1])
+        self.assertEqual(get_task_function(queued.name), record)
+        with self.assertRaises(ValueError):
+            get_task_function('common.tests.test_tasks.not_a_task')
+
+    def test_idempotency_key(self):
+        """Test that a task is queued once per idempotency key"""
+        first = record.enqueue(args=[1], idempotency_key='foo')
+        second = record.enqueue(args=[2], idempotency_key='foo')
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(second.args, [1])
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_claim_and_run(self):
+        """Test that due tasks are claimed in order and run once"""
+        now = timezone.now()
+        later = record.enqueue(args=[2], run_at=now + datetime.timedelta(minutes=5))
+        first = record.enqueue(args=[1], run_at=now - datetime.timedelta(seconds=1))
+        self.assertEqual(claim_tasks('foo', now=now), [first.pk])
+        self.assertEqual(claim_tasks('bar', now=now), [])
+        first.refresh_from_db()
+        self.assertEqual((first.status, first.worker), (TASK_RUNNING, 'foo'))
+
+        self.assertEqual(run_task(first.pk), TASK_SUCCEEDED)
+        self.assertEqual(calls, [1])
+        first.refresh_from_db()
+        self.assertEqual(first.attempts, 1)
+        self.assertGreaterEqual(first.run_time, 0)
+        self.assertGreaterEqual(first.wait_time, 1)
+        self.assertEqual(claim_tasks('foo', now=later.run_at), [later.pk])
+
+    def test_retry(self):
+        """Test that failed tasks are retried later, then marked as failed"""
+        failing = fail.enqueue()
+        now = timezone.now()
+        claim_tasks('foo', now=now)
+        with self.assertLogs('common.tasks', level='WARNING'):
+            self.assertEqual(run_task(failing.pk), TASK_PENDING)
+        failing.refresh_from_db()
+        self.assertIn("ValueError: Foo", failing.last_error)
+        self.assertGreater(failing.run_at, now + get_retry_delay(
+            1, TASK_RETRY_DELAY, TASK_MAX_RETRY_DELAY) - datetime.timedelta(seconds=1))
+        self.assertEqual(claim_tasks('foo', now=now), [])
+        claim_tasks('foo', now=failing.run_at)
+        with self.assertLogs('common.tasks', level='WARNING'):
+            self.assertEqual(run_task(failing.pk), TASK_FAILED)
+        self.assertEqual(get_task_metrics()[0]['failed'], 1)
+
+    def test_run_requeued_task(self):
+        """Test that the outcome of a run does not overwrite the claim of another worker"""
+        requeued = requeue.enqueue()
+        claim_tasks('foo')
+        with self.assertLogs('common.tasks', level='WARNING'):
+            run_task(requeued.pk)
+        requeued.refresh_from_db()
+        self.assertEqual((requeued.status, requeued.worker, requeued.attempts),
+                         (TASK_RUNNING, 'bar', 1))
+        self.assertEqual(requeued.last_error, "Abandoned by worker")
+
+    def test_requeue_stale_tasks(self):
+        """Test that tasks abandoned by a worker are requeued, until they run out of attempts"""
+        now = timezone.now()
+        stale = fail.enqueue(run_at=now - datetime.timedelta(hours=3))
+        claim_tasks('foo', now=now - datetime.timedelta(hours=2))
+        self.assertEqual(requeue_stale_tasks(now=now), 1)
+        stale.refresh_from_db()
+        self.assertEqual((stale.status, stale.attempts), (TASK_PENDING, 1))
+        Task.objects.filter(pk=stale.pk).update(run_at=now - datetime.timedelta(hours=3))
+        claim_tasks('foo', now=now - datetime.timedelta(hours=2))
+        self.assertEqual(requeue_stale_tasks(now=now), 0)
+        stale.refresh_from_db()
+        self.assertEqual((stale.status, stale.attempts), (TASK_FAILED, 2))
+
+    def test_task_metrics(self):
+        """Test the timing metrics of the tasks"""
+        for value in range(3):
+            record.enqueue(args=[value])
+        for task_id in claim_tasks('foo'):
+            run_task(task_id)
+        metrics = get_task_metrics()
+        self.assertEqual(len(metrics), 1)
+        self.assertEqual(metrics[0]['name'], 'common.tests.test_tasks.record')
+        self.assertEqual(metrics[0]['finished'], 3)
+        self.assertEqual(metrics[0]['failed'], 0)
+        out = StringIO()
+        call_command('task_metrics', stdout=out)
+        self.assertIn("common.tests.test_tasks.record: 3 finished, 0 failed", out.getvalue())
+
+
+class RunWorkerTestCase(TransactionTestCase):
+    def setUp(self):
+        del calls[:]
+
+    def test_run_worker(self):
+        """Test running the queued tasks in a thread pool"""
+        for value in range(10):
+            record.enqueue(args=[value])
+        fail.enqueue(run_at=timezone.now() + datetime.timedelta(hours=1))
+        out = StringIO()
+        call_command('run_worker', '--once', '--concurrency=3', stdout=out)
+        self.assertEqual(sorted(calls), list(range(10)))
+        self.assertIn("Ran 10 task(s): 10 succeeded", out.getvalue())
+        self.assertEqual(Task.objects.filter(status=TASK_SUCCEEDED).count(), 10)
+        self.assertEqual(Task.objects.filter(status=TASK_PENDING).count(), 1)
+
+    def test_run_worker_error(self):
+        """Test that an error raised outside of a task function does not stop the worker"""
+        for value in range(4):
+            record.enqueue(args=[value])
+        broken = Task.objects.order_by('pk').first().pk
+
+        def run_or_fail(task_id):
+            if task_id == broken:
+                raise OperationalError("Connection lost")
+            return run_task(task_id)
+
+        out = StringIO()
+        with patch('common.management.commands.run_worker.run_task', side_effect=run_or_fail), \
+                self.assertLogs('common.management.commands.run_worker', level='ERROR'):
+            call_command('run_worker', '--once', '--concurrency=2', stdout=out)
+        self.assertIn("Ran 4 task(s): 1 errored, 3 succeeded", out.getvalue())
+        self.assertEqual(sorted(calls), [1, 2, 3])
+        # left running, requeued once it is stale
+        self.assertEqual(Task.objects.get(pk=broken).status, TASK_RUNNING)
+
+    def test_run_worker_processes(self):
+        """Test running the queued tasks in a process pool"""
+        for value in range(4):
+            record.enqueue(args=[value])
+        out = StringIO()
+        call_command('run_worker', '--once', '--pool=process', '--concurrency=2', stdout=out)
+        self.assertIn("Ran 4 task(s): 4 succeeded", out.getvalue())
+        self.assertEqual(Task.objects.filter(status=TASK_SUCCEEDED).count(), 4)
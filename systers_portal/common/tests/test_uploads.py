@@ -0,0 +1,104 @@
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from ckeditor_uploader.utils import storage
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from common.models import EditorUpload
+from common.tests.test_images import create_upload
+from common.uploads import InvalidUpload, store_upload
+from users.models import SystersUser
+
+
+class StoreUploadTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        media_settings = override_settings(MEDIA_ROOT=self.media_root)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.addCleanup(shutil.rmtree, self.media_root)
+        user = User.objects.create_user(username='foo', password='foobar')
+        self.systers_user = SystersUser.objects.get(user=user)
+
+    def test_downscale_photo(self):
+        """Test that a large photo is downscaled, turned upright and stripped of its EXIF data,
+        then recorded in the catalog"""
+        # 3000 pixels high once upright
+        upload = store_upload(create_upload('foo.jpeg', (3000, 2000), orientation=6),
+                              self.systers_user)
+        self.assertRegex(upload.name, r'^uploads/foo/[0-9a-f]{64}\.jpg$')
+        with storage.open(upload.name) as stored, Image.open(stored) as image:
+            self.assertEqual((image.format, image.size), ('JPEG', (1280, 1920)))
+            self.assertEqual(len(image.getexif()), 0)
+        self.assertEqual(upload.thumbnail, upload.name[:-len('.jpg')] + '_thumb.jpg')
+        self.assertTrue(storage.exists(upload.thumbnail))
+        upload = EditorUpload.objects.get(pk=upload.pk)
+        self.assertEqual((upload.owner, upload.original_name), (self.systers_user, 'foo.jpeg'))
+        self.assertEqual((upload.width, upload.height), (1280, 1920))
+        self.assertEqual(upload.size, storage.size(upload.name))
+
+    def test_reencode_screenshot(self):
+        """Test that a screenshot stays a PNG and is not enlarged"""
+        upload = store_upload(create_upload('foo.bmp', (640, 480), 'BMP'), self.systers_user)
+        self.assertTrue(upload.name.endswith('.png'))
+        with storage.open(upload.name) as stored, Image.open(stored) as image:
+            self.assertEqual((image.format, image.size), ('PNG', (640, 480)))
+
+    def test_deduplicate(self):
+        """Test that uploading the same file again reuses the stored file and its catalog entry"""
+        upload = store_upload(create_upload('foo.png', (100, 100), 'PNG'), self.systers_user)
+        self.assertEqual(store_upload(create_upload('bar.png', (100, 100), 'PNG'),
+                                      self.systers_user), upload)
+        self.assertEqual(len(storage.listdir('uploads/foo')[1]), 2)
+        self.assertEqual(EditorUpload.objects.count(), 1)
+        self.assertNotEqual(store_upload(create_upload('foo.png', (100, 101), 'PNG'),
+                                         self.systers_user), upload)
+
+    def test_animated_image(self):
+        """Test that animated images are stored as uploaded"""
+        frames = [Image.new('RGB', (10, 10), color) for color in ('red', 'blue')]
+        content = BytesIO()
+        frames[0].save(content, 'GIF', save_all=True, append_images=frames[1:])
+        upload = store_upload(SimpleUploadedFile('Foo.GIF', content.getvalue()),
+                              self.systers_user)
+        self.assertTrue(upload.name.endswith('.gif'))
+        with storage.open(upload.name) as stored:
+            self.assertEqual(stored.read(), content.getvalue())
+        self.assertEqual((upload.width, upload.height, upload.thumbnail), (10, 10, ""))
+        self.assertEqual(upload.thumbnail_url, upload.url)
+
+    def test_non_image(self):
+        """Test storing a file which is not an image, unless CKEDITOR_ALLOW_NONIMAGE_FILES is
+        False"""
+        upload = store_upload(SimpleUploadedFile('foo.pdf', b'%PDF-1.4 foo'), self.systers_user)
+        self.assertTrue(upload.name.endswith('.pdf'))
+        with storage.open(upload.name) as stored:
+            self.assertEqual(stored.read(), b'%PDF-1.4 foo')
+        self.assertFalse(upload.is_image)
+        self.assertTrue(upload.thumbnail_url.endswith('file-icons/pdf.png'))
+        with override_settings(CKEDITOR_ALLOW_NONIMAGE_FILES=False):
+            with self.assertRaises(InvalidUpload):
+                store_upload(SimpleUploadedFile('foo.pdf', b'%PDF-1.4 foo'), self.systers_user)
+
+    def test_catalog_editor_uploads_command(self):
+        """Test recording the files uploaded before the uploads were catalogued"""
+        upload = store_upload(create_upload('foo.png', (100, 100), 'PNG'), self.systers_user)
+        storage.save('uploads/foo/2020/01/01/bar.png',
+                     ContentFile(create_upload('bar.png', (20, 10), 'PNG').read()))
+        storage.save('uploads/foo/2020/01/01/bar_thumb.png', ContentFile(b'foo'))
+        storage.save('uploads/baz/baz.txt', ContentFile(b'baz'))
+        out = StringIO()
+        call_command('catalog_editor_uploads', stdout=out)
+        self.assertIn("Catalogued 2 upload(s)", out.getvalue())
+        bar = EditorUpload.objects.get(name='uploads/foo/2020/01/01/bar.png')
+        self.assertEqual((bar.owner, bar.width, bar.height), (self.systers_user, 20, 10))
+        self.assertEqual(bar.thumbnail, 'uploads/foo/2020/01/01/bar_thumb.png')
+        baz = EditorUpload.objects.get(name='uploads/baz/baz.txt')
+        self.assertEqual((baz.owner, baz.size, baz.width), (None, 3, None))
+        self.assertEqual(EditorUpload.objects.filter(pk=upload.pk).count(), 1)
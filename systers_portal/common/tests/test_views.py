@@ -1,7 +1,16 @@
+import shutil
+import tempfile
+
+from cities_light.models import City, Country
+from ckeditor_uploader.utils import storage
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.urls import reverse
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
 from django.contrib.auth.models import User
 
+from common.models import EditorUpload
+from common.tests.test_images import create_upload
+
 
 class CommonViewsTestCase(TestCase):
     def setUp(self):
@@ -42,3 +51,117 @@ class CommonViewsTestCase(TestCase):
         self.assertEqual(response.status_code, 302)
         # Log out the user
         self.client.logout()
+
+
+class CityAutocompleteViewTestCase(TestCase):
+    def setUp(self):
+        country = Country.objects.create(name='Portugal', code2='PT', continent='EU')
+        self.lisbon = City.objects.create(name='Lisbon', display_name='Lisbon, Portugal',
+                                          population=500000, country=country)
+        self.lisburn = City.objects.create(name='Lisburn', display_name='Lisburn, Portugal',
+                                           population=45000, country=country)
+
+    def test_city_autocomplete(self):
+        """Test the select2 formatted pages of cities"""
+        url = reverse('city_autocomplete')
+        response = self.client.get(url, {'query': 'lis'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'results': [{'id': self.lisbon.pk, 'text': 'Lisbon, Portugal'},
+                        {'id': self.lisburn.pk, 'text': 'Lisburn, Portugal'}],
+            'pagination': {'more': False}})
+        response = self.client.get(url, {'query': 'lis', 'page': 'foo', 'country': 'BR'})
+        self.assertEqual(response.json(), {'results': [], 'pagination': {'more': False}})
+        response = self.client.get(url)
+        self.assertEqual(response.json(), {'results': [], 'pagination': {'more': False}})
+
+
+class EditorUploadViewTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        media_settings = override_settings(MEDIA_ROOT=self.media_root)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.addCleanup(shutil.rmtree, self.media_root)
+        User.objects.create_user(username='foo', password='foobar')
+        self.client = Client(enforce_csrf_checks=True)
+        self.url = reverse('ckeditor_upload')
+
+    def test_upload(self):
+        """Test uploading an image from the editor"""
+        response = self.client.post(self.url, {'upload': create_upload('foo.jpg', (10, 10))})
+        self.assertEqual(response.status_code, 403)
+
+        self.client.login(username='foo', password='foobar')
+        response = self.client.post(self.url, {'upload': create_upload('foo.jpg', (10, 10))})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['uploaded'], 1)
+        self.assertRegex(data['url'], r'^/media/uploads/foo/[0-9a-f]{64}\.jpg$')
+        self.assertTrue(storage.exists(data['url'][len('/media/'):]))
+
+        response = self.client.post(self.url + '?CKEditorFuncNum=2',
+                                    {'upload': create_upload('foo.jpg', (10, 10))})
+        self.assertEqual(response['X-Frame-Options'], 'SAMEORIGIN')
+        self.assertContains(response, "callFunction(2, '{0}', '')".format(data['url']))
+
+    def test_upload_error(self):
+        """Test the errors reported back to the editor"""
+        self.client.login(username='foo', password='foobar')
+        response = self.client.post(self.url)
+        self.assertEqual(response.json(),
+                         {'uploaded': 0, 'error': {'message': "No file was uploaded."}})
+        with self.settings(CKEDITOR_ALLOW_NONIMAGE_FILES=False):
+            response = self.client.post(self.url + '?CKEditorFuncNum=2',
+                                        {'upload': SimpleUploadedFile('foo.txt', b'foo')})
+            self.assertContains(response, "callFunction(2, '', 'Invalid file type.')")
+
+
+class EditorBrowseViewTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='foo', password='foobar')
+        other = User.objects.create_user(username='bar', password='foobar')
+        for index in range(45):
+            EditorUpload.objects.create(owner=self.user.systersuser,
+                                        name='uploads/foo/{0}.jpg'.format(index),
+                                        original_name='foo{0}.jpg'.format(index),
+                                        thumbnail='uploads/foo/{0}_thumb.jpg'.format(index),
+                                        size=1000, width=10, height=10)
+        EditorUpload.objects.create(owner=other.systersuser, name='uploads/bar/bar.pdf',
+                                    original_name='bar.pdf', size=1000)
+        self.url = reverse('ckeditor_browse')
+
+    def test_browse(self):
+        """Test listing the uploads of the user page by page, from the catalog"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+
+        self.client.login(username='foo', password='foobar')
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url, {'CKEditorFuncNum': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'common/editor_browse.html')
+        self.assertIn('no-cache', response['Cache-Control'])
+        uploads = response.context['uploads']
+        self.assertEqual(len(uploads), 40)
+        self.assertEqual(uploads[0].name, 'uploads/foo/44.jpg')
+        self.assertContains(response, 'src="/media/uploads/foo/44_thumb.jpg"')
+        self.assertContains(response, 'href="?CKEditorFuncNum=1&amp;page=2"')
+        self.assertNotContains(response, 'bar.pdf')
+
+        response = self.client.get(self.url, {'CKEditorFuncNum': 1, 'page': 2})
+        self.assertEqual([upload.name for upload in response.context['uploads']],
+                         ['uploads/foo/{0}.jpg'.format(index) for index in range(4, -1, -1)])
+
+        response = self.client.get(self.url, {'q': 'FOO4'})
+        self.assertEqual(len(response.context['uploads']), 6)
+
+    def test_browse_superuser(self):
+        """Test that superusers browse the uploads of all the users"""
+        User.objects.create_superuser(username='admin', password='foobar',
+                                      email='admin@example.com')
+        self.client.login(username='admin', password='foobar')
+        response = self.client.get(self.url, {'q': 'bar'})
+        self.assertEqual([upload.name for upload in response.context['uploads']],
+                         ['uploads/bar/bar.pdf'])
+        self.assertContains(response, 'file-icons/pdf.png')
@@ -0,0 +1,43 @@
+from cities_light.models import City, Country
+from django import forms
+from django.test import TestCase
+
+from common.widgets import CityAutocompleteWidget
+
+
+class CityForm(forms.Form):
+    city = forms.ModelChoiceField(queryset=City.objects.all(),
+                                  widget=CityAutocompleteWidget(country='PT'))
+
+
+class CityAutocompleteWidgetTestCase(TestCase):
+    def setUp(self):
+        country = Country.objects.create(name='Portugal', code2='PT', continent='EU')
+        self.lisbon = City.objects.create(name='Lisbon', display_name='Lisbon, Portugal',
+                                          country=country)
+        self.porto = City.objects.create(name='Porto', display_name='Porto, Portugal',
+                                         country=country)
+
+    def test_render_without_value(self):
+        """Test that no city is loaded when the field is empty"""
+        with self.assertNumQueries(0):
+            html = str(CityForm()['city'])
+        self.assertIn('data-autocomplete-url="/cities/autocomplete/"', html)
+        self.assertIn('data-country="PT"', html)
+        self.assertNotIn('Lisbon', html)
+        self.assertNotIn('Porto', html)
+
+    def test_render_selected_city(self):
+        """Test that only the selected city is rendered"""
+        form = CityForm(initial={'city': self.porto.pk})
+        with self.assertNumQueries(1):
+            html = str(form['city'])
+        self.assertIn('<option value="{0}" selected>Porto, Portugal</option>'.format(
+            self.porto.pk), html)
+        self.assertNotIn('Lisbon', html)
+
+    def test_render_invalid_value(self):
+        """Test rendering a submitted value that is not a city"""
+        form = CityForm(data={'city': 'foo'})
+        self.assertFalse(form.is_valid())
+        self.assertNotIn('Porto', str(form['city']))
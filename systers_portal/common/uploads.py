@@ -0,0 +1,183 @@
+import hashlib
+import math
+import os
+from io import BytesIO
+
+from ckeditor_uploader.utils import get_thumb_filename, storage
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from common.constants import (UPLOAD_IMAGE_MAX_WIDTH, UPLOAD_IMAGE_QUALITY,
+                              UPLOAD_THUMBNAIL_SIZE, UPLOAD_IMAGE_FORMATS,
+                              UPLOAD_DEFAULT_IMAGE_FORMAT)
+from common.models import EditorUpload
+
+
+class InvalidUpload(Exception):
+    """The uploaded file can't be stored"""
+
+
+def get_upload_directory(user):
+    """Directory the editor uploads of a user are stored in, the per user directory the editor's
+    image browser lists for them
+
+    :param user: User object
+    :return: string path in the upload storage
+    """
+    return os.path.join(settings.CKEDITOR_UPLOAD_PATH, user.get_username())
+
+
+def get_content_hash(uploaded_file):
+    """Hash the content of an uploaded file, reading it by chunks
+
+    :param uploaded_file: UploadedFile object
+    :return: string hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    for chunk in uploaded_file.chunks():
+        digest.update(chunk)
+    uploaded_file.seek(0)
+    return digest.hexdigest()
+
+
+def open_image(uploaded_file):
+    """Open an uploaded file as an image, without decoding its pixels
+
+    :param uploaded_file: UploadedFile object
+    :return: Image object, None if the file is not an image
+    """
+    try:
+        return Image.open(uploaded_file)
+    except (OSError, Image.DecompressionBombError):
+        uploaded_file.seek(0)
+        return None
+
+
+def encode_image(image, max_width=UPLOAD_IMAGE_MAX_WIDTH):
+    """Downscale a still image to a maximum width, apply its EXIF orientation and re-encode it.
+    The EXIF data, which may locate where a photo was taken, is left out.
+
+    :param image: Image object, as opened from the upload
+    :param max_width: int maximum width in pixels
+    :return: bytes content of the encoded image
+    """
+    pillow_format = UPLOAD_IMAGE_FORMATS.get(image.format, UPLOAD_DEFAULT_IMAGE_FORMAT)[0]
+    # rotated by a quarter turn once upright for these orientations
+    upright_width = image.height if image.getexif().get(0x0112) in (5, 6, 7, 8) else image.width
+    if upright_width > max_width:
+        # JPEGs are decoded at the smallest scale larger than the target, which is much faster
+        # than decoding the whole photo and resizing it
+        scale = max_width / upright_width
+        image.draft(image.mode, (math.ceil(image.width * scale), math.ceil(image.height * scale)))
+    image = ImageOps.exif_transpose(image)
+    if image.width > max_width:
+        height = max(round(image.height * max_width / image.width), 1)
+        image = image.resize((max_width, height), Image.LANCZOS)
+    content = BytesIO()
+    if pillow_format == 'JPEG':
+        image.convert('RGB').save(content, pillow_format, quality=UPLOAD_IMAGE_QUALITY,
+                                  optimize=True, progressive=True)
+    elif pillow_format == 'WEBP':
+        image.save(content, pillow_format, quality=UPLOAD_IMAGE_QUALITY, method=6)
+    else:
+        if image.mode not in ('1', 'L', 'LA', 'P', 'RGB', 'RGBA'):
+            image = image.convert('RGBA')
+        image.save(content, pillow_format, optimize=True)
+    return content.getvalue()
+
+
+def create_thumbnail(content, name):
+    """Save the thumbnail the editor's image browser shows for an uploaded image
+
+    :param content: bytes content of the stored image
+    :param name: string name of the stored image
+    :return: string name of the thumbnail
+    """
+    with Image.open(BytesIO(content)) as image:
+        image.thumbnail(UPLOAD_THUMBNAIL_SIZE, Image.LANCZOS)
+        thumbnail = BytesIO()
+        image.convert('RGB').save(thumbnail, 'JPEG', quality=UPLOAD_IMAGE_QUALITY, optimize=True)
+    return storage.save(get_thumb_filename(name), ContentFile(thumbnail.getvalue()))
+
+
+def get_image_size(name):
+    """Read the dimensions of a stored image
+
+    :param name: string name of the file in the upload storage
+    :return: tuple (int width, int height), None if the file is not an image
+    """
+    try:
+        with storage.open(name) as stored, Image.open(stored) as image:
+            return image.size
+    except (OSError, Image.DecompressionBombError):
+        return None
+
+
+def catalog_file(name, owner=None, original_name="", created_at=None):
+    """Record a stored file in the catalog of the editor uploads, unless it is already. Its size,
+    dimensions and thumbnail are read from the storage.
+
+    :param name: string name of the file in the upload storage
+    :param owner: SystersUser object who uploaded the file
+    :param original_name: string name of the file as uploaded
+    :param created_at: aware datetime the file was uploaded, now by default
+    :return: EditorUpload object
+    """
+    upload = EditorUpload.objects.filter(name=name).first()
+    if upload is not None:
+        return upload
+    image_size = get_image_size(name)
+    thumbnail = get_thumb_filename(name)
+    upload, _ = EditorUpload.objects.get_or_create(name=name, defaults={
+        'owner': owner, 'original_name': original_name, 'size': storage.size(name),
+        'width': image_size[0] if image_size else None,
+        'height': image_size[1] if image_size else None,
+        'thumbnail': thumbnail if image_size and storage.exists(thumbnail) else "",
+        'created_at': created_at or timezone.now()})
+    return upload
+
+
+def store_upload(uploaded_file, owner):
+    """Store a file uploaded in the rich text editor and record it in the catalog of the
+    uploads. Still images are downscaled and re-encoded, other files are stored as uploaded. The
+    files are named after the hash of their uploaded content, so uploading the same file again
+    reuses the stored file instead of adding a copy.
+
+    :param uploaded_file: UploadedFile object
+    :param owner: SystersUser object uploading the file
+    :return: EditorUpload object
+    :raises InvalidUpload: if the file is not an image and CKEDITOR_ALLOW_NONIMAGE_FILES is False
+    """
+    directory = get_upload_directory(owner.user)
+    content_hash = get_content_hash(uploaded_file)
+    image = open_image(uploaded_file)
+    if image is None and not getattr(settings, 'CKEDITOR_ALLOW_NONIMAGE_FILES', True):
+        raise InvalidUpload("Invalid file type.")
+    if image is None or getattr(image, 'is_animated', False):
+        # the image is not closed, closing it would close the upload it reads
+        extension = os.path.splitext(uploaded_file.name)[1].lower()
+        name = os.path.join(directory, content_hash + extension)
+        if not storage.exists(name):
+            # saved by chunks, a large upload is never loaded in memory
+            name = storage.save(name, uploaded_file)
+        return catalog_file(name, owner, uploaded_file.name)
+
+    with image:
+        # the extension depends on the format only, a duplicate is found without decoding it
+        extension = UPLOAD_IMAGE_FORMATS.get(image.format, UPLOAD_DEFAULT_IMAGE_FORMAT)[1]
+        name = os.path.join(directory, "{0}.{1}".format(content_hash, extension))
+        if storage.exists(name):
+            return catalog_file(name, owner, uploaded_file.name)
+        try:
+            content = encode_image(image)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            raise InvalidUpload("The image could not be read.")
+    name = storage.save(name, ContentFile(content))
+    with Image.open(BytesIO(content)) as encoded:
+        width, height = encoded.size
+    upload, _ = EditorUpload.objects.get_or_create(name=name, defaults={
+        'owner': owner, 'original_name': uploaded_file.name, 'size': len(content),
+        'width': width, 'height': height, 'thumbnail': create_thumbnail(content, name)})
+    return upload
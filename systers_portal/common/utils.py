@@ -0,0 +1,13 @@
+import datetime
+
+
+def get_retry_delay(attempts, delay, max_delay):
+    """Get the delay before retrying a failed operation, doubled after each failed attempt up
+    to a maximum
+
+    :param attempts: int number of failed attempts
+    :param delay: int seconds before the first retry
+    :param max_delay: int maximum seconds between two attempts
+    :return: timedelta
+    """
+    return datetime.timedelta(seconds=min(delay * 2 ** (attempts - 1), max_delay))
@@ -1,6 +1,18 @@
-from django.views.generic import TemplateView
-from django.views.decorators.cache import cache_control
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.http import HttpResponse, JsonResponse
+from django.utils.decorators import method_decorator
+from django.utils.html import escapejs
+from django.views.generic import ListView, TemplateView, View
+from django.views.decorators.cache import cache_control, never_cache
+from django.views.decorators.clickjacking import xframe_options_sameorigin
+from django.views.decorators.csrf import csrf_exempt
 from allauth.account.views import LogoutView
+from braces.views import LoginRequiredMixin
+
+from common.cities import search_cities
+from common.constants import UPLOAD_BROWSE_PAGE_SIZE
+from common.models import EditorUpload
+from common.uploads import InvalidUpload, store_upload
 
 
 class IndexView(TemplateView):
@@ -27,3 +39,78 @@ class Logout(LogoutView):
 
     def post(self, *args, **kwargs):
         return super().post(*args, **kwargs)
+
+
+class CityAutocompleteView(View):
+    """Paginated city autocomplete for the City fields and the meetup location search. The
+    response follows the format expected by select2."""
+
+    def get(self, request):
+        try:
+            page = max(int(request.GET.get('page', 1)), 1)
+        except ValueError:
+            page = 1
+        cities, has_more = search_cities(request.GET.get('query'),
+                                         country=request.GET.get('country'), page=page)
+        return JsonResponse({'results': [{'id': pk, 'text': label} for pk, label in cities],
+                             'pagination': {'more': has_more}})
+
+
+# the upload dialog of the editor posts from an iframe without the CSRF token, and reads the
+# response in that iframe
+@method_decorator(csrf_exempt, name='dispatch')
+@method_decorator(xframe_options_sameorigin, name='dispatch')
+class EditorUploadView(LoginRequiredMixin, View):
+    """Store a file uploaded in the rich text editor, see common.uploads.store_upload, and send
+    its URL back to the editor"""
+    raise_exception = True
+
+    def post(self, request):
+        # the upload is streamed to a temporary file whatever its size, instead of in memory
+        request.upload_handlers = [TemporaryFileUploadHandler(request)]
+        uploaded_file = request.FILES.get('upload')
+        try:
+            if uploaded_file is None:
+                raise InvalidUpload("No file was uploaded.")
+            upload = store_upload(uploaded_file, request.user.systersuser)
+        except InvalidUpload as error:
+            return self.respond(error=str(error))
+        return self.respond(url=upload.url, name=upload.name)
+
+    def respond(self, url="", name="", error=""):
+        func_num = self.request.GET.get('CKEditorFuncNum', "")
+        if func_num.isdigit():
+            # the upload tab of the image dialog expects a script calling back the editor
+            return HttpResponse(
+                "<script type='text/javascript'>window.parent.CKEDITOR.tools.callFunction("
+                "{0}, '{1}', '{2}');</script>".format(func_num, escapejs(url), escapejs(error)))
+        if error:
+            return JsonResponse({'uploaded': 0, 'error': {'message': error}})
+        return JsonResponse({'uploaded': 1, 'url': url, 'fileName': name.rsplit('/', 1)[-1]})
+
+
+@method_decorator(never_cache, name='dispatch')
+class EditorBrowseView(LoginRequiredMixin, ListView):
+    """File browser of the rich text editor, listing the uploads of the user, or of all the users
+    for superusers, page by page from the catalog of the uploads"""
+    template_name = "common/editor_browse.html"
+    context_object_name = "uploads"
+    paginate_by = UPLOAD_BROWSE_PAGE_SIZE
+
+    def get_queryset(self):
+        uploads = EditorUpload.objects.order_by('-created_at', '-id')
+        if not self.request.user.is_superuser:
+            uploads = uploads.filter(owner__user=self.request.user)
+        query = self.request.GET.get('q', "").strip()
+        if query:
+            uploads = uploads.filter(original_name__icontains=query)
+        return uploads
+
+    def get_context_data(self, **kwargs):
+        context = super(EditorBrowseView, self).get_context_data(**kwargs)
+        # kept in the links to the other pages
+        params = self.request.GET.copy()
+        params.pop('page', None)
+        context['query'] = self.request.GET.get('q', "")
+        context['params'] = params.urlencode()
+        return context
@@ -0,0 +1,40 @@
+from django import forms
+from django.urls import reverse
+
+
+class CityAutocompleteWidget(forms.Select):
+    """Select widget for City fields that renders only the selected city. The other cities are
+    fetched from the city autocomplete endpoint as the user types, so rendering the field does
+    not load the whole City table."""
+
+    def __init__(self, attrs=None, country=None):
+        """
+        :param attrs: dict HTML attributes of the select
+        :param country: string ISO code of the country the suggestions are restricted to
+        """
+        super(CityAutocompleteWidget, self).__init__(attrs)
+        self.country = country
+
+    def get_context(self, name, value, attrs):
+        context = super(CityAutocompleteWidget, self).get_context(name, value, attrs)
+        widget_attrs = context['widget']['attrs']
+        widget_attrs['data-autocomplete-url'] = reverse('city_autocomplete')
+        if self.country:
+            widget_attrs['data-country'] = self.country
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        """Build the empty option and the options of the selected cities only"""
+        default = (None, [], 0)
+        options = default[1]
+        options.append(self.create_option(name, '', '', not any(value), 0))
+        selected_values = [v for v in value if v not in self.choices.field.empty_values]
+        try:
+            cities = list(self.choices.queryset.filter(pk__in=selected_values))
+        except (TypeError, ValueError):
+            # the submitted value is not a City primary key, the field reports the error
+            cities = []
+        for city in cities:
+            label = self.choices.field.label_from_instance(city)
+            options.append(self.create_option(name, city.pk, label, True, len(options)))
+        return [default]
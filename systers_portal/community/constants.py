@@ -7,6 +7,16 @@ COMMUNITY_ADMIN = "{0}: Community Admin"
 # community
 DEFAULT_COMMUNITY_ACTIVE_PAGE = 'news'
 
+# cache key of the list of communities displayed in the navigation bar
+COMMUNITIES_NAVIGATION_CACHE_KEY = 'community:navigation'
+
+# community search: maximum number of results returned to the search box and caching of the
+# results, keyed by a generation bumped whenever a community changes and by the normalized query
+COMMUNITY_SEARCH_LIMIT = 20
+COMMUNITY_SEARCH_GENERATION_CACHE_KEY = 'community:search:generation'
+COMMUNITY_SEARCH_CACHE_KEY = 'community:search:{0}:{1}:{2}'
+COMMUNITY_SEARCH_CACHE_TIMEOUT = 60 * 60
+
 COMMUNITY_PRESENCE_CHOICES = [
     ('Facebook Page', 'Facebook Page'),
     ('Facebook Group', 'Facebook Group'),
@@ -1,9 +1,9 @@
-from community.models import Community
+from community.utils import get_navigation_communities
 
 
 def communities_processor(request):
     """Custom template context preprocessor that allows to inject into every
     request the list of all communities. This is necessary in order to display
-    the list of communities in the navigation bar."""
-    communities = Community.objects.all().order_by("order")
-    return {'communities': communities}
+    the list of communities in the navigation bar. The list is cached, so in
+    steady state it costs no queries."""
+    return {'communities': get_navigation_communities()}
@@ -1,9 +1,9 @@
 from django import forms
 from django.forms import ValidationError
-from django.contrib.auth.models import Group
 
 from common.forms import ModelFormWithHelper
 from common.helpers import SubmitCancelFormHelper
+from common.widgets import CityAutocompleteWidget
 from community.constants import COMMUNITY_ADMIN, COMMUNITY_PRESENCE_CHOICES
 from community.models import Community, CommunityPage, RequestCommunity
 from community.utils import get_groups
@@ -18,6 +18,7 @@ class AddCommunityForm(ModelFormWithHelper):
         fields = ('name', 'slug', 'order', 'location', 'email', 'mailing_list',
                   'parent_community', 'website', 'facebook', 'googleplus',
                   'twitter')
+        widgets = {'location': CityAutocompleteWidget}
         helper_class = SubmitCancelFormHelper
         helper_cancel_href = "{% url 'index' %}"
 
@@ -61,6 +62,7 @@ class RequestCommunityForm(ModelFormWithHelper):
                   'demographic_target_count',
                   'purpose', 'is_avail_volunteer', 'count_avail_volunteer', 'content_developer',
                   'selection_criteria', 'is_real_time')
+        widgets = {'location': CityAutocompleteWidget}
         helper_class = SubmitCancelFormHelper
         helper_cancel_href = "{% url 'index' %}"
 
@@ -105,7 +107,8 @@ class EditCommunityRequestForm(ModelFormWithHelper):
                   'demographic_target_count',
                   'purpose', 'is_avail_volunteer', 'count_avail_volunteer', 'content_developer',
                   'selection_criteria', 'is_real_time')
-        widgets = {'social_presence': forms.CheckboxSelectMultiple}
+        widgets = {'social_presence': forms.CheckboxSelectMultiple,
+                   'location': CityAutocompleteWidget}
         helper_class = SubmitCancelFormHelper
         helper_cancel_href = "{% url 'view_community_request' community_request.slug %}"
 
@@ -151,6 +154,7 @@ class EditCommunityForm(ModelFormWithHelper):
         fields = ('name', 'slug', 'order', 'location', 'email', 'mailing_list',
                   'parent_community', 'website', 'facebook', 'googleplus',
                   'twitter')
+        widgets = {'location': CityAutocompleteWidget}
         helper_class = SubmitCancelFormHelper
         helper_cancel_href = "{% url 'view_community_profile' " \
                              "community.slug %}"
@@ -207,10 +211,8 @@ class PermissionGroupsForm(forms.Form):
 
         # get all community groups and remove community admin group
         # from the list of choices
-        self.groups = list(get_groups(community.name))
-        admin_group = Group.objects.get(
-            name=COMMUNITY_ADMIN.format(community.name))
-        self.groups.remove(admin_group)
+        self.groups = list(get_groups(community).exclude(
+            name=COMMUNITY_ADMIN.format(community.name)))
         choices = [(group.pk, group.name) for group in self.groups]
         self.fields['groups'] = forms. \
             MultipleChoiceField(choices=choices, label="", required=False,
@@ -229,7 +231,6 @@ class PermissionGroupsForm(forms.Form):
             if member_group.pk not in group_pks:
                 self.user.leave_group(member_group)
 
-        for pk in group_pks:
-            group = Group.objects.get(pk=pk)
-            if not self.user.is_group_member(group.name):
+        for group in self.groups:
+            if group.pk in group_pks and group not in self.member_groups:
                 self.user.join_group(group)
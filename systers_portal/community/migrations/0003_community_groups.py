@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+# names of the groups of a community when this migration was written, a prefix match would
+# also bind the groups of a meetup or of a community whose name starts with the same words
+COMMUNITY_GROUP_NAMES = ("{0}: Content Contributor", "{0}: Content Manager",
+                         "{0}: User and Content Manager", "{0}: Community Admin")
+
+
+def link_community_groups(apps, schema_editor):
+    """Bind the existing groups, named "<community name>: <role>", to their community"""
+    Community = apps.get_model('community', 'Community')
+    Group = apps.get_model('auth', 'Group')
+    for community in Community.objects.all():
+        community.groups.set(Group.objects.filter(
+            name__in=[name.format(community.name) for name in COMMUNITY_GROUP_NAMES]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('community', '0002_auto_20200724_2045'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='community',
+            name='groups',
+            field=models.ManyToManyField(blank=True, editable=False, related_name='communities', to='auth.Group', verbose_name='Groups'),
+        ),
+        migrations.RunPython(link_community_groups, migrations.RunPython.noop),
+    ]
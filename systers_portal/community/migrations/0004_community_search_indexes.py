@@ -0,0 +1,28 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """Trigram indexes serving the case insensitive containment lookups of the community search,
+    which compare UPPER() of the columns"""
+
+    dependencies = [
+        ('cities_light', '0009_add_subregion'),
+        ('community', '0003_community_groups'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunSQL(
+            'CREATE INDEX community_name_trgm_idx ON community_community '
+            'USING gin (UPPER(name) gin_trgm_ops);',
+            'DROP INDEX community_name_trgm_idx;'),
+        migrations.RunSQL(
+            'CREATE INDEX community_slug_trgm_idx ON community_community '
+            'USING gin (UPPER(slug) gin_trgm_ops);',
+            'DROP INDEX community_slug_trgm_idx;'),
+        migrations.RunSQL(
+            'CREATE INDEX community_city_name_trgm_idx ON cities_light_city '
+            'USING gin (UPPER(name) gin_trgm_ops);',
+            'DROP INDEX community_city_name_trgm_idx;'),
+    ]
@@ -24,6 +24,9 @@ class Community(models.Model):
     members = models.ManyToManyField(SystersUser, blank=True,
                                      related_name='communities',
                                      verbose_name="Members")
+    groups = models.ManyToManyField(Group, blank=True, editable=False,
+                                    related_name='communities',
+                                    verbose_name="Groups")
     admin = models.ForeignKey(SystersUser, related_name='community',
                               verbose_name="Community admin", on_delete=models.CASCADE)
     parent_community = models.ForeignKey('self', blank=True, null=True,
@@ -37,6 +40,7 @@ class Community(models.Model):
     twitter = models.URLField(max_length=255, blank=True,
                               verbose_name="Twitter")
     __original_name = None
+    __original_admin_id = None
     __original_admin = None
 
     class Meta:
@@ -66,15 +70,28 @@ class Community(models.Model):
     def __init__(self, *args, **kwargs):
         super(Community, self).__init__(*args, **kwargs)
         self.__original_name = self.name
-        if self.admin_id is not None:
-            self.__original_admin = self.admin
+        self.__original_admin_id = self.admin_id
 
     @property
     def original_name(self):
         return self.__original_name
 
+    @property
+    def original_admin_id(self):
+        return self.__original_admin_id
+
     @property
     def original_admin(self):
+        """The admin the community had when it was loaded. It is fetched from
+        the database only on first access."""
+        if self.__original_admin_id is None:
+            return None
+        if self.__original_admin is None:
+            if self.__original_admin_id == self.admin_id:
+                self.__original_admin = self.admin
+            else:
+                self.__original_admin = SystersUser.objects.get(
+                    pk=self.__original_admin_id)
         return self.__original_admin
 
     def get_absolute_url(self):
@@ -93,7 +110,7 @@ class Community(models.Model):
 
         :return: True if community changed admin, False otherwise
         """
-        return self.admin != self.original_admin
+        return self.admin_id != self.original_admin_id
 
     def add_member(self, systers_user):
         """Add community member
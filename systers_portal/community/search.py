@@ -0,0 +1,74 @@
+import hashlib
+
+from django.contrib.postgres.search import TrigramSimilarity
+from django.core.cache import cache
+from django.db.models import Q
+from django.urls import reverse
+
+from common.cache import bump_generation, get_cache_timeout, get_generation
+from community.constants import (COMMUNITY_SEARCH_LIMIT, COMMUNITY_SEARCH_CACHE_KEY,
+                                 COMMUNITY_SEARCH_CACHE_TIMEOUT,
+                                 COMMUNITY_SEARCH_GENERATION_CACHE_KEY)
+from community.models import Community
+
+
+def normalize_query(query):
+    """Normalize a search query so that equivalent queries share their cached results
+
+    :param query: string typed in the search box
+    :return: string query, lowercased like the search box does before comparing it with the
+             query of a response, without surrounding or repeated whitespace
+    """
+    return " ".join((query or "").split()).lower()
+
+
+def get_search_queryset(query):
+    """Get the communities whose name, slug or location contains the query. The containment
+    lookups are served by the trigram indexes on these columns. Results are ordered by the
+    similarity of their name to the query, then by community order.
+
+    :param query: string normalized query, all communities are returned if it is empty
+    :return: Community QuerySet
+    """
+    communities = Community.objects.select_related('location')
+    if not query:
+        return communities.order_by('order')
+    return communities.filter(
+        Q(name__icontains=query) | Q(slug__icontains=query) | Q(location__name__icontains=query)
+    ).annotate(similarity=TrigramSimilarity('name', query)).order_by('-similarity', 'order')
+
+
+def search_communities(query, limit=COMMUNITY_SEARCH_LIMIT):
+    """Search communities for the search box. Results are cached per normalized query until a
+    community is saved or deleted.
+
+    :param query: string typed in the search box
+    :param limit: int maximum number of results
+    :return: dict with the normalized query, a list of compact results (name, slug, url,
+             location and coordinates) and whether more communities match the query
+    """
+    query = normalize_query(query)
+    digest = hashlib.md5(query.encode('utf-8')).hexdigest()
+    key = COMMUNITY_SEARCH_CACHE_KEY.format(
+        get_generation(COMMUNITY_SEARCH_GENERATION_CACHE_KEY), limit, digest)
+    data = cache.get(key)
+    if data is not None:
+        return data
+
+    rows = list(get_search_queryset(query).values_list(
+        'name', 'slug', 'location__name', 'location__latitude', 'location__longitude'
+    )[:limit + 1])
+    results = [{'name': name, 'slug': slug,
+                'url': reverse('view_community_landing', kwargs={'slug': slug}),
+                'location': location,
+                'lat': None if latitude is None else float(latitude),
+                'lng': None if longitude is None else float(longitude)}
+               for name, slug, location, latitude, longitude in rows[:limit]]
+    data = {'query': query, 'results': results, 'has_more': len(rows) > limit}
+    cache.set(key, data, get_cache_timeout(COMMUNITY_SEARCH_CACHE_TIMEOUT))
+    return data
+
+
+def clear_community_search():
+    """Invalidate all the cached community search results"""
+    bump_generation(COMMUNITY_SEARCH_GENERATION_CACHE_KEY)
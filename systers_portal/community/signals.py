@@ -1,12 +1,12 @@
-from django.contrib.auth.models import Group
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save, post_delete, pre_delete
 from django.dispatch import receiver
 from django.shortcuts import get_object_or_404
 
 from community.constants import COMMUNITY_ADMIN
 from community.utils import (create_groups, assign_permissions, remove_groups,
-                             rename_groups)
+                             rename_groups, get_groups, clear_navigation_communities)
 from community.permissions import (groups_templates, group_permissions)
+from community.search import clear_community_search
 
 
 @receiver(post_save, sender='community.Community',
@@ -18,28 +18,46 @@ def manage_community_groups(sender, instance, created, **kwargs):
         groups = create_groups(name, groups_templates)
         assign_permissions(
             instance, groups, groups_templates, group_permissions)
+        instance.groups.add(*groups)
         community_admin_group = next(
             g for g in groups if g.name == COMMUNITY_ADMIN.format(name))
         instance.admin.join_group(community_admin_group)
         instance.add_member(instance.admin)
-        instance.save()
     else:
         if name != instance.original_name and instance.original_name:
-            rename_groups(instance.original_name, instance.name)
-        if instance.admin != instance.original_admin and \
-           instance.original_admin is not None:
-            community_admin_group = \
-                get_object_or_404(Group, name=COMMUNITY_ADMIN.format(name))
+            rename_groups(instance, instance.original_name, instance.name)
+        if instance.has_changed_admin() and \
+           instance.original_admin_id is not None:
+            community_admin_group = get_object_or_404(
+                get_groups(instance), name=COMMUNITY_ADMIN.format(name))
             instance.original_admin.leave_group(
                 community_admin_group)
             instance.admin.join_group(community_admin_group)
-            if instance.admin not in instance.members.all():
+            if not instance.members.filter(pk=instance.admin_id).exists():
                 instance.add_member(instance.admin)
-                instance.save()
 
 
-@receiver(post_delete, sender='community.Community',
+@receiver(pre_delete, sender='community.Community',
           dispatch_uid="remove_groups")
 def remove_community_groups(sender, instance, **kwargs):
-    """Remove user groups for a particular Community instance"""
-    remove_groups(instance.name)
+    """Remove user groups for a particular Community instance, before the
+    community to groups mapping is deleted with it"""
+    remove_groups(instance)
+
+
+@receiver(post_save, sender='community.Community',
+          dispatch_uid="clear_navigation_cache_on_save")
+@receiver(post_delete, sender='community.Community',
+          dispatch_uid="clear_navigation_cache_on_delete")
+def clear_navigation_cache(sender, instance, **kwargs):
+    """Invalidate the cached navigation list of communities"""
+    clear_navigation_communities()
+
+
+@receiver(post_save, sender='community.Community',
+          dispatch_uid="clear_search_cache_on_save")
+@receiver(post_delete, sender='community.Community',
+          dispatch_uid="clear_search_cache_on_delete")
+def clear_search_cache(sender, instance, **kwargs):
+    """Invalidate the cached community search results"""
+    clear_community_search()
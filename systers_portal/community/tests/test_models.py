@@ -1,4 +1,7 @@
+from importlib import import_module
+
 from cities_light.models import City, Country
+from django.apps import apps
 from django.contrib.auth.models import User, Group
 from django.db.models.signals import post_save, post_delete
 from django.test import TestCase
@@ -6,6 +9,7 @@ from django.test import TestCase
 from community.constants import COMMUNITY_ADMIN
 from community.models import Community, CommunityPage, RequestCommunity
 from community.signals import (manage_community_groups, remove_community_groups)
+from meetup.models import Meetup
 from users.models import SystersUser
 
 
@@ -87,6 +91,46 @@ class CommunityModelTestCase(TestCase):
         self.community.save()
         self.assertTrue(self.community.has_changed_admin())
 
+    def test_load_without_admin_query(self):
+        """Test that loading communities does not query their admins"""
+        for order in range(2, 6):
+            Community.objects.create(name="Foo{0}".format(order),
+                                     slug="foo{0}".format(order), order=order,
+                                     location=self.location,
+                                     admin=self.systers_user)
+        with self.assertNumQueries(1):
+            communities = list(Community.objects.all())
+        self.assertEqual(len(communities), 5)
+        community = communities[0]
+        with self.assertNumQueries(0):
+            self.assertEqual(community.original_admin_id, self.systers_user.pk)
+            self.assertFalse(community.has_changed_admin())
+        with self.assertNumQueries(1):
+            self.assertEqual(community.original_admin, self.systers_user)
+
+    def test_link_groups_migrations(self):
+        """Test that the migrations binding the existing groups to their community or meetup
+        only bind the groups named after its roles"""
+        community_groups = [Group.objects.create(name=name) for name in (
+            "Foo: Content Contributor", "Foo: Content Manager", "Foo: User and Content Manager",
+            "Foo: Community Admin")]
+        other = Community.objects.create(name="Foo: Bar", slug="foo-bar", order=2,
+                                         location=self.location, admin=self.systers_user)
+        other_groups = [Group.objects.create(name="Foo: Bar: Content Manager")]
+        meetup = Meetup.objects.create(title="Foo", slug="foo", date="2026-10-18", time="18:00",
+                                       description="Foo", meetup_location=self.location,
+                                       leader=self.systers_user)
+        meetup_groups = list(meetup.groups.all())
+        self.assertEqual(len(meetup_groups), 3)
+        meetup.groups.clear()
+
+        import_module('community.migrations.0003_community_groups').link_community_groups(
+            apps, None)
+        import_module('meetup.migrations.0003_meetup_groups').link_meetup_groups(apps, None)
+        self.assertCountEqual(self.community.groups.all(), community_groups)
+        self.assertCountEqual(other.groups.all(), other_groups)
+        self.assertCountEqual(meetup.groups.all(), meetup_groups)
+
     def test_add_remove_member(self):
         """Test adding and removing Community members"""
         self.assertQuerysetEqual(self.community.members.all(), [])
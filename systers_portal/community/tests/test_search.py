@@ -0,0 +1,74 @@
+from cities_light.models import City, Country
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from community.models import Community
+from community.search import get_search_queryset, normalize_query, search_communities
+from users.models import SystersUser
+
+
+class CommunitySearchTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='foo', password='foobar')
+        self.systers_user = SystersUser.objects.get(user=self.user)
+        country = Country.objects.create(name='Bar', continent='AS')
+        self.location = City.objects.create(name='Lisbon', display_name='Lisbon',
+                                            country=country)
+        self.other_location = City.objects.create(name='Porto', display_name='Porto',
+                                                  country=country)
+        self.community = Community.objects.create(name="Python Lovers", slug="py",
+                                                  order=1, location=self.location,
+                                                  admin=self.systers_user)
+        Community.objects.create(name="Python", slug="python", order=2,
+                                 location=self.other_location, admin=self.systers_user)
+        Community.objects.create(name="Rust", slug="rust-porto", order=3,
+                                 location=self.other_location, admin=self.systers_user)
+
+    def test_normalize_query(self):
+        """Test that equivalent queries are normalized to the same string"""
+        self.assertEqual(normalize_query("  Python   Lovers "), "python lovers")
+        self.assertEqual(normalize_query(None), "")
+        # lowercased like String.toLowerCase, which keeps the sharp s
+        self.assertEqual(normalize_query("Gießen"), "gießen")
+
+    def test_get_search_queryset(self):
+        """Test matching on name, slug and location ordered by name similarity"""
+        self.assertEqual([c.slug for c in get_search_queryset("")],
+                         ['py', 'python', 'rust-porto'])
+        self.assertEqual([c.slug for c in get_search_queryset("python")],
+                         ['python', 'py'])
+        self.assertCountEqual([c.slug for c in get_search_queryset("porto")],
+                              ['rust-porto', 'python'])
+        self.assertEqual([c.slug for c in get_search_queryset("lisbon")], ['py'])
+        self.assertEqual(list(get_search_queryset("java")), [])
+
+    def test_search_communities_limit(self):
+        """Test that results are limited and flag that more communities match"""
+        data = search_communities("", limit=2)
+        self.assertEqual([result['slug'] for result in data['results']], ['py', 'python'])
+        self.assertTrue(data['has_more'])
+        data = search_communities("", limit=3)
+        self.assertFalse(data['has_more'])
+
+    def test_search_communities_cache(self):
+        """Test that results are cached per normalized query"""
+        with self.assertNumQueries(1):
+            data = search_communities("Python")
+        with self.assertNumQueries(0):
+            self.assertEqual(search_communities(" python "), data)
+
+    def test_search_communities_invalidation(self):
+        """Test that saving or deleting a community invalidates the cached results"""
+        self.assertEqual(len(search_communities("python")['results']), 2)
+        community = Community.objects.create(name="Python Ladies", slug="pyladies", order=4,
+                                             location=self.location,
+                                             admin=self.systers_user)
+        self.assertEqual(len(search_communities("python")['results']), 3)
+        community.name = "Ladies"
+        community.save()
+        self.assertEqual(len(search_communities("python")['results']), 2)
+        self.assertEqual(search_communities("ladies")['results'][0]['name'], "Ladies")
+        community.delete()
+        self.assertEqual(len(search_communities("python")['results']), 2)
@@ -1,7 +1,8 @@
 from cities_light.models import City, Country
 from django.test import TestCase
 from django.contrib.auth.models import Group, User
-from django.db.models.signals import post_save, post_delete
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import post_save, pre_delete
 
 from community.constants import COMMUNITY_ADMIN
 from community.models import Community
@@ -13,8 +14,8 @@ class SignalsTestCase(TestCase):
     def setUp(self):
         post_save.connect(manage_community_groups, sender=Community,
                           dispatch_uid="manage_groups")
-        post_delete.connect(remove_community_groups, sender=Community,
-                            dispatch_uid="remove_groups")
+        pre_delete.connect(remove_community_groups, sender=Community,
+                           dispatch_uid="remove_groups")
 
     def test_manage_community_groups(self):
         """Test handling of operations required when saving a Community
@@ -52,6 +53,20 @@ class SignalsTestCase(TestCase):
         self.assertCountEqual(Community.objects.get().members.all(),
                               [systers_user, systers_user2])
 
+    def test_create_community_queries(self):
+        """Test that provisioning the groups of a new community takes a constant number of
+        queries"""
+        user = User.objects.create(username='foo', password='foobar')
+        systers_user = SystersUser.objects.get(user=user)
+        country = Country.objects.create(name='Bar', continent='AS')
+        location = City.objects.create(name='Foo', display_name='Foo',
+                                       country=country)
+        ContentType.objects.clear_cache()
+        with self.assertNumQueries(18):
+            Community.objects.create(name="Foo", slug="foo", order=1,
+                                     location=location, admin=systers_user)
+        self.assertEqual(Group.objects.count(), 4)
+
     def test_remove_community_groups(self):
         """Test the removal of groups when a community is deleted"""
         self.user = User.objects.create(username='foo', password='foobar')
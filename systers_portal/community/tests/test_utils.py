@@ -1,4 +1,5 @@
 from cities_light.models import Country, City
+from django.core.cache import cache
 from django.test import TestCase
 from django.contrib.auth.models import Group, User
 from guardian.shortcuts import get_perms
@@ -6,7 +7,8 @@ from guardian.shortcuts import get_perms
 from community.models import Community
 from community.permissions import groups_templates, group_permissions
 from community.utils import (
-    create_groups, assign_permissions, remove_groups, rename_groups, get_groups)
+    create_groups, assign_permissions, remove_groups, rename_groups, get_groups,
+    get_navigation_communities)
 from users.models import SystersUser
 
 
@@ -26,45 +28,47 @@ class UtilsTestCase(TestCase):
         community_groups = Group.objects.filter(name__startswith=name)
         self.assertCountEqual(community_groups, groups)
 
+    def _create_community(self, name, slug, order):
+        user = User.objects.create(username=slug, password='foobar')
+        systers_user = SystersUser.objects.get(user=user)
+        country, created = Country.objects.get_or_create(name='Bar', continent='AS')
+        location, created = City.objects.get_or_create(name='Foo', display_name='Foo',
+                                                       country=country)
+        return Community.objects.create(name=name, slug=slug, order=order,
+                                        location=location, admin=systers_user)
+
     def test_remove_groups(self):
-        """Test the removal of groups according to a name"""
-        name = "Foo"
-        create_groups(name, groups_templates)
-        remove_groups(name)
-        community_groups = Group.objects.filter(name__startswith=name)
-        self.assertEqual(list(community_groups), [])
+        """Test the removal of the groups of a community"""
+        community = self._create_community("Foo", "foo", 1)
+        Group.objects.create(name="Foo: Unrelated")
+        remove_groups(community)
+        self.assertSequenceEqual(community.groups.all(), [])
+        self.assertEqual(list(Group.objects.values_list('name', flat=True)),
+                         ["Foo: Unrelated"])
 
     def test_get_groups(self):
-        """Test getting groups according to community name"""
-        groups = get_groups("Foo")
-        self.assertSequenceEqual(groups, [])
-        name = "Bar"
-        create_groups(name, groups_templates)
-        community_groups = Group.objects.all()
-        groups = get_groups("Bar")
-        self.assertCountEqual(community_groups, groups)
-        create_groups("New", groups_templates)
-        groups = get_groups("Bar")
-        self.assertCountEqual(community_groups, groups)
+        """Test getting the groups bound to a community"""
+        community = self._create_community("Bar", "bar", 1)
+        community_groups = list(Group.objects.all())
+        self.assertEqual(len(community_groups), len(groups_templates))
+        self.assertCountEqual(get_groups(community), community_groups)
+        # groups sharing the name prefix of another community are not mixed up
+        self._create_community("Bar: Baz", "bar-baz", 2)
+        Group.objects.create(name="Bar: Unrelated")
+        self.assertCountEqual(get_groups(community), community_groups)
 
     def test_rename_groups(self):
-        """Test the renaming of groups according to a new name"""
-        old_name = "Foo"
-        new_name = "Bar"
-        create_groups(old_name, groups_templates)
-        groups = rename_groups(old_name, new_name)
-        expected_group_names = []
-        for key, group_name in groups_templates.items():
-            expected_group_names.append(group_name.format(new_name))
-        group_names = []
-        for group in groups:
-            group_names.append(group.name)
-        self.assertCountEqual(expected_group_names, group_names)
-
-        community_groups = Group.objects.filter(name__startswith=new_name)
-        self.assertCountEqual(community_groups, groups)
-        old_community_groups = Group.objects.filter(name__startswith=old_name)
-        self.assertSequenceEqual(old_community_groups, [])
+        """Test the renaming of the groups of a community"""
+        community = self._create_community("Foo", "foo", 1)
+        other_community = self._create_community("Foo Baz", "foo-baz", 2)
+        other_groups = list(get_groups(other_community).order_by('pk'))
+        with self.assertNumQueries(2):
+            groups = rename_groups(community, "Foo", "Bar")
+        expected_group_names = [group_name.format("Bar")
+                                for group_name in groups_templates.values()]
+        self.assertCountEqual(expected_group_names, [group.name for group in groups])
+        self.assertCountEqual(get_groups(community), groups)
+        self.assertSequenceEqual(get_groups(other_community).order_by('pk'), other_groups)
 
     def test_assign_permissions(self):
         """Test assignment of permissions to community"""
@@ -86,3 +90,43 @@ class UtilsTestCase(TestCase):
                            list(group.permissions.all())]
             group_perms += get_perms(group, community)
             self.assertCountEqual(group_perms, value)
+
+
+class NavigationCommunitiesTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='foo', password='foobar')
+        self.systers_user = SystersUser.objects.get(user=self.user)
+        country = Country.objects.create(name='Bar', continent='AS')
+        self.location = City.objects.create(name='Baz', display_name='Baz',
+                                            country=country)
+        Community.objects.create(name="Foo", slug="foo", order=2,
+                                 location=self.location, admin=self.systers_user)
+        Community.objects.create(name="Bar", slug="bar", order=1,
+                                 location=self.location, admin=self.systers_user)
+
+    def test_get_navigation_communities(self):
+        """Test the cached list of communities in the navigation bar"""
+        with self.assertNumQueries(1):
+            communities = get_navigation_communities()
+        self.assertEqual([(c.slug, c.name, c.order) for c in communities],
+                         [('bar', 'Bar', 1), ('foo', 'Foo', 2)])
+        self.assertEqual(str(communities[0]), 'Bar')
+        with self.assertNumQueries(0):
+            self.assertEqual(get_navigation_communities(), communities)
+
+    def test_navigation_communities_invalidation(self):
+        """Test that saving or deleting a Community rebuilds the cached list"""
+        get_navigation_communities()
+        community = Community.objects.create(name="Baz", slug="baz", order=3,
+                                             location=self.location,
+                                             admin=self.systers_user)
+        self.assertEqual([c.slug for c in get_navigation_communities()],
+                         ['bar', 'foo', 'baz'])
+        community.name = "Qux"
+        community.save()
+        self.assertEqual([c.name for c in get_navigation_communities()],
+                         ['Bar', 'Foo', 'Qux'])
+        community.delete()
+        self.assertEqual([c.slug for c in get_navigation_communities()],
+                         ['bar', 'foo'])
@@ -993,3 +993,16 @@ class CommunitySearchViewTestCase(TestCase):
         self.assertNotContains(response, "Bar")
         self.assertNotContains(response, "Baz")
         self.assertNotContains(response, "Foo")
+
+    def test_search_ajax_results(self):
+        """Test that AJAX requests of the search box get compact JSON results"""
+        response = self.client.get('/community/search/?query=%20ba%20',
+                                   HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['query'], 'ba')
+        self.assertFalse(data['has_more'])
+        self.assertEqual([result['slug'] for result in data['results']], ['bar', 'baz'])
+        self.assertEqual(data['results'][0], {
+            'name': 'Bar', 'slug': 'bar', 'url': '/community/bar/', 'location': 'Test City',
+            'lat': 20.0, 'lng': 20.0})
@@ -1,6 +1,22 @@
-from django.contrib.auth.models import Group, Permission
+from collections import namedtuple
+
+from django.contrib.auth.models import Group
+from django.core.cache import cache
 from django.db import transaction
-from guardian.shortcuts import assign_perm
+from django.db.models import Value
+from django.db.models.functions import Concat, Substr
+
+from common.cache import get_cache_timeout
+from common.provisioning import bulk_create_groups, bulk_assign_permissions
+from community.constants import COMMUNITIES_NAVIGATION_CACHE_KEY
+
+
+class NavigationCommunity(namedtuple('NavigationCommunity', ['slug', 'name', 'order'])):
+    """Lightweight representation of a Community in the navigation bar"""
+    __slots__ = ()
+
+    def __str__(self):
+        return self.name
 
 
 @transaction.atomic
@@ -10,51 +26,40 @@ def create_groups(community_name, groups_templates):
     :param community_name: string name of community object
     :return: list of community Group objects
     """
-    community_groups = []
-    for key, group_name in groups_templates.items():
-        group, created = Group.objects.get_or_create(
-            name=group_name.format(community_name))
-        community_groups.append(group)
-    return community_groups
+    return bulk_create_groups([group_name.format(community_name)
+                               for group_name in groups_templates.values()])
 
 
 @transaction.atomic
-def remove_groups(community_name):
-    """Remove groups for a particular Community instance using its name
+def remove_groups(community):
+    """Remove groups of a particular Community instance
 
-    :param community_name: string name of community object
+    :param community: Community object
     """
-    name = "{0}:".format(community_name)
-    Group.objects.filter(name__startswith=name).delete()
+    Group.objects.filter(communities=community).delete()
 
 
-def get_groups(community_name):
-    """Get groups of a particular Community instance using its name
+def get_groups(community):
+    """Get groups of a particular Community instance
 
-    :param community_name: string name of Community
-    :return: list of Group objects
+    :param community: Community object
+    :return: QuerySet of Group objects
     """
-    name = "{0}:".format(community_name)
-    return Group.objects.filter(name__startswith=name)
+    return community.groups.all()
 
 
-@transaction.atomic
-def rename_groups(old_community_name, new_community_name):
-    """Rename groups bound to a Community instance
+def rename_groups(community, old_community_name, new_community_name):
+    """Rename groups bound to a Community instance with a single UPDATE
 
+    :param community: Community object
     :param old_community_name: string old name of the community
     :param new_community_name: string new name of the community
     :return: list of community new Group objects
     """
-    name = "{0}:".format(old_community_name)
-    groups = Group.objects.filter(name__startswith=name)
-    new_community_groups = []
-    for group in groups:
-        old_name, group_name = group.name.rsplit(":", 1)
-        group.name = "{0}:{1}".format(new_community_name, group_name)
-        group.save()
-        new_community_groups.append(group)
-    return new_community_groups
+    Group.objects.filter(communities=community).update(
+        name=Concat(Value(new_community_name),
+                    Substr('name', len(old_community_name) + 1)))
+    return list(get_groups(community))
 
 
 def assign_permissions(community, groups, groups_templates, group_permissions):
@@ -64,12 +69,43 @@ def assign_permissions(community, groups, groups_templates, group_permissions):
     :param community: Community object
     :param groups: list of Group objects
     """
-    for key, group_name in groups_templates.items():
-        group = next(
-            g for g in groups if g.name == group_name.format(community.name))
-        for perm in group_permissions[key]:
-            if perm.endswith('tag') or perm.endswith('resourcetype'):
-                group.permissions.add(Permission.objects.get(codename=perm))
-                group.save()
-            else:
-                assign_perm(perm, group, community)
+    groups_by_name = {group.name: group for group in groups}
+    bulk_assign_permissions(
+        [(groups_by_name[group_name.format(community.name)], group_permissions[key])
+         for key, group_name in groups_templates.items()],
+        obj=community, is_object_permission=is_community_permission)
+
+
+def is_community_permission(perm):
+    """Check if a permission is granted on a Community object, tags and resource types
+    permissions are granted on the whole model
+
+    :param perm: string permission codename
+    :return: True if the permission is a Community object permission
+    """
+    return not (perm.endswith('tag') or perm.endswith('resourcetype'))
+
+
+def get_navigation_communities():
+    """Get the communities displayed in the navigation bar, ordered by their order. The list is
+    cached until a Community is saved or deleted. With a cache local to each worker process, a
+    change is only seen by the other processes once their list expires, after
+    LOCAL_CACHE_TIMEOUT seconds.
+
+    :return: list of NavigationCommunity tuples (slug, name, order)
+    """
+    communities = cache.get(COMMUNITIES_NAVIGATION_CACHE_KEY)
+    if communities is None:
+        from community.models import Community
+        communities = [NavigationCommunity(*values) for values in
+                       Community.objects.order_by('order').values_list('slug', 'name', 'order')]
+        cache.set(COMMUNITIES_NAVIGATION_CACHE_KEY, communities, get_cache_timeout(None))
+    return communities
+
+
+def clear_navigation_communities():
+    """Invalidate the cached list of communities displayed in the navigation bar. The cache is
+    cleared right away and once more after the current transaction commits, so that a list
+    rebuilt from not yet committed data is not kept."""
+    cache.delete(COMMUNITIES_NAVIGATION_CACHE_KEY)
+    transaction.on_commit(lambda: cache.delete(COMMUNITIES_NAVIGATION_CACHE_KEY))
@@ -3,7 +3,6 @@ from django.contrib import messages
 from django.urls import reverse
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, render
-from django.template.loader import render_to_string
 from django.views.generic import DetailView, RedirectView, ListView, FormView
 from django.views.generic.edit import UpdateView, CreateView, DeleteView
 from braces.views import LoginRequiredMixin, PermissionRequiredMixin, StaffuserRequiredMixin
@@ -12,19 +11,20 @@ from community.constants import (ORDER_NULL_MSG, ORDER_ALREADY_EXISTS_MSG,
                                  SLUG_ALREADY_EXISTS_MSG, ORDER_NULL,
                                  SLUG_ALREADY_EXISTS, ORDER_ALREADY_EXISTS, OK,
                                  SUCCESS_MSG)
-from common.mixins import UserDetailsMixin
+from common.mixins import UserDetailsMixin, IdentityMapMixin, CommunityObjectMixin
 from community.forms import (EditCommunityForm, AddCommunityPageForm,
                              EditCommunityPageForm, PermissionGroupsForm,
                              RequestCommunityForm, EditCommunityRequestForm,
                              AddCommunityForm)
 from community.mixins import CommunityMenuMixin
 from community.models import Community, CommunityPage, RequestCommunity
+from community.search import get_search_queryset, normalize_query, search_communities
 from users.models import SystersUser
 
 from systers_portal.settings.base import GOOGLE_MAPS_API_KEY
 
 
-class RequestCommunityView(LoginRequiredMixin, CreateView):
+class RequestCommunityView(IdentityMapMixin, LoginRequiredMixin, CreateView):
     """View to Request a new community"""
     template_name = "community/request_community.html"
     model = RequestCommunity
@@ -38,8 +38,7 @@ class RequestCommunityView(LoginRequiredMixin, CreateView):
     def get_context_data(self, **kwargs):
         """Add the communities requested by the user to the context"""
         context = super(RequestCommunityView, self).get_context_data(**kwargs)
-        self.systersuser = get_object_or_404(
-            SystersUser, user=self.request.user)
+        self.systersuser = self.get_systers_user()
         self.community_requests = RequestCommunity.objects.filter(
             user=self.systersuser)
         context['community_requests'] = self.community_requests
@@ -54,7 +53,7 @@ class RequestCommunityView(LoginRequiredMixin, CreateView):
         return kwargs
 
 
-class ViewCommunityRequestView(LoginRequiredMixin, PermissionRequiredMixin,
+class ViewCommunityRequestView(IdentityMapMixin, LoginRequiredMixin, PermissionRequiredMixin,
                                FormView):
     """View the community request"""
     template_name = "community/view_community_request.html"
@@ -82,12 +81,11 @@ class ViewCommunityRequestView(LoginRequiredMixin, PermissionRequiredMixin,
         The permission holds true for superusers."""
         self.community_request = get_object_or_404(
             RequestCommunity, slug=self.kwargs['slug'])
-        self.systersuser = get_object_or_404(
-            SystersUser, user=self.request.user)
+        self.systersuser = self.get_systers_user()
         return self.systersuser == self.community_request.user or request.user.is_superuser
 
 
-class EditCommunityRequestView(LoginRequiredMixin, PermissionRequiredMixin,
+class EditCommunityRequestView(IdentityMapMixin, LoginRequiredMixin, PermissionRequiredMixin,
                                UpdateView):
     """Edit the community request"""
     template_name = "community/edit_community_request.html"
@@ -111,12 +109,11 @@ class EditCommunityRequestView(LoginRequiredMixin, PermissionRequiredMixin,
         The permission holds true for superusers."""
         self.community_request = get_object_or_404(
             RequestCommunity, slug=self.kwargs['slug'])
-        self.systersuser = get_object_or_404(
-            SystersUser, user=self.request.user)
+        self.systersuser = self.get_systers_user()
         return self.systersuser == self.community_request.user or request.user.is_superuser
 
 
-class ApproveRequestCommunityView(LoginRequiredMixin, StaffuserRequiredMixin,
+class ApproveRequestCommunityView(IdentityMapMixin, LoginRequiredMixin, StaffuserRequiredMixin,
                                   RedirectView):
     """Approve the new community request"""
     model = RequestCommunity
@@ -144,7 +141,7 @@ class ApproveRequestCommunityView(LoginRequiredMixin, StaffuserRequiredMixin,
 
         self.systersuser = community_request.user
         new_community.admin = self.systersuser
-        self.admin = get_object_or_404(SystersUser, user=self.request.user)
+        self.admin = self.get_systers_user()
         status, message, level = self.process_request()
         if status == OK:
             new_community.save()
@@ -200,7 +197,8 @@ class RejectRequestCommunityView(LoginRequiredMixin, StaffuserRequiredMixin, Del
         return reverse('unapproved_community_requests')
 
 
-class NewCommunityRequestsListView(LoginRequiredMixin, StaffuserRequiredMixin, ListView):
+class NewCommunityRequestsListView(IdentityMapMixin, LoginRequiredMixin, StaffuserRequiredMixin,
+                                   ListView):
     """List of Community Requests"""
     template_name = "community/new_community_requests.html"
     model = RequestCommunity
@@ -211,8 +209,7 @@ class NewCommunityRequestsListView(LoginRequiredMixin, StaffuserRequiredMixin, L
         """Add RequestCommunity object to the context"""
         context = super(NewCommunityRequestsListView,
                         self).get_context_data(**kwargs)
-        self.systersuser = get_object_or_404(
-            SystersUser, user=self.request.user)
+        self.systersuser = self.get_systers_user()
         context['requestor'] = self.systersuser
         return context
 
@@ -223,7 +220,7 @@ class NewCommunityRequestsListView(LoginRequiredMixin, StaffuserRequiredMixin, L
         return request_community_list
 
 
-class CommunityLandingView(RedirectView):
+class CommunityLandingView(IdentityMapMixin, RedirectView):
     """View Community landing page, which might be a CommunityPage of lowest
     order or if pages are missing, then community news page."""
     permanent = False
@@ -235,7 +232,7 @@ class CommunityLandingView(RedirectView):
         * if a Community has at least one page, redirect to the page with the
           lowest order (aka first page)
         """
-        community = get_object_or_404(Community, slug=kwargs['slug'])
+        community = self.get_url_community()
         community_pages = CommunityPage.objects.filter(
             community=community).order_by('order')
         if community_pages.exists():
@@ -248,13 +245,13 @@ class CommunityLandingView(RedirectView):
                            kwargs={'slug': community.slug})
 
 
-class ViewCommunityProfileView(DetailView):
+class ViewCommunityProfileView(CommunityObjectMixin, DetailView):
     """Community profile view"""
     template_name = "community/view_profile.html"
     model = Community
 
 
-class EditCommunityProfileView(LoginRequiredMixin, PermissionRequiredMixin,
+class EditCommunityProfileView(CommunityObjectMixin, LoginRequiredMixin, PermissionRequiredMixin,
                                UpdateView):
     """Edit community profile view"""
     template_name = "community/edit_profile.html"
@@ -273,11 +270,11 @@ class EditCommunityProfileView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to change community
         profile. The permission holds true for superusers."""
-        community = get_object_or_404(Community, slug=self.kwargs['slug'])
+        community = self.get_url_community()
         return request.user.has_perm("change_community", community)
 
 
-class CommunityPageView(UserDetailsMixin, CommunityMenuMixin, DetailView):
+class CommunityPageView(CommunityObjectMixin, UserDetailsMixin, CommunityMenuMixin, DetailView):
     """Community page view"""
     template_name = "community/page.html"
     model = Community
@@ -307,7 +304,7 @@ class CommunityPageView(UserDetailsMixin, CommunityMenuMixin, DetailView):
         return self.kwargs['page_slug']
 
 
-class AddCommunityView(LoginRequiredMixin, PermissionRequiredMixin, CreateView):
+class AddCommunityView(IdentityMapMixin, LoginRequiredMixin, PermissionRequiredMixin, CreateView):
     template_name = "community/add_community.html"
     model = Community
     form_class = AddCommunityForm
@@ -329,11 +326,11 @@ class AddCommunityView(LoginRequiredMixin, PermissionRequiredMixin, CreateView):
     def check_permissions(self, request):
         """Check if the request user has the permissions to add a new community.
         The permission holds true for superusers."""
-        self.systersuser = get_object_or_404(SystersUser, user=request.user)
+        self.systersuser = self.get_systers_user()
         return request.user.has_perm("add_community")
 
 
-class AddCommunityPageView(LoginRequiredMixin, PermissionRequiredMixin,
+class AddCommunityPageView(IdentityMapMixin, LoginRequiredMixin, PermissionRequiredMixin,
                            CreateView):
     """Add new Community page view"""
     template_name = "common/add_post.html"
@@ -370,11 +367,11 @@ class AddCommunityPageView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to add new community
         page. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
+        self.community = self.get_url_community()
         return request.user.has_perm("add_community_page", self.community)
 
 
-class EditCommunityPageView(LoginRequiredMixin, PermissionRequiredMixin,
+class EditCommunityPageView(IdentityMapMixin, LoginRequiredMixin, PermissionRequiredMixin,
                             UpdateView):
     """Edit an existing Community page view"""
     template_name = "common/edit_post.html"
@@ -401,12 +398,12 @@ class EditCommunityPageView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to edit community
         news. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
+        self.community = self.get_url_community()
         return request.user.has_perm("change_community_page",
                                      self.community)
 
 
-class DeleteCommunityPageView(LoginRequiredMixin, PermissionRequiredMixin,
+class DeleteCommunityPageView(IdentityMapMixin, LoginRequiredMixin, PermissionRequiredMixin,
                               DeleteView):
     """Delete existing Community page view"""
     template_name = "common/post_confirm_delete.html"
@@ -433,11 +430,11 @@ class DeleteCommunityPageView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to delete community
         page. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
+        self.community = self.get_url_community()
         return request.user.has_perm("delete_community_page", self.community)
 
 
-class CommunityUsersView(LoginRequiredMixin, PermissionRequiredMixin,
+class CommunityUsersView(IdentityMapMixin, LoginRequiredMixin, PermissionRequiredMixin,
                          ListView):
     """Manage Community users view"""
     template_name = "community/users.html"
@@ -461,7 +458,7 @@ class CommunityUsersView(LoginRequiredMixin, PermissionRequiredMixin,
         """Check if the request user has the permission to manage community
         users (add, change, delete). The permission holds true for
         superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
+        self.community = self.get_url_community()
         add_perm = request.user.has_perm("add_community_systersuser",
                                          self.community)
         change_perm = request.user.has_perm("change_community_systersuser",
@@ -471,7 +468,7 @@ class CommunityUsersView(LoginRequiredMixin, PermissionRequiredMixin,
         return add_perm and change_perm and delete_perm
 
 
-class UserPermissionGroupsView(LoginRequiredMixin, PermissionRequiredMixin,
+class UserPermissionGroupsView(IdentityMapMixin, LoginRequiredMixin, PermissionRequiredMixin,
                                FormView):
     """Manage user permission groups"""
     template_name = "community/permissions.html"
@@ -512,31 +509,21 @@ class UserPermissionGroupsView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permission to change user
         permission groups. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
+        self.community = self.get_url_community()
         return request.user.has_perm("change_community_systersuser",
                                      self.community)
 
 
 class CommunitySearch(ListView):
-    """Search for Communities View"""
+    """Search for Communities View. The page lists the communities matching the query, while
+    AJAX requests of the search box get compact JSON results."""
     template_name = "community/community_search.html"
     model = Community
 
     def get(self, request):
-        if request.method == 'GET':
-            context = {}
-            url_parameter = request.GET.get("query")
-            if url_parameter:
-                communities = Community.objects.filter(name__icontains=url_parameter)
-            else:
-                communities = Community.objects.all()
-            context['communities'] = communities
-            context['api_key'] = GOOGLE_MAPS_API_KEY
-            if request.is_ajax():
-                html = render_to_string(
-                    template_name="community/snippets/search-snippet.html",
-                    context={"communities": communities}
-                )
-                data_dict = {"html": html}
-                return JsonResponse(data=data_dict)
-            return render(request, "community/community_search.html", context=context)
+        query = request.GET.get("query")
+        if request.is_ajax():
+            return JsonResponse(data=search_communities(query))
+        context = {'communities': get_search_queryset(normalize_query(query)),
+                   'api_key': GOOGLE_MAPS_API_KEY}
+        return render(request, "community/community_search.html", context=context)
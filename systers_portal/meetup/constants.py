@@ -18,3 +18,45 @@ ERROR_MSG = "Something went wrong. Please try again"
 
 # messages for the approval of a meetup request
 SUCCESS_MEETUP_MSG = "Meetup sucessfully created!"
+
+# number of meetups per page of search results
+SEARCH_RESULTS_PER_PAGE = 20
+
+# PostgreSQL text search configuration of the meetup search vector
+SEARCH_CONFIG = 'english'
+
+# status of an RSVP
+RSVP_COMING = "coming"
+RSVP_WAITLISTED = "waitlisted"
+RSVP_NOT_COMING = "not_coming"
+
+# messages for the RSVP of a meetup
+RSVP_COMING_MSG = "You are coming to the meetup!"
+RSVP_PLUS_ONE_REFUSED_MSG = "You are coming to the meetup, but there is no seat left for your " \
+    "plus one."
+RSVP_WAITLISTED_MSG = "The meetup is full, you have been added to the waitlist."
+RSVP_NOT_COMING_MSG = "You are not coming to the meetup."
+
+# number of changed meetups and of deleted meetups per page of the VMS sync API
+VMS_SYNC_PAGE_SIZE = 100
+VMS_SYNC_MAX_PAGE_SIZE = 500
+
+# seconds calendar clients may reuse a meetup calendar without revalidating it
+CALENDAR_MAX_AGE = 300
+
+# pinax notice types of the notifications sent to the users who RSVP'd to a meetup
+MEETUP_REMINDER = "meetup_reminder"
+MEETUP_TIME_CHANGE = "meetup_time_change"
+MEETUP_LOCATION_CHANGE = "meetup_location_change"
+NOTIFICATION_CHOICES = (
+    (MEETUP_REMINDER, "Meetup reminder"),
+    (MEETUP_TIME_CHANGE, "Meetup time change"),
+    (MEETUP_LOCATION_CHANGE, "Meetup location change"),
+)
+# hours before the start of a meetup its reminders are sent
+REMINDER_LEAD_HOURS = 24
+# number of notifications inserted in the outbox or sent at once
+NOTIFICATION_BATCH_SIZE = 500
+
+# widths in pixels of the variants of meetup pictures
+MEETUP_PICTURE_WIDTHS = (320, 640, 1280)
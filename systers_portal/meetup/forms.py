@@ -3,6 +3,7 @@ from django.utils import timezone
 
 from common.forms import ModelFormWithHelper
 from common.helpers import SubmitCancelFormHelper
+from common.widgets import CityAutocompleteWidget
 from meetup.models import (Meetup, Rsvp, SupportRequest,
                            RequestMeetup)
 from users.models import SystersUser
@@ -16,7 +17,8 @@ class RequestMeetupForm(ModelFormWithHelper):
         model = RequestMeetup
         fields = ('title', 'slug', 'date', 'time', 'venue', 'meetup_location', 'description')
         widgets = {'date': forms.DateInput(attrs={'type': 'text', 'class': 'datepicker'}),
-                   'time': forms.TimeInput(attrs={'type': 'text', 'class': 'timepicker'})}
+                   'time': forms.TimeInput(attrs={'type': 'text', 'class': 'timepicker'}),
+                   'meetup_location': CityAutocompleteWidget}
         helper_class = SubmitCancelFormHelper
         helper_cancel_href = "{% url 'index' %}"
 
@@ -62,10 +64,11 @@ class AddMeetupForm(ModelFormWithHelper):
 
     class Meta:
         model = Meetup
-        fields = ('title', 'slug', 'date', 'time', 'meetup_location', 'venue', 'description',
-                  'meetup_picture')
+        fields = ('title', 'slug', 'date', 'time', 'meetup_location', 'venue', 'capacity',
+                  'description', 'meetup_picture')
         widgets = {'date': forms.DateInput(attrs={'type': 'text', 'class': 'datepicker'}),
-                   'time': forms.TimeInput(attrs={'type': 'text', 'class': 'timepicker'})}
+                   'time': forms.TimeInput(attrs={'type': 'text', 'class': 'timepicker'}),
+                   'meetup_location': CityAutocompleteWidget}
         helper_class = SubmitCancelFormHelper
         helper_cancel_href = "{% url 'index' %}"
 
@@ -106,7 +109,7 @@ class EditMeetupForm(ModelFormWithHelper):
 
     class Meta:
         model = Meetup
-        fields = ('title', 'slug', 'date', 'time', 'description', 'venue')
+        fields = ('title', 'slug', 'date', 'time', 'description', 'venue', 'capacity')
         widgets = {'date': forms.DateInput(attrs={'type': 'date', 'class': 'datepicker'}),
                    'time': forms.TimeInput(attrs={'type': 'time', 'class': 'timepicker'})}
         helper_class = SubmitCancelFormHelper
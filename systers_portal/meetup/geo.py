@@ -0,0 +1,187 @@
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+import geoip2.database
+from django.conf import settings
+from django.db.models import Q
+from cities_light.models import City
+from geoip2.errors import AddressNotFoundError
+from ipware import get_client_ip
+from maxminddb import MODE_MMAP
+
+CURRENT_LOCATION = "Current Location"
+
+# location looked up for clients whose IP address is not publicly routable
+DEFAULT_GEOIP_HOST = "google.com"
+
+GeoLocation = namedtuple('GeoLocation', ['city', 'latitude', 'longitude'])
+
+UNKNOWN_LOCATION = GeoLocation(None, None, None)
+
+
+class GeoIPService(object):
+    """Process-wide geolocation of IP addresses.
+
+    The GeoLite2 City database is opened once in mmap mode and shared by all the threads of a
+    worker. It is reopened when the file on disk is replaced, which is checked at most every
+    `check_interval` seconds. Lookups are kept in a bounded LRU cache keyed by the queried IP
+    address or host name.
+    """
+
+    def __init__(self, path=None, cache_size=None, check_interval=None):
+        self._path = path
+        self.cache_size = cache_size if cache_size is not None else \
+            getattr(settings, 'GEOIP_CACHE_SIZE', 1024)
+        self.check_interval = check_interval if check_interval is not None else \
+            getattr(settings, 'GEOIP_CHECK_INTERVAL', 60)
+        self._lock = threading.Lock()
+        self._reader = None
+        self._signature = None
+        self._last_check = None
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    @property
+    def path(self):
+        return self._path or settings.GEOIP_PATH
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def _get_reader(self):
+        """Get the database reader, reopening the database if the file was replaced.
+        Must be called with the lock held.
+
+        :return: geoip2.database.Reader object or None if the database is missing
+        """
+        now = time.monotonic()
+        if self._last_check is not None and now - self._last_check < self.check_interval:
+            return self._reader
+        self._last_check = now
+        signature = self._file_signature()
+        if signature == self._signature:
+            return self._reader
+        # the previous reader is not closed, lookups in other threads may still be using it
+        self._reader = None
+        if signature is not None:
+            self._reader = geoip2.database.Reader(self.path, mode=MODE_MMAP)
+            self.reloads += 1
+        self._signature = signature
+        self._cache.clear()
+        return self._reader
+
+    def lookup(self, query):
+        """Geolocate an IP address or a host name
+
+        :param query: string IP address or host name
+        :return: GeoLocation tuple (city, latitude, longitude), with None values if the address
+                 can't be located
+        """
+        with self._lock:
+            reader = self._get_reader()
+            location = self._cache.get(query)
+            if location is not None:
+                self._cache.move_to_end(query)
+                self.hits += 1
+                return location
+            self.misses += 1
+        location = self._locate(reader, query)
+        with self._lock:
+            self._cache[query] = location
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return location
+
+    @staticmethod
+    def _locate(reader, query):
+        if reader is None:
+            return UNKNOWN_LOCATION
+        try:
+            response = reader.city(socket.gethostbyname(query))
+        except (AddressNotFoundError, socket.error, ValueError):
+            return UNKNOWN_LOCATION
+        return GeoLocation(response.city.name, response.location.latitude,
+                           response.location.longitude)
+
+    def stats(self):
+        """Cache statistics of the service
+
+        :return: dict with the number of cache hits, misses, database reloads and cached entries
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'reloads': self.reloads,
+                    'size': len(self._cache)}
+
+    def clear(self):
+        """Drop the database reader and empty the cache"""
+        with self._lock:
+            self._reader = None
+            self._signature = None
+            self._last_check = None
+            self._cache.clear()
+
+
+geoip_service = GeoIPService()
+
+
+def get_client_location(request):
+    """Geolocate the client of a request from its IP address
+
+    :param request: HttpRequest object
+    :return: GeoLocation tuple (city, latitude, longitude)
+    """
+    client_ip, is_routable = get_client_ip(request)
+    if not is_routable:
+        client_ip = DEFAULT_GEOIP_HOST
+    return geoip_service.lookup(client_ip)
+
+
+def get_city_coordinates(city):
+    """Get the coordinates stored on a cities_light City row
+
+    :param city: City object
+    :return: tuple (latitude, longitude) of floats or None if the city has no coordinates
+    """
+    if city is None or city.latitude is None or city.longitude is None:
+        return None
+    return float(city.latitude), float(city.longitude)
+
+
+def find_city(name):
+    """Find the City matching a location name, as submitted by the meetup search form
+
+    :param name: string display name or name of a City
+    :return: City object or None if no city matches the name
+    """
+    if not name:
+        return None
+    return City.objects.filter(
+        Q(display_name__iexact=name) | Q(name__iexact=name),
+        latitude__isnull=False, longitude__isnull=False
+    ).order_by('-population').first()
+
+
+def get_user_coordinates(request, location):
+    """Resolve the location the user searches from to coordinates without geocoding requests.
+    The current location is taken from the client IP, any other location is looked up in the
+    City table.
+
+    :param request: HttpRequest object
+    :param location: string location name or CURRENT_LOCATION
+    :return: tuple (latitude, longitude) of floats or None if the location can't be resolved
+    """
+    if location == CURRENT_LOCATION:
+        client_location = get_client_location(request)
+        if client_location.latitude is None or client_location.longitude is None:
+            return None
+        return float(client_location.latitude), float(client_location.longitude)
+    return get_city_coordinates(find_city(location))
@@ -0,0 +1,124 @@
+import datetime
+
+from django.core.signing import BadSignature, Signer
+from django.utils.html import strip_tags
+
+# lines of an iCalendar file are folded after this many octets (RFC 5545, section 3.1)
+MAX_LINE_OCTETS = 75
+PRODUCT_ID = "-//Systers//Systers Portal//EN"
+CALENDAR_TOKEN_SALT = "meetup.ical"
+
+
+def escape_text(value):
+    """Escape a TEXT property value
+
+    :param value: string
+    :return: string with backslashes, semicolons, commas and newlines escaped
+    """
+    return (str(value).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n").replace("\r", "\\n"))
+
+
+def fold_line(line):
+    """Fold a content line into lines of at most MAX_LINE_OCTETS octets, without splitting
+    multi-byte characters
+
+    :param line: string content line without line break
+    :return: string folded line ending with CRLF
+    """
+    lines = []
+    current, size = "", 0
+    for char in line:
+        char_size = len(char.encode('utf-8'))
+        if size + char_size > MAX_LINE_OCTETS:
+            lines.append(current)
+            # continuation lines start with a space, which counts in their length
+            current, size = " ", 1
+        current += char
+        size += char_size
+    lines.append(current)
+    return "\r\n".join(lines) + "\r\n"
+
+
+def format_datetime(value):
+    """Format an aware datetime as an iCalendar UTC DATE-TIME"""
+    return value.astimezone(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def localize(meetup, date, time):
+    """Get the aware datetime of a date and a time of a meetup, in the time zone of its city
+
+    :return: aware datetime or None if the date or the time is missing
+    """
+    if date is None or time is None:
+        return None
+    city_timezone = meetup.meetup_location.get_timezone_info()
+    return city_timezone.localize(datetime.datetime.combine(date, time))
+
+
+def get_event_lines(meetup, host, url):
+    """Get the content lines of the VEVENT of a meetup
+
+    :param meetup: Meetup object with its meetup_location
+    :param host: string domain used in the unique identifiers of the events
+    :param url: string absolute URL of the meetup page
+    :return: list of strings content lines
+    """
+    lines = ["BEGIN:VEVENT",
+             "UID:meetup-{0}@{1}".format(meetup.pk, host),
+             "DTSTAMP:{0}".format(format_datetime(meetup.last_updated)),
+             "LAST-MODIFIED:{0}".format(format_datetime(meetup.last_updated))]
+    start = localize(meetup, meetup.date, meetup.time)
+    if start is None:
+        lines.append("DTSTART;VALUE=DATE:{0}".format(meetup.date.strftime("%Y%m%d")))
+    else:
+        lines.append("DTSTART:{0}".format(format_datetime(start)))
+        end = localize(meetup, meetup.end_date or meetup.date, meetup.end_time)
+        if end is not None and end > start:
+            lines.append("DTEND:{0}".format(format_datetime(end)))
+    location = ", ".join(part for part in (meetup.venue, str(meetup.meetup_location)) if part)
+    lines += ["SUMMARY:{0}".format(escape_text(meetup.title)),
+              "LOCATION:{0}".format(escape_text(location)),
+              "DESCRIPTION:{0}".format(escape_text(strip_tags(meetup.description).strip())),
+              "URL:{0}".format(url),
+              "END:VEVENT"]
+    return lines
+
+
+def iter_calendar(meetups, name, host, get_url):
+    """Write an iCalendar file event by event, reading the meetups through a database cursor
+
+    :param meetups: Meetup QuerySet
+    :param name: string name of the calendar
+    :param host: string domain used in the unique identifiers of the events
+    :param get_url: callable returning the absolute URL of a meetup page
+    :return: iterator of strings, parts of the calendar
+    """
+    yield "".join(fold_line(line) for line in (
+        "BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:{0}".format(PRODUCT_ID),
+        "CALSCALE:GREGORIAN", "METHOD:PUBLISH", "X-WR-CALNAME:{0}".format(escape_text(name))))
+    for meetup in meetups.select_related('meetup_location').iterator():
+        yield "".join(fold_line(line) for line in get_event_lines(meetup, host,
+                                                                  get_url(meetup)))
+    yield fold_line("END:VCALENDAR")
+
+
+def get_calendar_token(user):
+    """Get the secret token of the URL of the calendar of a user
+
+    :param user: User object
+    :return: string token
+    """
+    return Signer(salt=CALENDAR_TOKEN_SALT).sign(str(user.pk))
+
+
+def get_user_id(token):
+    """Get the primary key of the user a calendar token was issued for
+
+    :param token: string token returned by get_calendar_token
+    :return: int User primary key or None if the token is not valid
+    """
+    try:
+        return int(Signer(salt=CALENDAR_TOKEN_SALT).unsign(token))
+    except (BadSignature, ValueError):
+        return None
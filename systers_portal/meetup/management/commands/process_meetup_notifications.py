@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from meetup.constants import NOTIFICATION_BATCH_SIZE
+from meetup.notifications import expand_changes, queue_reminders, send_notifications
+
+
+class Command(BaseCommand):
+    help = "Queue the notifications about the changed meetups and the reminders of the " \
+        "meetups starting soon, then send the queued meetup notifications"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=NOTIFICATION_BATCH_SIZE,
+                            help="number of notifications sent per transaction")
+        parser.add_argument('--interval', type=int, default=None,
+                            help="keep running and process the notifications every this many "
+                                 "seconds, instead of exiting once the outbox is empty")
+
+    def process(self, batch_size):
+        changes = expand_changes(batch_size)
+        reminders = queue_reminders()
+        sent = 0
+        while True:
+            batch = send_notifications(batch_size)
+            if not batch:
+                break
+            sent += batch
+        self.stdout.write("Queued {0} change notification(s) and {1} reminder(s), sent {2} "
+                          "notification(s)".format(changes, reminders, sent))
+
+    def handle(self, *args, **options):
+        self.process(options['batch_size'])
+        while options['interval']:
+            time.sleep(options['interval'])
+            self.process(options['batch_size'])
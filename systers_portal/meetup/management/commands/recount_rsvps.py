@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from meetup.models import Meetup
+from meetup.utils import recount_rsvps
+
+
+class Command(BaseCommand):
+    help = "Recompute the RSVP counters of meetups from their RSVPs"
+
+    def add_arguments(self, parser):
+        parser.add_argument('slugs', nargs='*', metavar='slug',
+                            help="slugs of the meetups to repair, all meetups by default")
+
+    def handle(self, *args, **options):
+        meetups = Meetup.objects.all()
+        if options['slugs']:
+            meetups = meetups.filter(slug__in=options['slugs'])
+        repaired = recount_rsvps(meetups)
+        self.stdout.write("Repaired the RSVP counters of {0} meetup(s)".format(repaired))
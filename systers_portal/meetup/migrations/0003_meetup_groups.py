@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+# names of the groups of a meetup when this migration was written, a prefix match would also
+# bind the groups of a community or of a meetup whose title starts with the same words
+MEETUP_GROUP_NAMES = ("{0}: Community Member", "{0}: Community Moderator",
+                      "{0}: Community Leader")
+
+
+def link_meetup_groups(apps, schema_editor):
+    """Bind the existing groups, named "<meetup title>: <role>", to their meetup"""
+    Meetup = apps.get_model('meetup', 'Meetup')
+    Group = apps.get_model('auth', 'Group')
+    for meetup in Meetup.objects.all():
+        meetup.groups.set(Group.objects.filter(
+            name__in=[name.format(meetup.title) for name in MEETUP_GROUP_NAMES]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('meetup', '0002_auto_20200724_2045'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meetup',
+            name='groups',
+            field=models.ManyToManyField(blank=True, editable=False, related_name='meetups', to='auth.Group', verbose_name='Groups'),
+        ),
+        migrations.RunPython(link_meetup_groups, migrations.RunPython.noop),
+    ]
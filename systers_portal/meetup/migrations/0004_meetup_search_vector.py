@@ -0,0 +1,33 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+def update_search_vectors(apps, schema_editor):
+    """Compute the search vector of the existing meetups"""
+    Meetup = apps.get_model('meetup', 'Meetup')
+    Meetup.objects.update(search_vector=(
+        SearchVector('title', weight='A', config='english') +
+        SearchVector('venue', weight='B', config='english') +
+        SearchVector('description', weight='C', config='english')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetup', '0003_meetup_groups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meetup',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='meetup',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='meetup_search_vector_idx'),
+        ),
+        migrations.RunPython(update_search_vectors, migrations.RunPython.noop),
+    ]
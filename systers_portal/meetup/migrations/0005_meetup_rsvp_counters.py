@@ -0,0 +1,46 @@
+# Generated by Django 3.0.8 on 2026-10-18 18:21
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_rsvps(apps, schema_editor):
+    """Compute the RSVP counters of the existing meetups"""
+    Meetup = apps.get_model('meetup', 'Meetup')
+    Rsvp = apps.get_model('meetup', 'Rsvp')
+
+    def count(**filters):
+        rsvps = Rsvp.objects.filter(meetup=OuterRef('pk'), **filters).order_by()
+        return Coalesce(Subquery(rsvps.values('meetup').annotate(count=Count('pk'))
+                                 .values('count')), 0)
+
+    Meetup.objects.update(rsvp_coming_count=count(coming=True),
+                          rsvp_plus_one_count=count(coming=True, plus_one=True),
+                          rsvp_not_coming_count=count(coming=False))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetup', '0004_meetup_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meetup',
+            name='rsvp_coming_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Coming RSVPs'),
+        ),
+        migrations.AddField(
+            model_name='meetup',
+            name='rsvp_not_coming_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Not coming RSVPs'),
+        ),
+        migrations.AddField(
+            model_name='meetup',
+            name='rsvp_plus_one_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Plus ones of coming RSVPs'),
+        ),
+        migrations.RunPython(count_rsvps, migrations.RunPython.noop),
+    ]
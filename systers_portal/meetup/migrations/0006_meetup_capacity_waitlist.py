@@ -0,0 +1,28 @@
+# Generated by Django 3.0.8 on 2026-10-18 18:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetup', '0005_meetup_rsvp_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meetup',
+            name='capacity',
+            field=models.PositiveIntegerField(blank=True, help_text='Maximum number of attendees, including plus ones. Leave empty for no limit.', null=True, verbose_name='Capacity'),
+        ),
+        migrations.AddField(
+            model_name='meetup',
+            name='rsvp_waitlist_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Waitlisted RSVPs'),
+        ),
+        migrations.AddField(
+            model_name='rsvp',
+            name='waitlisted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Waitlisted at'),
+        ),
+    ]
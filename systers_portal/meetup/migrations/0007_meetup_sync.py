@@ -0,0 +1,29 @@
+# Generated by Django 3.0.8 on 2026-10-18 18:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetup', '0006_meetup_capacity_waitlist'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MeetupTombstone',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('meetup_id', models.PositiveIntegerField(verbose_name='Meetup id')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, verbose_name='Deleted at')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='meetup',
+            index=models.Index(fields=['last_updated', 'id'], name='meetup_last_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='meetuptombstone',
+            index=models.Index(fields=['deleted_at', 'id'], name='meetup_tombstone_deleted_idx'),
+        ),
+    ]
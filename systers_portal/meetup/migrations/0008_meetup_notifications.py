@@ -0,0 +1,47 @@
+# Generated by Django 3.0.8 on 2026-10-18 18:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+        ('meetup', '0007_meetup_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MeetupNotification',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notice_type', models.CharField(choices=[('meetup_reminder', 'Meetup reminder'), ('meetup_time_change', 'Meetup time change'), ('meetup_location_change', 'Meetup location change')], max_length=50, verbose_name='Notice type')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Sent at')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='meetup',
+            name='reminders_queued_at',
+            field=models.DateTimeField(editable=False, null=True, verbose_name='Reminders queued at'),
+        ),
+        migrations.AddIndex(
+            model_name='meetup',
+            index=models.Index(fields=['date', 'time'], name='meetup_date_time_idx'),
+        ),
+        migrations.AddField(
+            model_name='meetupnotification',
+            name='meetup',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='meetup.Meetup', verbose_name='Meetup'),
+        ),
+        migrations.AddField(
+            model_name='meetupnotification',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='users.SystersUser', verbose_name='User'),
+        ),
+        migrations.AddIndex(
+            model_name='meetupnotification',
+            index=models.Index(condition=models.Q(sent_at__isnull=True), fields=['id'], name='meetup_notification_unsent_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.0.8 on 2026-10-18 19:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetup', '0009_meetup_picture_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MeetupChange',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notice_type', models.CharField(choices=[('meetup_reminder', 'Meetup reminder'), ('meetup_time_change', 'Meetup time change'), ('meetup_location_change', 'Meetup location change')], max_length=50, verbose_name='Notice type')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+                ('meetup', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='meetup.Meetup', verbose_name='Meetup')),
+            ],
+        ),
+    ]
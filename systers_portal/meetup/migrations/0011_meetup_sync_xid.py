@@ -0,0 +1,39 @@
+# Generated by Django 3.0.8 on 2026-10-18 19:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetup', '0010_meetup_changes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='meetup',
+            name='meetup_last_updated_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='meetuptombstone',
+            name='meetup_tombstone_deleted_idx',
+        ),
+        migrations.AddField(
+            model_name='meetup',
+            name='sync_xid',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Sync transaction id'),
+        ),
+        migrations.AddField(
+            model_name='meetuptombstone',
+            name='sync_xid',
+            field=models.BigIntegerField(default=0, verbose_name='Sync transaction id'),
+        ),
+        migrations.AddIndex(
+            model_name='meetup',
+            index=models.Index(fields=['sync_xid', 'id'], name='meetup_sync_xid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='meetuptombstone',
+            index=models.Index(fields=['sync_xid', 'id'], name='meetup_tombstone_sync_xid_idx'),
+        ),
+    ]
@@ -1,10 +1,21 @@
-from django.db import models
+from django.contrib.auth.models import Group
+from django.contrib.postgres.fields import JSONField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
 from cities_light.models import City
 from ckeditor.fields import RichTextField
 
+from meetup.constants import NOTIFICATION_CHOICES
 from users.models import SystersUser
 
 
+class TransactionId(models.Func):
+    """Id of the current transaction, assigned by PostgreSQL in the order transactions start"""
+    template = 'txid_current()'
+    output_field = models.BigIntegerField()
+
+
 class Meetup(models.Model):
     """Manage details of Meetups of MeetupLocations"""
     title = models.CharField(max_length=50, verbose_name="Title", )
@@ -22,12 +33,40 @@ class Meetup(models.Model):
     created_by = models.ForeignKey(
         SystersUser, null=True, verbose_name="Created By", on_delete=models.CASCADE)
     last_updated = models.DateTimeField(auto_now=True, verbose_name="Last Update")
+    # id of the transaction which last updated the meetup, orders the changes synced to the
+    # volunteer management system, see meetup.sync
+    sync_xid = models.BigIntegerField(default=0, editable=False,
+                                      verbose_name="Sync transaction id")
     meetup_picture = models.ImageField(upload_to='meetup/pictures/',
                                        blank=True,
                                        null=True,
                                        verbose_name="Meetup picture")
+    # resized copies of the meetup picture, see common.images
+    meetup_picture_variants = JSONField(default=dict, blank=True, editable=False,
+                                        verbose_name="Meetup picture variants")
+    groups = models.ManyToManyField(Group, blank=True, editable=False, related_name='meetups',
+                                    verbose_name="Groups")
+    search_vector = SearchVectorField(null=True, editable=False)
+    rsvp_coming_count = models.PositiveIntegerField(default=0, editable=False,
+                                                    verbose_name="Coming RSVPs")
+    rsvp_plus_one_count = models.PositiveIntegerField(default=0, editable=False,
+                                                      verbose_name="Plus ones of coming RSVPs")
+    rsvp_not_coming_count = models.PositiveIntegerField(default=0, editable=False,
+                                                        verbose_name="Not coming RSVPs")
+    rsvp_waitlist_count = models.PositiveIntegerField(default=0, editable=False,
+                                                      verbose_name="Waitlisted RSVPs")
+    capacity = models.PositiveIntegerField(
+        null=True, blank=True, verbose_name="Capacity",
+        help_text="Maximum number of attendees, including plus ones. Leave empty for no limit.")
+    reminders_queued_at = models.DateTimeField(null=True, editable=False,
+                                               verbose_name="Reminders queued at")
+
+    __original = None
 
     class Meta:
+        indexes = [GinIndex(fields=['search_vector'], name='meetup_search_vector_idx'),
+                   models.Index(fields=['sync_xid', 'id'], name='meetup_sync_xid_idx'),
+                   models.Index(fields=['date', 'time'], name='meetup_date_time_idx')]
         permissions = (
             ("view_meetup_request", "View Meetup Request"),
             ('approve_meetup_request', 'Approve Meetup Request'),
@@ -44,9 +83,128 @@ class Meetup(models.Model):
             ('add_support_request_comment', 'Add Support Request Comment')
         )
 
+    # maintained by UPDATEs incrementing them, see meetup.utils.update_rsvp_counters
+    RSVP_COUNTER_FIELDS = ('rsvp_coming_count', 'rsvp_plus_one_count', 'rsvp_not_coming_count',
+                           'rsvp_waitlist_count')
+    # maintained by the scheduler of meetup notifications, see meetup.notifications
+    SCHEDULER_FIELDS = ('reminders_queued_at',)
+    # maintained by the task creating the picture variants, see common.images
+    IMAGE_VARIANT_FIELDS = ('meetup_picture_variants',)
+    # fields whose changes are notified to the users coming to the meetup
+    SCHEDULE_FIELDS = ('date', 'time', 'end_date', 'end_time')
+    PLACE_FIELDS = ('venue', 'meetup_location_id')
+
+    def __init__(self, *args, **kwargs):
+        super(Meetup, self).__init__(*args, **kwargs)
+        self.__set_original()
+
     def __str__(self):
         return self.title
 
+    def __set_original(self):
+        # deferred fields are left out, reading them would query the database
+        self.__original = {name: self.__dict__[name]
+                           for name in self.SCHEDULE_FIELDS + self.PLACE_FIELDS
+                           if name in self.__dict__}
+
+    def __has_changed(self, names):
+        return any(getattr(self, name) != self.__original[name]
+                   for name in names if name in self.__original)
+
+    def save(self, *args, **kwargs):
+        """Override save to leave the RSVP counters, the scheduler fields and the picture variants
+        out of the UPDATE of an existing meetup, so that saving a meetup does not overwrite the
+        values written since it was loaded. The id of the transaction is written along with
+        last_updated."""
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            excluded = self.RSVP_COUNTER_FIELDS + self.SCHEDULER_FIELDS
+            excluded += self.IMAGE_VARIANT_FIELDS
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in excluded]
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'last_updated' in update_fields:
+            self.sync_xid = TransactionId()
+            if update_fields is not None and 'sync_xid' not in update_fields:
+                kwargs['update_fields'] = list(update_fields) + ['sync_xid']
+        super(Meetup, self).save(*args, **kwargs)
+        # the expression is no value, the id is loaded from the database if it is read
+        self.__dict__.pop('sync_xid', None)
+        self.__set_original()
+
+    def has_changed_schedule(self):
+        """Check if the date or the time of the meetup changed since it was loaded
+
+        :return: True if the meetup was rescheduled, False otherwise
+        """
+        return self.__has_changed(self.SCHEDULE_FIELDS)
+
+    def has_changed_place(self):
+        """Check if the venue or the city of the meetup changed since it was loaded
+
+        :return: True if the meetup moved, False otherwise
+        """
+        return self.__has_changed(self.PLACE_FIELDS)
+
+    @property
+    def attendee_count(self):
+        """Number of people coming to the meetup, including plus ones"""
+        return self.rsvp_coming_count + self.rsvp_plus_one_count
+
+    @property
+    def available_seats(self):
+        """Number of people who can still be admitted, None if the capacity is not limited"""
+        if self.capacity is None:
+            return None
+        return max(self.capacity - self.attendee_count, 0)
+
+
+class MeetupTombstone(models.Model):
+    """Record of a deleted Meetup, so that the systems synchronizing meetups learn about the
+    deletion"""
+    meetup_id = models.PositiveIntegerField(verbose_name="Meetup id")
+    deleted_at = models.DateTimeField(auto_now_add=True, verbose_name="Deleted at")
+    # id of the transaction which deleted the meetup, see Meetup.sync_xid
+    sync_xid = models.BigIntegerField(default=0, verbose_name="Sync transaction id")
+
+    class Meta:
+        indexes = [models.Index(fields=['sync_xid', 'id'], name='meetup_tombstone_sync_xid_idx')]
+
+    def __str__(self):
+        return "Meetup {0} deleted at {1}".format(self.meetup_id, self.deleted_at)
+
+
+class MeetupNotification(models.Model):
+    """Notification about a Meetup waiting in the outbox until the process_meetup_notifications
+    command sends it to a user"""
+    user = models.ForeignKey(SystersUser, verbose_name="User", on_delete=models.CASCADE)
+    meetup = models.ForeignKey(Meetup, verbose_name="Meetup", on_delete=models.CASCADE)
+    notice_type = models.CharField(max_length=50, choices=NOTIFICATION_CHOICES,
+                                   verbose_name="Notice type")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created at")
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name="Sent at")
+
+    class Meta:
+        indexes = [models.Index(fields=['id'], name='meetup_notification_unsent_idx',
+                                condition=models.Q(sent_at__isnull=True))]
+
+    def __str__(self):
+        return "{0} notification for {1} about meetup {2}".format(self.notice_type, self.user,
+                                                                  self.meetup)
+
+
+class MeetupChange(models.Model):
+    """Change of the date, time or place of a Meetup recorded when it is saved, until the
+    process_meetup_notifications command expands it into the notifications of the users coming
+    to the meetup"""
+    meetup = models.ForeignKey(Meetup, verbose_name="Meetup", on_delete=models.CASCADE)
+    notice_type = models.CharField(max_length=50, choices=NOTIFICATION_CHOICES,
+                                   verbose_name="Notice type")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created at")
+
+    def __str__(self):
+        return "{0} of meetup {1}".format(self.notice_type, self.meetup)
+
 
 class RequestMeetup(models.Model):
     """Manage details of Meetup Requests of MeetupLocations"""
@@ -82,13 +240,62 @@ class Rsvp(models.Model):
     meetup = models.ForeignKey(Meetup, verbose_name="Meetup", on_delete=models.CASCADE)
     coming = models.BooleanField(default=True)
     plus_one = models.BooleanField(default=False)
+    waitlisted_at = models.DateTimeField(null=True, blank=True, editable=False,
+                                         verbose_name="Waitlisted at")
+
+    __original_meetup_id = None
+    __original_counts = None
 
     class Meta:
         unique_together = (('user', 'meetup'),)
 
+    def __init__(self, *args, **kwargs):
+        super(Rsvp, self).__init__(*args, **kwargs)
+        self.__set_original()
+
     def __str__(self):
         return "{0} RSVP for meetup {1}".format(self.user, self.meetup)
 
+    def __set_original(self):
+        self.__original_meetup_id = self.meetup_id
+        self.__original_counts = self.get_counts()
+
+    @property
+    def original_meetup_id(self):
+        return self.__original_meetup_id
+
+    @property
+    def original_counts(self):
+        return self.__original_counts
+
+    @property
+    def is_waitlisted(self):
+        return self.waitlisted_at is not None
+
+    @property
+    def seats(self):
+        """Number of seats the RSVP takes or asks for"""
+        return (1 + int(self.plus_one)) if self.coming else 0
+
+    def get_counts(self):
+        """Get the contribution of the RSVP to the RSVP counters of its meetup. A plus one is
+        counted only if the user is coming and waitlisted users are not counted as coming.
+
+        :return: dict mapping Meetup counter field names to 0 or 1
+        """
+        admitted = self.coming and not self.is_waitlisted
+        return {'rsvp_coming_count': int(admitted),
+                'rsvp_plus_one_count': int(admitted and self.plus_one),
+                'rsvp_not_coming_count': int(not self.coming),
+                'rsvp_waitlist_count': int(self.coming and self.is_waitlisted)}
+
+    @transaction.atomic
+    def save(self, *args, **kwargs):
+        """Save the RSVP in the same transaction as the update of the meetup counters, which is
+        done by the post_save receiver"""
+        super(Rsvp, self).save(*args, **kwargs)
+        self.__set_original()
+
 
 class SupportRequest(models.Model):
     """Manage details of various volunteering activities"""
@@ -0,0 +1,156 @@
+import datetime
+from itertools import islice
+
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from pinax.notifications.models import send_now
+
+from meetup.constants import (MEETUP_REMINDER, MEETUP_TIME_CHANGE, MEETUP_LOCATION_CHANGE,
+                              REMINDER_LEAD_HOURS, NOTIFICATION_BATCH_SIZE)
+from meetup.ical import localize
+from meetup.models import Meetup, MeetupChange, MeetupNotification, Rsvp
+
+# UserSetting flag a user turns on to receive each type of notification
+NOTIFICATION_SETTINGS = {
+    MEETUP_REMINDER: 'reminder',
+    MEETUP_TIME_CHANGE: 'time_change',
+    MEETUP_LOCATION_CHANGE: 'location_change',
+}
+
+
+def queue_notifications(meetup_id, notice_type, batch_size=NOTIFICATION_BATCH_SIZE):
+    """Put a notification in the outbox for every user coming to a meetup who turned the
+    notification on in their settings. The recipients are streamed and inserted in batches, so
+    that the memory used does not grow with the number of RSVPs.
+
+    :param meetup_id: int id of the Meetup
+    :param notice_type: string MEETUP_REMINDER, MEETUP_TIME_CHANGE or MEETUP_LOCATION_CHANGE
+    :param batch_size: int number of notifications inserted at once
+    :return: int number of queued notifications
+    """
+    rsvps = Rsvp.objects.filter(meetup_id=meetup_id, coming=True, **{
+        'user__usersetting__' + NOTIFICATION_SETTINGS[notice_type]: True})
+    if notice_type == MEETUP_REMINDER:
+        rsvps = rsvps.filter(waitlisted_at__isnull=True)
+    user_ids = rsvps.order_by('pk').values_list('user_id', flat=True).iterator(
+        chunk_size=batch_size)
+    queued = 0
+    while True:
+        batch = [MeetupNotification(user_id=user_id, meetup_id=meetup_id,
+                                    notice_type=notice_type)
+                 for user_id in islice(user_ids, batch_size)]
+        if not batch:
+            return queued
+        MeetupNotification.objects.bulk_create(batch)
+        queued += len(batch)
+
+
+def record_changes(meetup):
+    """Record the changes of the date, time or place of a saved meetup. A single row is inserted
+    per type of change, the notifications of the users coming to the meetup are queued later by
+    expand_changes.
+
+    :param meetup: Meetup object being saved, with the values it was loaded with
+    :return: int number of recorded changes
+    """
+    notice_types = []
+    if meetup.has_changed_schedule():
+        # a rescheduled meetup gets new reminders before its new start
+        Meetup.objects.filter(pk=meetup.pk).update(reminders_queued_at=None)
+        notice_types.append(MEETUP_TIME_CHANGE)
+    if meetup.has_changed_place():
+        notice_types.append(MEETUP_LOCATION_CHANGE)
+    MeetupChange.objects.bulk_create([MeetupChange(meetup_id=meetup.pk, notice_type=notice_type)
+                                      for notice_type in notice_types])
+    return len(notice_types)
+
+
+def expand_changes(batch_size=NOTIFICATION_BATCH_SIZE):
+    """Queue the notifications about the recorded meetup changes. The changes are locked with
+    SKIP LOCKED, so several workers never expand the same change, and the changes of a type
+    recorded several times for a meetup notify its users once.
+
+    :param batch_size: int number of notifications inserted at once
+    :return: int number of queued notifications
+    """
+    queued = 0
+    while True:
+        with transaction.atomic():
+            change = MeetupChange.objects.select_for_update(skip_locked=True).order_by(
+                'pk').first()
+            if change is None:
+                return queued
+            change_ids = list(MeetupChange.objects.select_for_update(skip_locked=True).filter(
+                meetup_id=change.meetup_id, notice_type=change.notice_type).values_list(
+                'pk', flat=True))
+            queued += queue_notifications(change.meetup_id, change.notice_type, batch_size)
+            MeetupChange.objects.filter(pk__in=change_ids).delete()
+
+
+def get_meetups_due_for_reminders(now=None, lead_hours=REMINDER_LEAD_HOURS):
+    """Get the meetups starting within the lead time whose reminders were not queued yet. The
+    candidates are found by a range query on the (date, time) index, wide enough for the time
+    zones of all the cities, then their start is compared to the window in their own time zone.
+
+    :param now: aware datetime, now by default
+    :param lead_hours: int hours before the start of a meetup its reminders are sent
+    :return: list of Meetup objects
+    """
+    now = now or timezone.now()
+    until = now + datetime.timedelta(hours=lead_hours)
+    candidates = Meetup.objects.filter(
+        date__gte=now.date() - datetime.timedelta(days=1),
+        date__lte=until.date() + datetime.timedelta(days=1),
+        reminders_queued_at__isnull=True,
+    ).select_related('meetup_location').order_by('date', 'time')
+    due = []
+    for meetup in candidates:
+        start = localize(meetup, meetup.date, meetup.time)
+        if start is not None and now <= start <= until:
+            due.append(meetup)
+    return due
+
+
+def queue_reminders(now=None, lead_hours=REMINDER_LEAD_HOURS):
+    """Queue the reminders of the meetups starting within the lead time. Each meetup is claimed
+    by setting its reminders_queued_at, so that its reminders are queued once even when several
+    schedulers run.
+
+    :param now: aware datetime, now by default
+    :param lead_hours: int hours before the start of a meetup its reminders are sent
+    :return: int number of queued notifications
+    """
+    now = now or timezone.now()
+    queued = 0
+    for meetup in get_meetups_due_for_reminders(now, lead_hours):
+        with transaction.atomic():
+            claimed = Meetup.objects.filter(
+                pk=meetup.pk, reminders_queued_at__isnull=True).update(reminders_queued_at=now)
+            if claimed:
+                queued += queue_notifications(meetup.pk, MEETUP_REMINDER)
+    return queued
+
+
+def send_notifications(batch_size=NOTIFICATION_BATCH_SIZE):
+    """Send a batch of the notifications waiting in the outbox with pinax notifications. The
+    batch is locked with SKIP LOCKED, so several workers can drain the outbox together.
+
+    :param batch_size: int maximum number of notifications sent
+    :return: int number of sent notifications, 0 once the outbox is empty
+    """
+    with transaction.atomic():
+        notifications = list(MeetupNotification.objects.select_for_update(
+            skip_locked=True, of=('self',)
+        ).filter(sent_at__isnull=True).select_related(
+            'user__user', 'meetup__meetup_location').order_by('pk')[:batch_size])
+        for notification in notifications:
+            meetup = notification.meetup
+            send_now([notification.user.user], notification.notice_type, {
+                'meetup': meetup,
+                'meetup_url': reverse('view_meetup', kwargs={'slug': meetup.slug}),
+            })
+        MeetupNotification.objects.filter(
+            pk__in=[notification.pk for notification in notifications]
+        ).update(sent_at=timezone.now())
+    return len(notifications)
@@ -0,0 +1,113 @@
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_distances(latitude, longitude, latitudes, longitudes):
+    """Compute great-circle distances from one point to many points at once
+
+    :param latitude: float latitude of the origin in degrees
+    :param longitude: float longitude of the origin in degrees
+    :param latitudes: numpy array of latitudes in degrees
+    :param longitudes: numpy array of longitudes in degrees
+    :return: numpy array of distances in kilometers, NaN where a coordinate is missing
+    """
+    lat1 = np.radians(latitude)
+    lat2 = np.radians(latitudes)
+    dlat = lat2 - lat1
+    dlon = np.radians(longitudes) - np.radians(longitude)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class MeetupRanking(object):
+    """Rank meetups by their distance from a point, in one batch over NumPy arrays.
+
+    Meetups are ordered by distance, then by decreasing relevance to the searched keyword, then
+    by date and time, then by primary key, so equally distant and relevant meetups keep a stable
+    chronological order. Meetups whose location has no coordinates
+    are ranked after all the others.
+    """
+    fields = ('pk', 'date', 'time', 'meetup_location__latitude', 'meetup_location__longitude')
+
+    def __init__(self, rows):
+        """
+        :param rows: sequence of tuples (pk, date, time, latitude, longitude), as returned by
+                     values_list() over MeetupRanking.fields
+        """
+        self.rows = rows
+        count = len(rows)
+        self.pks = np.fromiter((row[0] for row in rows), dtype=np.int64, count=count)
+        self.dates = np.fromiter((row[1].toordinal() for row in rows), dtype=np.int64,
+                                 count=count)
+        self.times = np.fromiter((self._seconds(row[2]) for row in rows), dtype=np.int64,
+                                 count=count)
+        self.latitudes = np.fromiter((self._float(row[3]) for row in rows), dtype=np.float64,
+                                     count=count)
+        self.longitudes = np.fromiter((self._float(row[4]) for row in rows), dtype=np.float64,
+                                      count=count)
+
+    @classmethod
+    def from_queryset(cls, queryset, fields=()):
+        """Build the ranking from a Meetup queryset with a single query
+
+        :param queryset: Meetup QuerySet
+        :param fields: extra field names to load for every meetup after MeetupRanking.fields
+        :return: MeetupRanking object
+        """
+        return cls(list(queryset.values_list(*(cls.fields + tuple(fields)))))
+
+    @staticmethod
+    def _float(value):
+        return np.nan if value is None else float(value)
+
+    @staticmethod
+    def _seconds(value):
+        if value is None:
+            return 0
+        return value.hour * 3600 + value.minute * 60 + value.second
+
+    def __len__(self):
+        return len(self.rows)
+
+    def distances(self, latitude, longitude):
+        """Distances in kilometers of all meetups from a point
+
+        :return: numpy array of distances, NaN for meetups without coordinates
+        """
+        return haversine_distances(latitude, longitude, self.latitudes, self.longitudes)
+
+    def rank(self, latitude=None, longitude=None, radius=None, limit=None, relevance=None):
+        """Order the meetups by distance from a point.
+
+        :param latitude: float latitude of the point, None to order by date only
+        :param longitude: float longitude of the point, None to order by date only
+        :param radius: float maximum distance in kilometers, None for no limit
+        :param limit: int number of nearest meetups to return, None for all of them
+        :param relevance: numpy array of search ranks of the meetups, None if all the meetups are
+                          equally relevant
+        :return: tuple (indices, distances) of numpy arrays, where indices point into the rows
+                 the ranking was built from and distances are in kilometers
+        """
+        if latitude is None or longitude is None:
+            distances = np.full(len(self), np.nan)
+        else:
+            distances = self.distances(latitude, longitude)
+        indices = np.arange(len(self))
+        if radius is not None:
+            indices = indices[distances <= radius]
+        if limit is not None and limit < len(indices):
+            # select the limit nearest candidates without sorting everything, keeping all the
+            # meetups tied with the farthest of them so the final order stays stable
+            sort_keys = np.where(np.isnan(distances[indices]), np.inf, distances[indices])
+            threshold = np.partition(sort_keys, limit - 1)[limit - 1]
+            indices = indices[sort_keys <= threshold]
+        keys = distances[indices]
+        if relevance is None:
+            relevance = np.zeros(len(self))
+        order = np.lexsort((self.pks[indices], self.times[indices], self.dates[indices],
+                            -relevance[indices], np.where(np.isnan(keys), np.inf, keys)))
+        indices = indices[order]
+        if limit is not None:
+            indices = indices[:limit]
+        return indices, distances[indices]
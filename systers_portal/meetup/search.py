@@ -0,0 +1,53 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import F, FloatField, Value
+
+from meetup.constants import SEARCH_CONFIG
+
+
+def get_search_vector():
+    """Weighted search vector of a meetup: title over venue over description
+
+    :return: SearchVector expression
+    """
+    vector = SearchVector('title', weight='A', config=SEARCH_CONFIG)
+    vector += SearchVector('venue', weight='B', config=SEARCH_CONFIG)
+    return vector + SearchVector('description', weight='C', config=SEARCH_CONFIG)
+
+
+def update_search_vector(queryset):
+    """Recompute the search vector of meetups with a single UPDATE
+
+    :param queryset: Meetup QuerySet
+    """
+    queryset.update(search_vector=get_search_vector())
+
+
+def get_search_query(keyword):
+    """Build a query matching meetups that contain all the words of a keyword, the last letters
+    of each word being optional so that partially typed words match as well
+
+    :param keyword: string searched by the user
+    :return: SearchQuery object or None if the keyword contains no words
+    """
+    words = re.findall(r'\w+', keyword or '')
+    if not words:
+        return None
+    return SearchQuery(' & '.join('{0}:*'.format(word) for word in words),
+                       config=SEARCH_CONFIG, search_type='raw')
+
+
+def search_meetups(queryset, keyword):
+    """Filter meetups matching a keyword through the indexed search vector and annotate them with
+    their relevance as `search_rank`
+
+    :param queryset: Meetup QuerySet
+    :param keyword: string searched by the user
+    :return: Meetup QuerySet, unfiltered with a zero search_rank if the keyword is empty
+    """
+    query = get_search_query(keyword)
+    if query is None:
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+    return queryset.filter(search_vector=query).annotate(
+        search_rank=SearchRank(F('search_vector'), query))
@@ -1,10 +1,15 @@
-from django.db.models.signals import post_save, post_delete, post_migrate
+from django.db.models.signals import post_save, post_delete, pre_delete, post_migrate
 from django.dispatch import receiver
 from pinax.notifications.models import NoticeType
 
-from meetup.models import Meetup
-from meetup.constants import COMMUNITY_LEADER
-from meetup.utils import (create_groups, assign_permissions, remove_groups)
+from common.images import register_picture_field
+from meetup.models import Meetup, MeetupTombstone, Rsvp, TransactionId
+from meetup.constants import (COMMUNITY_LEADER, MEETUP_REMINDER, MEETUP_TIME_CHANGE,
+                              MEETUP_LOCATION_CHANGE, MEETUP_PICTURE_WIDTHS)
+from meetup.notifications import record_changes
+from meetup.search import update_search_vector
+from meetup.utils import (create_groups, assign_permissions, remove_groups,
+                          update_rsvp_counters, promote_waitlist)
 
 
 @receiver(post_save, sender=Meetup, dispatch_uid="manage_groups")
@@ -14,16 +19,83 @@ def manage_meetup_groups(sender, instance, created, **kwargs):
     if created:
         groups = create_groups(name)
         assign_permissions(instance, groups)
+        instance.groups.add(*groups)
         community_leader_group = next(
             g for g in groups if g.name == COMMUNITY_LEADER.format(name))
         instance.leader.join_group(community_leader_group)
-        instance.save()
 
 
-@receiver(post_delete, sender=Meetup, dispatch_uid="remove_groups")
+@receiver(post_save, sender=Meetup, dispatch_uid="update_search_vector")
+def update_meetup_search_vector(sender, instance, update_fields=None, **kwargs):
+    """Recompute the search vector of a Meetup after the searched fields may have changed"""
+    if update_fields is not None and \
+       not {'title', 'venue', 'description'}.intersection(update_fields):
+        return
+    update_search_vector(Meetup.objects.filter(pk=instance.pk))
+
+
+@receiver(pre_delete, sender=Meetup, dispatch_uid="remove_groups")
 def remove_meetup_groups(sender, instance, **kwargs):
-    """Remove user groups for a particular Meetup Location"""
-    remove_groups(instance.title)
+    """Remove user groups for a particular Meetup, before the meetup to groups mapping is
+    deleted with it"""
+    remove_groups(instance)
+
+
+@receiver(post_delete, sender=Meetup, dispatch_uid="record_meetup_tombstone")
+def record_meetup_tombstone(sender, instance, **kwargs):
+    """Record the deletion of a Meetup for the systems synchronizing meetups"""
+    MeetupTombstone.objects.create(meetup_id=instance.pk, sync_xid=TransactionId())
+
+
+@receiver(post_save, sender=Rsvp, dispatch_uid="count_saved_rsvp")
+def count_saved_rsvp(sender, instance, created, raw, **kwargs):
+    """Update the RSVP counters of the meetup by the difference between the saved RSVP and
+    the RSVP as it was loaded. Fixtures are left to the recount_rsvps command."""
+    if raw:
+        return
+    counts = instance.get_counts()
+    if created:
+        update_rsvp_counters(instance.meetup_id, counts)
+    elif instance.original_meetup_id != instance.meetup_id:
+        update_rsvp_counters(instance.original_meetup_id, instance.original_counts, -1)
+        update_rsvp_counters(instance.meetup_id, counts)
+    else:
+        update_rsvp_counters(instance.meetup_id, {
+            field: count - instance.original_counts[field] for field, count in counts.items()})
+
+
+@receiver(post_delete, sender=Rsvp, dispatch_uid="count_deleted_rsvp")
+def count_deleted_rsvp(sender, instance, **kwargs):
+    """Remove a deleted RSVP from the RSVP counters of its meetup"""
+    update_rsvp_counters(instance.original_meetup_id, instance.original_counts, -1)
+
+
+@receiver(post_delete, sender=Rsvp, dispatch_uid="promote_waitlist_on_rsvp_delete")
+def promote_waitlist_on_rsvp_delete(sender, instance, **kwargs):
+    """Give the seats of a deleted RSVP to the waitlist of its meetup"""
+    if instance.original_counts['rsvp_coming_count']:
+        promote_waitlist(instance.original_meetup_id)
+
+
+@receiver(post_save, sender=Meetup, dispatch_uid="promote_waitlist_on_meetup_save")
+def promote_waitlist_on_meetup_save(sender, instance, created, update_fields=None, **kwargs):
+    """Admit waitlisted RSVPs after the capacity of a meetup may have been raised"""
+    if created or (update_fields is not None and 'capacity' not in update_fields):
+        return
+    if instance.rsvp_waitlist_count:
+        promote_waitlist(instance.pk)
+
+
+@receiver(post_save, sender=Meetup, dispatch_uid="record_meetup_changes")
+def record_meetup_changes(sender, instance, created, raw, **kwargs):
+    """Record the changes of the date, time or place of a meetup. The process_meetup_notifications
+    command notifies the users coming to it."""
+    if created or raw:
+        return
+    record_changes(instance)
+
+
+register_picture_field(Meetup, 'meetup_picture', MEETUP_PICTURE_WIDTHS)
 
 
 @receiver(post_migrate, dispatch_uid="create_notice_types")
@@ -37,3 +109,9 @@ def create_notice_types(sender, **kwargs):
                       ("your support request has been approved"))
     NoticeType.create("new_meetup_request", ("New Meetup Request"),
                       ("a user has added a meetup request"))
+    NoticeType.create(MEETUP_REMINDER, "Meetup Reminder",
+                      "a meetup you are coming to starts soon")
+    NoticeType.create(MEETUP_TIME_CHANGE, "Meetup Time Change",
+                      "the date or time of a meetup you are coming to changed")
+    NoticeType.create(MEETUP_LOCATION_CHANGE, "Meetup Location Change",
+                      "the location of a meetup you are coming to changed")
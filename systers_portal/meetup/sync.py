@@ -0,0 +1,124 @@
+import base64
+import binascii
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import BigIntegerField, Func, Q
+
+from meetup.constants import VMS_SYNC_PAGE_SIZE
+from meetup.models import Meetup, MeetupTombstone
+
+# fields of the meetups sent to the volunteer management system, with their names in the API
+MEETUP_EXPORT_FIELDS = (('pk', 'meetup_id'), ('title', 'event_name'), ('date', 'start_date'),
+                        ('venue', 'venue'), ('end_date', 'end_date'),
+                        ('description', 'description'))
+MEETUP_SYNC_FIELDS = MEETUP_EXPORT_FIELDS + (('last_updated', 'last_updated'),)
+
+# number of meetups fetched at once from the database cursor of a streamed export
+EXPORT_CHUNK_SIZE = 500
+
+
+class InvalidCursor(ValueError):
+    """The sync cursor was not issued by get_meetup_changes"""
+
+
+class SettledTransactionId(Func):
+    """Id of the oldest transaction still running when the statement starts. Every transaction
+    with a lower id has committed or rolled back, so no change with a lower id can appear
+    later."""
+    template = 'txid_snapshot_xmin(txid_current_snapshot())'
+    output_field = BigIntegerField()
+
+
+def encode_cursor(meetups_position, tombstones_position):
+    """Encode the positions reached in the changed meetups and in the tombstones into an opaque
+    cursor
+
+    :param meetups_position: tuple (int sync_xid, int pk) of the last synced meetup or None
+    :param tombstones_position: tuple (int sync_xid, int pk) of the last synced tombstone or
+                                None
+    :return: string URL safe cursor
+    """
+    positions = [None if position is None else list(position)
+                 for position in (meetups_position, tombstones_position)]
+    return base64.urlsafe_b64encode(json.dumps(positions).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor returned by encode_cursor
+
+    :param cursor: string cursor
+    :return: tuple (meetups position, tombstones position)
+    :raises InvalidCursor: if the cursor can't be decoded
+    """
+    try:
+        positions = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+        meetups_position, tombstones_position = [
+            None if position is None else (int(position[0]), int(position[1]))
+            for position in positions]
+    except (binascii.Error, UnicodeError, TypeError, ValueError, IndexError) as e:
+        raise InvalidCursor("Invalid sync cursor: {0}".format(e))
+    return meetups_position, tombstones_position
+
+
+def _get_page(queryset, position, limit):
+    """Get the settled rows of queryset after position in (sync_xid, pk) order, up to limit + 1
+    rows"""
+    queryset = queryset.filter(sync_xid__lt=SettledTransactionId())
+    if position is not None:
+        sync_xid, pk = position
+        queryset = queryset.filter(Q(sync_xid__gt=sync_xid) | Q(sync_xid=sync_xid, pk__gt=pk))
+    return list(queryset.order_by('sync_xid', 'pk')[:limit + 1])
+
+
+def get_meetup_changes(cursor=None, limit=VMS_SYNC_PAGE_SIZE):
+    """Get a page of the meetups changed and deleted since a cursor. Meetups and tombstones are
+    read in the order of the transactions which wrote them, served by indexes, so a poll that
+    finds no change costs two index lookups. Only the changes of the transactions below the
+    oldest running transaction are read, so a transaction still running during a poll has a
+    higher id than the cursor of that poll and its changes are read once it commits, however
+    long it runs. A long transaction delays the changes of the later ones until it ends.
+
+    :param cursor: string cursor returned by a previous call, None to start from the beginning
+    :param limit: int maximum number of changed meetups and of deleted meetups in the page
+    :return: dict with the changed meetups, the ids of the deleted meetups, the cursor of the
+             next page and whether more changes are already available
+    :raises InvalidCursor: if the cursor can't be decoded
+    """
+    meetups_position, tombstones_position = (None, None) if not cursor else \
+        decode_cursor(cursor)
+    fields = [field for field, name in MEETUP_SYNC_FIELDS]
+    meetups = _get_page(Meetup.objects.values('sync_xid', *fields), meetups_position, limit)
+    tombstones = _get_page(MeetupTombstone.objects.values('pk', 'meetup_id', 'sync_xid'),
+                           tombstones_position, limit)
+    has_more = len(meetups) > limit or len(tombstones) > limit
+    meetups, tombstones = meetups[:limit], tombstones[:limit]
+    if meetups:
+        meetups_position = (meetups[-1]['sync_xid'], meetups[-1]['pk'])
+    if tombstones:
+        tombstones_position = (tombstones[-1]['sync_xid'], tombstones[-1]['pk'])
+    return {'meetups': [{name: meetup[field] for field, name in MEETUP_SYNC_FIELDS}
+                        for meetup in meetups],
+            'deleted': [tombstone['meetup_id'] for tombstone in tombstones],
+            'cursor': encode_cursor(meetups_position, tombstones_position),
+            'has_more': has_more}
+
+
+def iter_meetups_json(meetups, chunk_size=EXPORT_CHUNK_SIZE):
+    """Serialize meetups into a JSON array piece by piece. Only the exported columns are read,
+    through a database cursor, so the memory used does not grow with the number of meetups
+    and the first bytes are produced before the last meetup is read.
+
+    :param meetups: Meetup QuerySet
+    :param chunk_size: int number of meetups fetched from the database cursor at once
+    :return: iterator of strings, which joined are the same JSON array as the one JsonResponse
+             would produce for the list of exported meetups
+    """
+    fields = [field for field, name in MEETUP_EXPORT_FIELDS]
+    names = [name for field, name in MEETUP_EXPORT_FIELDS]
+    encoder = DjangoJSONEncoder()
+    separator = "["
+    for row in meetups.values_list(*fields).iterator(chunk_size=chunk_size):
+        yield separator + encoder.encode(dict(zip(names, row)))
+        separator = ", "
+    yield "[]" if separator == "[" else "]"
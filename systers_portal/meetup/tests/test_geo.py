@@ -0,0 +1,103 @@
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, RequestFactory
+from cities_light.models import City, Country
+from geoip2.errors import AddressNotFoundError
+
+from meetup.geo import (GeoIPService, GeoLocation, UNKNOWN_LOCATION, find_city,
+                        get_city_coordinates, get_user_coordinates)
+
+
+class GeoTestCase(TestCase):
+    def setUp(self):
+        country = Country.objects.create(name='Bar', continent='AS')
+        self.city = City.objects.create(name='Baz', display_name='Baz, Bar', country=country,
+                                        latitude=10.5, longitude=-20.25)
+        self.city_without_coordinates = City.objects.create(name='Foo', display_name='Foo, Bar',
+                                                            country=country)
+
+    def test_get_city_coordinates(self):
+        """Test reading coordinates from a City row"""
+        self.assertEqual(get_city_coordinates(self.city), (10.5, -20.25))
+        self.assertIsNone(get_city_coordinates(self.city_without_coordinates))
+        self.assertIsNone(get_city_coordinates(None))
+
+    def test_find_city(self):
+        """Test finding a City by its display name or name"""
+        self.assertEqual(find_city('Baz, Bar'), self.city)
+        self.assertEqual(find_city('baz'), self.city)
+        self.assertIsNone(find_city('Foo'))
+        self.assertIsNone(find_city(''))
+        self.assertIsNone(find_city(None))
+
+    def test_get_user_coordinates(self):
+        """Test resolving a searched location to coordinates"""
+        request = RequestFactory().post('/')
+        self.assertEqual(get_user_coordinates(request, 'Baz'), (10.5, -20.25))
+        self.assertIsNone(get_user_coordinates(request, 'Unknown'))
+
+
+class FakeReader(object):
+    """Stand-in for geoip2.database.Reader that knows a single address"""
+    instances = 0
+
+    def __init__(self, path, mode=None):
+        FakeReader.instances += 1
+        self.lookups = 0
+
+    def city(self, ip):
+        self.lookups += 1
+        if ip != '8.8.8.8':
+            raise AddressNotFoundError(ip)
+        return SimpleNamespace(city=SimpleNamespace(name='Mountain View'),
+                               location=SimpleNamespace(latitude=37.4, longitude=-122.1))
+
+
+class GeoIPServiceTestCase(SimpleTestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.mmdb')
+        os.close(handle)
+        FakeReader.instances = 0
+        patcher = mock.patch('geoip2.database.Reader', FakeReader)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(os.remove, self.path)
+
+    def test_lookup_is_cached(self):
+        """Test that repeated lookups of an address are served from the cache"""
+        service = GeoIPService(path=self.path, cache_size=10, check_interval=0)
+        location = GeoLocation('Mountain View', 37.4, -122.1)
+        self.assertEqual(service.lookup('8.8.8.8'), location)
+        self.assertEqual(service.lookup('8.8.8.8'), location)
+        self.assertEqual(service.lookup('10.0.0.1'), UNKNOWN_LOCATION)
+        self.assertEqual(service.stats(), {'hits': 1, 'misses': 2, 'reloads': 1, 'size': 2})
+        self.assertEqual(FakeReader.instances, 1)
+
+    def test_cache_is_bounded(self):
+        """Test that the least recently used lookups are evicted"""
+        service = GeoIPService(path=self.path, cache_size=2, check_interval=0)
+        service.lookup('10.0.0.1')
+        service.lookup('10.0.0.2')
+        service.lookup('10.0.0.1')
+        service.lookup('10.0.0.3')
+        self.assertEqual(list(service._cache), ['10.0.0.1', '10.0.0.3'])
+
+    def test_reload_when_file_replaced(self):
+        """Test that the database is reopened when the file changes on disk"""
+        service = GeoIPService(path=self.path, cache_size=10, check_interval=0)
+        service.lookup('8.8.8.8')
+        with open(self.path, 'w') as database:
+            database.write('new database')
+        service.lookup('8.8.8.8')
+        self.assertEqual(FakeReader.instances, 2)
+        self.assertEqual(service.stats()['reloads'], 2)
+        self.assertEqual(service.stats()['misses'], 2)
+
+    def test_missing_database(self):
+        """Test that addresses can't be located without a database"""
+        service = GeoIPService(path=os.path.join(self.path, 'missing'), check_interval=0)
+        self.assertEqual(service.lookup('8.8.8.8'), UNKNOWN_LOCATION)
+        self.assertEqual(FakeReader.instances, 0)
@@ -0,0 +1,132 @@
+import datetime
+
+from cities_light.models import City, Country
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from meetup.ical import escape_text, fold_line, get_calendar_token, get_user_id
+from meetup.models import Meetup, Rsvp
+from users.models import SystersUser
+
+
+class ICalTestCase(TestCase):
+    def test_escape_text(self):
+        """Test escaping the special characters of TEXT values"""
+        self.assertEqual(escape_text('a\\b;c,d\r\ne\nf'), 'a\\\\b\\;c\\,d\\ne\\nf')
+
+    def test_fold_line(self):
+        """Test folding long lines without splitting characters"""
+        self.assertEqual(fold_line('SUMMARY:Foo'), 'SUMMARY:Foo\r\n')
+        folded = fold_line('DESCRIPTION:' + 'é' * 100)
+        lines = folded.split('\r\n')
+        self.assertEqual(lines[-1], '')
+        self.assertTrue(all(len(line.encode('utf-8')) <= 75 for line in lines))
+        self.assertTrue(all(line.startswith(' ') for line in lines[1:-1]))
+        self.assertEqual(''.join(line[1:] if i else line for i, line in enumerate(lines)),
+                         'DESCRIPTION:' + 'é' * 100)
+
+    def test_calendar_token(self):
+        """Test that calendar tokens can't be forged"""
+        user = User.objects.create_user(username='foo', password='foobar')
+        token = get_calendar_token(user)
+        self.assertEqual(get_user_id(token), user.pk)
+        self.assertIsNone(get_user_id(token[:-1]))
+        self.assertIsNone(get_user_id('{0}:foo'.format(user.pk)))
+
+
+class MeetupCalendarViewTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='foo', password='foobar')
+        self.systers_user = SystersUser.objects.get(user=self.user)
+        country = Country.objects.create(name='Portugal', continent='EU')
+        self.lisbon = City.objects.create(name='Lisbon', display_name='Lisbon, Portugal',
+                                          country=country, timezone='Europe/Lisbon')
+        self.porto = City.objects.create(name='Porto', display_name='Porto, Portugal',
+                                         country=country)
+        tomorrow = timezone.now().date() + datetime.timedelta(days=1)
+        self.meetup = Meetup.objects.create(title='Foo, Bar', slug='foo', date=tomorrow,
+                                            time=datetime.time(18, 30), end_time=None,
+                                            description='<p>Learning; Python</p>',
+                                            venue='Library', meetup_location=self.lisbon,
+                                            created_by=self.systers_user,
+                                            leader=self.systers_user)
+        self.other_meetup = Meetup.objects.create(title='Baz', slug='baz', date=tomorrow,
+                                                  time=datetime.time(10, 0),
+                                                  description='Baz', meetup_location=self.porto,
+                                                  created_by=self.systers_user,
+                                                  leader=self.systers_user)
+        Meetup.objects.create(title='Past', slug='past',
+                              date=tomorrow - datetime.timedelta(days=7),
+                              time=datetime.time(10, 0), description='Past',
+                              meetup_location=self.porto, created_by=self.systers_user,
+                              leader=self.systers_user)
+
+    def get_calendar(self, url, **headers):
+        response = self.client.get(url, **headers)
+        content = b''.join(response.streaming_content).decode('utf-8') \
+            if response.status_code == 200 else ''
+        return response, content
+
+    def test_upcoming_calendar(self):
+        """Test the calendar of the upcoming meetups"""
+        response, content = self.get_calendar(reverse('meetup_calendar'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        self.assertIn('public', response['Cache-Control'])
+        self.assertTrue(content.startswith('BEGIN:VCALENDAR\r\nVERSION:2.0\r\n'))
+        self.assertTrue(content.endswith('END:VCALENDAR\r\n'))
+        self.assertEqual(content.count('BEGIN:VEVENT'), 2)
+        self.assertIn('SUMMARY:Foo\\, Bar\r\n', content)
+        self.assertIn('DESCRIPTION:Learning\\; Python\r\n', content)
+        self.assertIn('LOCATION:Library\\, Lisbon\\, Portugal\r\n', content)
+        self.assertIn('URL:http://testserver/meetup/foo/\r\n', content)
+        # the time of the meetup is in the time zone of its city
+        start = timezone.make_aware(datetime.datetime.combine(self.meetup.date,
+                                                              datetime.time(18, 30)),
+                                    self.lisbon.get_timezone_info())
+        self.assertIn('DTSTART:{0}\r\n'.format(
+            start.astimezone(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')), content)
+        self.assertNotIn('Past', content)
+
+    def test_calendar_conditional_get(self):
+        """Test that polling an unchanged calendar gets a 304 response"""
+        url = reverse('meetup_calendar')
+        response, content = self.get_calendar(url)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+        response, content = self.get_calendar(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        response, content = self.get_calendar(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+        self.other_meetup.delete()
+        response, content = self.get_calendar(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(content.count('BEGIN:VEVENT'), 1)
+
+    def test_city_calendar(self):
+        """Test the calendar of the upcoming meetups in a city"""
+        response, content = self.get_calendar(
+            reverse('city_meetup_calendar', kwargs={'city_id': self.porto.pk}))
+        self.assertEqual(content.count('BEGIN:VEVENT'), 1)
+        self.assertIn('SUMMARY:Baz\r\n', content)
+        self.assertIn('X-WR-CALNAME:Systers Meetups in Porto\\, Portugal\r\n', content)
+        response = self.client.get(reverse('city_meetup_calendar', kwargs={'city_id': 0}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_user_calendar(self):
+        """Test the calendar of the meetups a user is coming to"""
+        Rsvp.objects.create(user=self.systers_user, meetup=self.meetup)
+        Rsvp.objects.create(user=self.systers_user, meetup=self.other_meetup, coming=False)
+        url = reverse('user_meetup_calendar', kwargs={'token': get_calendar_token(self.user)})
+        response, content = self.get_calendar(url)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertEqual(content.count('BEGIN:VEVENT'), 1)
+        self.assertIn('SUMMARY:Foo\\, Bar\r\n', content)
+        response = self.client.get(reverse('user_meetup_calendar',
+                                           kwargs={'token': '{0}:foo'.format(self.user.pk)}))
+        self.assertEqual(response.status_code, 404)
+
+        self.client.login(username='foo', password='foobar')
+        response = self.client.get(reverse('user', kwargs={'username': 'foo'}))
+        self.assertEqual(response.context['meetup_calendar_url'], 'http://testserver' + url)
@@ -69,6 +69,56 @@ class RsvpTestCase(MeetupBaseTestCase, TestCase):
     def test_str(self):
         self.assertEqual(str(self.rsvp), "foo RSVP for meetup Test Meetup")
 
+    def assertCounters(self, meetup, coming, plus_one, not_coming):
+        meetup.refresh_from_db()
+        self.assertEqual((meetup.rsvp_coming_count, meetup.rsvp_plus_one_count,
+                          meetup.rsvp_not_coming_count), (coming, plus_one, not_coming))
+
+    def test_rsvp_counters(self):
+        """Test that the meetup counters follow the RSVPs being created, changed and deleted"""
+        self.assertCounters(self.meetup, 1, 0, 0)
+        user = User.objects.create(username='bar', password='foobar')
+        rsvp = Rsvp.objects.create(user=SystersUser.objects.get(user=user), meetup=self.meetup,
+                                   plus_one=True)
+        self.assertCounters(self.meetup, 2, 1, 0)
+        self.assertEqual(self.meetup.attendee_count, 3)
+        rsvp.coming = False
+        rsvp.save()
+        # plus ones are counted only for the users who are coming
+        self.assertCounters(self.meetup, 1, 0, 1)
+        rsvp.save()
+        self.assertCounters(self.meetup, 1, 0, 1)
+        rsvp = Rsvp.objects.get(pk=rsvp.pk)
+        rsvp.coming = True
+        rsvp.save()
+        self.assertCounters(self.meetup, 2, 1, 0)
+        rsvp.delete()
+        self.assertCounters(self.meetup, 1, 0, 0)
+        # RSVPs deleted in cascade are uncounted too
+        user.delete()
+        self.assertCounters(self.meetup, 1, 0, 0)
+        user = User.objects.create(username='baz', password='foobar')
+        Rsvp.objects.create(user=SystersUser.objects.get(user=user), meetup=self.meetup,
+                            coming=False)
+        self.assertCounters(self.meetup, 1, 0, 1)
+        user.delete()
+        self.assertCounters(self.meetup, 1, 0, 0)
+
+    def test_rsvp_counters_meetup_change(self):
+        """Test moving an RSVP to another meetup"""
+        other_meetup = Meetup.objects.create(title="Other Meetup", slug="other",
+                                             date=timezone.now().date(),
+                                             time=timezone.now().time(),
+                                             description="This is a testing meetup.",
+                                             meetup_location=self.location,
+                                             leader=self.systers_user,
+                                             created_by=self.systers_user)
+        self.rsvp.meetup = other_meetup
+        self.rsvp.plus_one = True
+        self.rsvp.save()
+        self.assertCounters(self.meetup, 0, 0, 0)
+        self.assertCounters(other_meetup, 1, 1, 0)
+
 
 class SupportRequestTestCase(MeetupBaseTestCase, TestCase):
     def setUp(self):
@@ -0,0 +1,147 @@
+import datetime
+from io import StringIO
+
+from cities_light.models import City, Country
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from meetup.constants import MEETUP_REMINDER, MEETUP_TIME_CHANGE, MEETUP_LOCATION_CHANGE
+from meetup.models import Meetup, MeetupChange, MeetupNotification, Rsvp
+from meetup.notifications import (queue_notifications, expand_changes,
+                                  get_meetups_due_for_reminders, queue_reminders,
+                                  send_notifications)
+from users.models import SystersUser, UserSetting
+
+
+class MeetupNotificationsTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='foo', password='foobar',
+                                             email='foo@example.com')
+        self.systers_user = SystersUser.objects.get(user=self.user)
+        country = Country.objects.create(name='Portugal', continent='EU')
+        self.location = City.objects.create(name='Lisbon', display_name='Lisbon, Portugal',
+                                            country=country, timezone='Europe/Lisbon')
+        self.other_location = City.objects.create(name='Porto', display_name='Porto, Portugal',
+                                                  country=country)
+        self.now = timezone.now().replace(microsecond=0)
+        start = timezone.localtime(self.now + datetime.timedelta(hours=6),
+                                   self.location.get_timezone_info())
+        self.meetup = Meetup.objects.create(title='Foo', slug='foo', date=start.date(),
+                                            time=start.time(), description='Foo',
+                                            venue='Library', meetup_location=self.location,
+                                            created_by=self.systers_user,
+                                            leader=self.systers_user)
+
+    def _create_rsvp(self, username, coming=True, **settings):
+        user = User.objects.create_user(username=username, password='foobar',
+                                        email=username + '@example.com')
+        systers_user = SystersUser.objects.get(user=user)
+        UserSetting.objects.filter(user=systers_user).update(**settings)
+        return Rsvp.objects.create(user=systers_user, meetup=self.meetup, coming=coming)
+
+    def test_queue_notifications(self):
+        """Test that notifications are queued for the users who turned them on"""
+        reminded = self._create_rsvp('reminded', reminder=True)
+        waitlisted = self._create_rsvp('waitlisted', reminder=True, time_change=True)
+        Rsvp.objects.filter(pk=waitlisted.pk).update(waitlisted_at=self.now)
+        self._create_rsvp('not-coming', coming=False, reminder=True)
+        self._create_rsvp('opted-out')
+        self.assertEqual(queue_notifications(self.meetup.pk, MEETUP_REMINDER, batch_size=1), 1)
+        self.assertEqual(queue_notifications(self.meetup.pk, MEETUP_TIME_CHANGE), 1)
+        self.assertCountEqual(MeetupNotification.objects.values_list('user_id', 'notice_type'),
+                              [(reminded.user_id, MEETUP_REMINDER),
+                               (waitlisted.user_id, MEETUP_TIME_CHANGE)])
+
+    def test_change_notifications(self):
+        """Test that rescheduling or moving a meetup records a change, which is expanded into
+        notifications later"""
+        rsvp = self._create_rsvp('bar', time_change=True, location_change=True)
+        self.meetup.description = 'Bar'
+        self.meetup.save()
+        self.assertFalse(MeetupChange.objects.exists())
+
+        Meetup.objects.filter(pk=self.meetup.pk).update(reminders_queued_at=self.now)
+        meetup = Meetup.objects.get(pk=self.meetup.pk)
+        meetup.time = datetime.time(20, 0)
+        with self.assertNumQueries(3):
+            # the meetup, its reminders and a single change row, whatever the number of RSVPs
+            meetup.save(update_fields=['time'])
+        self.assertEqual(list(MeetupChange.objects.values_list('meetup_id', 'notice_type')),
+                         [(self.meetup.pk, MEETUP_TIME_CHANGE)])
+        self.assertFalse(MeetupNotification.objects.exists())
+        # the rescheduled meetup gets new reminders
+        self.assertIsNone(Meetup.objects.get(pk=self.meetup.pk).reminders_queued_at)
+
+        meetup.meetup_location = self.other_location
+        meetup.save()
+        meetup.time = datetime.time(21, 0)
+        meetup.save()
+        meetup.save()
+        self.assertEqual(MeetupChange.objects.count(), 3)
+        # the two time changes notify once
+        self.assertEqual(expand_changes(), 2)
+        self.assertCountEqual(MeetupNotification.objects.values_list('user_id', 'notice_type'),
+                              [(rsvp.user_id, MEETUP_TIME_CHANGE),
+                               (rsvp.user_id, MEETUP_LOCATION_CHANGE)])
+        self.assertFalse(MeetupChange.objects.exists())
+        self.assertEqual(expand_changes(), 0)
+
+    def test_change_notifications_deferred_fields(self):
+        """Test that only the loaded fields of a meetup are compared"""
+        self._create_rsvp('bar', time_change=True, location_change=True)
+        meetup = Meetup.objects.only('id', 'time').get(pk=self.meetup.pk)
+        meetup.time = datetime.time(20, 0)
+        meetup.save(update_fields=['time'])
+        self.assertEqual(list(MeetupChange.objects.values_list('notice_type', flat=True)),
+                         [MEETUP_TIME_CHANGE])
+
+    def test_meetup_save_keeps_reminders_queued_at(self):
+        """Test that saving a meetup loaded before its reminders were queued keeps them queued"""
+        Meetup.objects.filter(pk=self.meetup.pk).update(reminders_queued_at=self.now)
+        self.meetup.description = 'Bar'
+        self.meetup.save()
+        self.assertEqual(Meetup.objects.get(pk=self.meetup.pk).reminders_queued_at, self.now)
+
+    def test_queue_reminders(self):
+        """Test that the reminders of a meetup starting soon are queued once"""
+        self._create_rsvp('bar', reminder=True)
+        later = timezone.localtime(self.now + datetime.timedelta(days=3))
+        Meetup.objects.create(title='Later', slug='later', date=later.date(),
+                              time=later.time(), description='Later',
+                              meetup_location=self.other_location,
+                              created_by=self.systers_user, leader=self.systers_user)
+        self.assertEqual(get_meetups_due_for_reminders(self.now), [self.meetup])
+        self.assertEqual(get_meetups_due_for_reminders(self.now, lead_hours=1), [])
+        self.assertEqual(queue_reminders(self.now), 1)
+        self.assertEqual(queue_reminders(self.now), 0)
+        self.assertEqual(get_meetups_due_for_reminders(self.now), [])
+
+    def test_send_notifications(self):
+        """Test sending the queued notifications by email"""
+        rsvp = self._create_rsvp('bar', reminder=True, location_change=True)
+        queue_notifications(self.meetup.pk, MEETUP_REMINDER)
+        queue_notifications(self.meetup.pk, MEETUP_LOCATION_CHANGE)
+        self.assertEqual(send_notifications(batch_size=1), 1)
+        self.assertEqual(send_notifications(), 1)
+        self.assertEqual(send_notifications(), 0)
+        self.assertFalse(MeetupNotification.objects.filter(sent_at__isnull=True).exists())
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[0].to, [rsvp.user.user.email])
+        self.assertIn("Foo starts soon", mail.outbox[0].subject)
+        self.assertIn("/meetup/foo/", mail.outbox[0].body)
+        self.assertIn("Library", mail.outbox[1].body)
+
+    def test_process_meetup_notifications_command(self):
+        """Test the command queuing the change notifications and the reminders and sending the
+        notifications"""
+        self._create_rsvp('bar', reminder=True, location_change=True)
+        self.meetup.meetup_location = self.other_location
+        self.meetup.save()
+        out = StringIO()
+        call_command('process_meetup_notifications', stdout=out)
+        self.assertIn("Queued 1 change notification(s) and 1 reminder(s), sent 2 "
+                      "notification(s)", out.getvalue())
+        self.assertEqual(len(mail.outbox), 2)
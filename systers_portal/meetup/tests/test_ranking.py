@@ -0,0 +1,65 @@
+import datetime
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from meetup.ranking import MeetupRanking, haversine_distances
+
+
+class HaversineDistancesTestCase(SimpleTestCase):
+    def test_haversine_distances(self):
+        """Test great-circle distances against known values"""
+        distances = haversine_distances(0, 0, np.array([0, 0, 90, np.nan]),
+                                        np.array([0, 1, 0, 0]))
+        self.assertAlmostEqual(distances[0], 0)
+        self.assertAlmostEqual(distances[1], 111.195, places=2)
+        self.assertAlmostEqual(distances[2], 10007.54, places=1)
+        self.assertTrue(np.isnan(distances[3]))
+
+
+class MeetupRankingTestCase(SimpleTestCase):
+    def setUp(self):
+        today = datetime.date(2020, 7, 1)
+        noon = datetime.time(12, 0)
+        self.rows = [
+            (1, today + datetime.timedelta(2), noon, 10, 21),
+            (2, today + datetime.timedelta(1), noon, 10, 21),
+            (3, today, noon, 10, 20),
+            (4, today, noon, None, None),
+            (5, today, datetime.time(9, 0), 10, 25),
+        ]
+        self.ranking = MeetupRanking(self.rows)
+
+    def pks(self, indices):
+        return [self.rows[index][0] for index in indices]
+
+    def test_rank_by_distance_then_date(self):
+        """Test that equally distant meetups are ordered by date"""
+        indices, distances = self.ranking.rank(10, 20)
+        self.assertEqual(self.pks(indices), [3, 2, 1, 5, 4])
+        self.assertAlmostEqual(distances[0], 0)
+        self.assertTrue(np.isnan(distances[-1]))
+
+    def test_rank_without_location(self):
+        """Test that meetups are ordered by date and time without a location"""
+        indices, distances = self.ranking.rank()
+        self.assertEqual(self.pks(indices), [5, 3, 4, 2, 1])
+        self.assertTrue(np.isnan(distances).all())
+
+    def test_rank_with_radius(self):
+        """Test filtering meetups by radius"""
+        indices, distances = self.ranking.rank(10, 20, radius=200)
+        self.assertEqual(self.pks(indices), [3, 2, 1])
+        self.assertTrue((distances <= 200).all())
+
+    def test_rank_with_limit(self):
+        """Test selecting the nearest meetups"""
+        indices, distances = self.ranking.rank(10, 20, limit=2)
+        self.assertEqual(self.pks(indices), [3, 2])
+        indices, distances = self.ranking.rank(10, 20, limit=10)
+        self.assertEqual(self.pks(indices), [3, 2, 1, 5, 4])
+
+    def test_rank_empty(self):
+        """Test ranking no meetups"""
+        indices, distances = MeetupRanking([]).rank(10, 20, radius=10, limit=5)
+        self.assertEqual(len(indices), 0)
@@ -0,0 +1,43 @@
+from cities_light.models import City, Country
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from meetup.models import Meetup
+from meetup.search import get_search_query, search_meetups
+from users.models import SystersUser
+
+
+class SearchTestCase(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='foo', password='foobar')
+        systers_user = SystersUser.objects.get(user=user)
+        country = Country.objects.create(name='Bar', continent='AS')
+        location = City.objects.create(name='Baz', display_name='Baz', country=country)
+        self.meetup = Meetup.objects.create(title='Foo Bar', slug='foo-bar',
+                                            date=timezone.now().date(),
+                                            time=timezone.now().time(),
+                                            description='Learning Python',
+                                            venue='Library',
+                                            meetup_location=location,
+                                            created_by=systers_user,
+                                            leader=systers_user)
+
+    def test_get_search_query(self):
+        """Test that keywords without words do not build a query"""
+        self.assertIsNone(get_search_query(''))
+        self.assertIsNone(get_search_query(None))
+        self.assertIsNone(get_search_query(' :* & '))
+        self.assertIsNotNone(get_search_query('foo'))
+
+    def test_search_vector_update_on_save(self):
+        """Test that the search vector follows the changes of the searched fields"""
+        meetups = Meetup.objects.all()
+        self.assertSequenceEqual(search_meetups(meetups, 'pyth'), [self.meetup])
+        self.assertSequenceEqual(search_meetups(meetups, 'librar'), [self.meetup])
+        self.assertSequenceEqual(search_meetups(meetups, 'django'), [])
+        self.meetup.description = 'Learning Django'
+        self.meetup.save()
+        self.assertSequenceEqual(search_meetups(meetups, 'django'), [self.meetup])
+        self.assertSequenceEqual(search_meetups(meetups, 'python'), [])
+        self.assertEqual(search_meetups(meetups, '').get().search_rank, 0)
@@ -2,7 +2,7 @@ from django.utils import timezone
 
 from django.test import TestCase
 from django.contrib.auth.models import Group, User
-from django.db.models.signals import post_save, post_delete, post_migrate
+from django.db.models.signals import post_save, pre_delete, post_migrate
 from cities_light.models import City, Country
 from pinax.notifications.models import NoticeType
 
@@ -16,8 +16,8 @@ class SignalsTestCase(TestCase):
     def setUp(self):
         post_save.connect(manage_meetup_groups, sender=Meetup,
                           dispatch_uid="manage_groups")
-        post_delete.connect(remove_meetup_groups, sender=Meetup,
-                            dispatch_uid="remove_groups")
+        pre_delete.connect(remove_meetup_groups, sender=Meetup,
+                           dispatch_uid="remove_groups")
         post_migrate.connect(create_notice_types, dispatch_uid="create_notice_types")
         self.password = "foobar"
 
@@ -40,6 +40,25 @@ class SignalsTestCase(TestCase):
         groups_count = Group.objects.count()
         self.assertEqual(groups_count, 3)
 
+    def test_create_meetup_queries(self):
+        """Test that provisioning the groups of a new meetup takes a constant number of
+        queries"""
+        user = User.objects.create_user(username='foo', password=self.password,
+                                        email='user@test.com')
+        systers_user = SystersUser.objects.get(user=user)
+        country = Country.objects.create(name='Bar', continent='AS')
+        location = City.objects.create(name='Baz', display_name='Baz', country=country)
+        with self.assertNumQueries(13):
+            Meetup.objects.create(title='Foo Bar Baz', slug='foo-bar-baz',
+                                  date=timezone.now().date(),
+                                  time=timezone.now().time(),
+                                  description='This is test Meetup',
+                                  meetup_location=location,
+                                  created_by=systers_user,
+                                  leader=systers_user,
+                                  last_updated=timezone.now())
+        self.assertEqual(Group.objects.count(), 3)
+
     def test_remove_community_groups(self):
         """Test the removal of groups when a Meetup Location is deleted"""
         user = User.objects.create_user(username='foo', password=self.password,
@@ -64,7 +83,7 @@ class SignalsTestCase(TestCase):
     def test_create_notice_types(self):
         """Test creation of notice types"""
         notice_types = NoticeType.objects.all()
-        self.assertEqual(len(notice_types), 4)
+        self.assertEqual(len(notice_types), 7)
         new_meetup = NoticeType.objects.get(label="new_meetup")
         self.assertEqual(new_meetup.display, "New Meetup")
         new_support_request = NoticeType.objects.get(label="new_support_request")
@@ -73,3 +92,9 @@ class SignalsTestCase(TestCase):
         self.assertEqual(support_request_approved.display, "Support Request Approved")
         new_meetup_request = NoticeType.objects.get(label="new_meetup_request")
         self.assertEqual(new_meetup_request.display, "New Meetup Request")
+        meetup_reminder = NoticeType.objects.get(label="meetup_reminder")
+        self.assertEqual(meetup_reminder.display, "Meetup Reminder")
+        meetup_time_change = NoticeType.objects.get(label="meetup_time_change")
+        self.assertEqual(meetup_time_change.display, "Meetup Time Change")
+        meetup_location_change = NoticeType.objects.get(label="meetup_location_change")
+        self.assertEqual(meetup_location_change.display, "Meetup Location Change")
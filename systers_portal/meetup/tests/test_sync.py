@@ -0,0 +1,141 @@
+import json
+
+from cities_light.models import City, Country
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.http import JsonResponse
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from meetup.models import Meetup
+from meetup.sync import (InvalidCursor, decode_cursor, encode_cursor, get_meetup_changes,
+                         iter_meetups_json)
+from users.models import SystersUser
+
+
+class MeetupSyncBaseCase:
+    def setUp(self):
+        user = User.objects.create_user(username='foo', password='foobar')
+        self.systers_user = SystersUser.objects.get(user=user)
+        country = Country.objects.create(name='Bar', continent='AS')
+        self.location = City.objects.create(name='Baz', display_name='Baz', country=country)
+        self.meetups = [self.create_meetup(slug) for slug in ('foo', 'bar', 'baz')]
+
+    def create_meetup(self, slug):
+        return Meetup.objects.create(title=slug.title(), slug=slug, date=timezone.now().date(),
+                                     time=timezone.now().time(), description='Test Meetup',
+                                     venue='Library', meetup_location=self.location,
+                                     created_by=self.systers_user, leader=self.systers_user)
+
+
+class MeetupSyncTestCase(MeetupSyncBaseCase, TransactionTestCase):
+    def test_cursor(self):
+        """Test that cursors are decoded to the positions they were encoded from"""
+        cursor = encode_cursor((1234, 3), None)
+        self.assertEqual(decode_cursor(cursor), ((1234, 3), None))
+        for cursor in ('foo', encode_cursor(None, None)[:-2], 'W1siZm9vIiwgMV0sIG51bGxd'):
+            self.assertRaises(InvalidCursor, decode_cursor, cursor)
+
+    def test_get_meetup_changes(self):
+        """Test paging through the changes, then receiving only edits and deletions"""
+        page = get_meetup_changes(limit=2)
+        self.assertEqual([meetup['meetup_id'] for meetup in page['meetups']],
+                         [self.meetups[0].pk, self.meetups[1].pk])
+        self.assertEqual(set(page['meetups'][0]), {
+            'meetup_id', 'event_name', 'start_date', 'venue', 'end_date', 'description',
+            'last_updated'})
+        self.assertTrue(page['has_more'])
+        page = get_meetup_changes(page['cursor'], limit=2)
+        self.assertEqual([meetup['meetup_id'] for meetup in page['meetups']],
+                         [self.meetups[2].pk])
+        self.assertFalse(page['has_more'])
+        cursor = page['cursor']
+        self.assertEqual(get_meetup_changes(cursor), {
+            'meetups': [], 'deleted': [], 'cursor': cursor, 'has_more': False})
+
+        # edits of older meetups and deletions reach the consumer
+        self.meetups[0].title = 'Edited'
+        self.meetups[0].save()
+        deleted_pk = self.meetups[1].pk
+        self.meetups[1].delete()
+        page = get_meetup_changes(cursor)
+        self.assertEqual([meetup['event_name'] for meetup in page['meetups']], ['Edited'])
+        self.assertEqual(page['deleted'], [deleted_pk])
+        self.assertEqual(get_meetup_changes(page['cursor'])['meetups'], [])
+
+    def test_running_transaction(self):
+        """Test that the changes of a running transaction are read once it commits, even if
+        later transactions were read meanwhile"""
+        cursor = get_meetup_changes()['cursor']
+        with transaction.atomic():
+            self.meetups[0].title = 'Edited'
+            self.meetups[0].save()
+            self.assertEqual(get_meetup_changes(cursor)['meetups'], [])
+        page = get_meetup_changes(cursor)
+        self.assertEqual([meetup['event_name'] for meetup in page['meetups']], ['Edited'])
+        # saving only the scheduler fields is not a change
+        meetup = Meetup.objects.get(pk=self.meetups[1].pk)
+        meetup.reminders_queued_at = timezone.now()
+        meetup.save(update_fields=['reminders_queued_at'])
+        self.assertEqual(get_meetup_changes(page['cursor'])['meetups'], [])
+
+
+class ApiForVmsSyncViewTestCase(MeetupSyncBaseCase, TransactionTestCase):
+    def test_sync_view(self):
+        """Test the sync pages and their ETag"""
+        url = reverse('vms_sync_api')
+        response = self.client.get(url, {'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data['meetups']), 2)
+        self.assertTrue(data['has_more'])
+        data = self.client.get(url, {'limit': 2, 'cursor': data['cursor']}).json()
+        self.assertEqual(len(data['meetups']), 1)
+        self.assertFalse(data['has_more'])
+
+        response = self.client.get(url, {'cursor': data['cursor']})
+        self.assertEqual(response.json()['meetups'], [])
+        response = self.client.get(url, {'cursor': data['cursor']},
+                                   HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        deleted_pk = self.meetups[0].pk
+        self.meetups[0].delete()
+        response = self.client.get(url, {'cursor': data['cursor']},
+                                   HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['deleted'], [deleted_pk])
+
+    def test_sync_view_invalid_cursor(self):
+        """Test that invalid cursors are rejected"""
+        response = self.client.get(reverse('vms_sync_api'), {'cursor': 'foo', 'limit': 'bar'})
+        self.assertEqual(response.status_code, 400)
+
+
+class ApiForVmsViewTestCase(MeetupSyncBaseCase, TestCase):
+    def test_iter_meetups_json(self):
+        """Test that the streamed JSON is the array JsonResponse builds"""
+        meetups = Meetup.objects.order_by('pk')
+        expected = JsonResponse([
+            {'meetup_id': meetup.pk, 'event_name': meetup.title, 'start_date': meetup.date,
+             'venue': meetup.venue, 'end_date': meetup.end_date,
+             'description': meetup.description} for meetup in meetups], safe=False)
+        with CaptureQueriesContext(connection) as queries:
+            content = "".join(iter_meetups_json(meetups, chunk_size=2))
+        self.assertEqual(content, expected.content.decode('utf-8'))
+        self.assertNotIn('search_vector', queries[-1]['sql'])
+        self.assertEqual("".join(iter_meetups_json(Meetup.objects.none())), "[]")
+
+    def test_vms_api(self):
+        """Test streaming all the meetups and the meetups from an id"""
+        response = self.client.get(reverse('vms_api'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        data = json.loads(b"".join(response.streaming_content))
+        self.assertEqual([meetup['meetup_id'] for meetup in data],
+                         [meetup.pk for meetup in self.meetups])
+        response = self.client.post(reverse('vms_api'), {'meetup_id': self.meetups[1].pk})
+        data = json.loads(b"".join(response.streaming_content))
+        self.assertEqual([meetup['meetup_id'] for meetup in data],
+                         [meetup.pk for meetup in self.meetups[1:]])
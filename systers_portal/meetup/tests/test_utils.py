@@ -1,12 +1,19 @@
-from django.test import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
 from django.contrib.auth.models import Group, User
 from guardian.shortcuts import get_perms
 from cities_light.models import City, Country
 
 from django.utils import timezone
-from meetup.models import Meetup
+from meetup.models import Meetup, Rsvp
 from meetup.permissions import groups_templates, group_permissions
-from meetup.utils import (create_groups, assign_permissions, remove_groups)
+from meetup.constants import RSVP_COMING, RSVP_NOT_COMING, RSVP_WAITLISTED
+from meetup.utils import (create_groups, assign_permissions, remove_groups, get_groups,
+                          recount_rsvps, get_rsvp_status, save_rsvp)
 from users.models import SystersUser
 
 
@@ -27,12 +34,26 @@ class UtilsTestCase(TestCase):
         self.assertCountEqual(meetup_groups, groups)
 
     def test_remove_groups(self):
-        """Test the removal of groups according to a name"""
-        name = "Foo"
-        create_groups(name)
-        remove_groups(name)
-        meetup_groups = Group.objects.filter(name__startswith=name)
-        self.assertEqual(list(meetup_groups), [])
+        """Test the removal of the groups of a meetup"""
+        user = User.objects.create_user(username='foo', password='foobar',
+                                        email='user@test.com')
+        systers_user = SystersUser.objects.get(user=user)
+        country = Country.objects.create(name='Bar', continent='AS')
+        location = City.objects.create(name='Baz', display_name='Baz', country=country)
+        meetup = Meetup.objects.create(title='Foo', slug='foo',
+                                       date=timezone.now().date(),
+                                       time=timezone.now().time(),
+                                       description='This is test Meetup',
+                                       meetup_location=location,
+                                       created_by=systers_user,
+                                       leader=systers_user,
+                                       last_updated=timezone.now())
+        self.assertEqual(get_groups(meetup).count(), len(groups_templates))
+        Group.objects.create(name="Foo: Unrelated")
+        remove_groups(meetup)
+        self.assertSequenceEqual(get_groups(meetup), [])
+        self.assertEqual(list(Group.objects.values_list('name', flat=True)),
+                         ["Foo: Unrelated"])
 
     def test_assign_permissions(self):
         """Test assignment of permissions to meetup location groups"""
@@ -59,3 +80,164 @@ class UtilsTestCase(TestCase):
                            list(group.permissions.all())]
             group_perms += get_perms(group, meetup)
             self.assertCountEqual(group_perms, value)
+
+
+class RecountRsvpsTestCase(TestCase):
+    def setUp(self):
+        country = Country.objects.create(name='Bar', continent='AS')
+        location = City.objects.create(name='Baz', display_name='Baz', country=country)
+        self.users = []
+        for username in ('foo', 'bar', 'baz'):
+            user = User.objects.create(username=username, password='foobar')
+            self.users.append(SystersUser.objects.get(user=user))
+        self.meetup = Meetup.objects.create(title='Foo', slug='foo', date=timezone.now().date(),
+                                            time=timezone.now().time(),
+                                            description='This is test Meetup',
+                                            meetup_location=location,
+                                            created_by=self.users[0], leader=self.users[0])
+        self.other_meetup = Meetup.objects.create(title='Bar', slug='bar',
+                                                  date=timezone.now().date(),
+                                                  time=timezone.now().time(),
+                                                  description='This is test Meetup',
+                                                  meetup_location=location,
+                                                  created_by=self.users[0],
+                                                  leader=self.users[0])
+        Rsvp.objects.create(user=self.users[0], meetup=self.meetup, plus_one=True)
+        Rsvp.objects.create(user=self.users[1], meetup=self.meetup)
+        Rsvp.objects.create(user=self.users[2], meetup=self.meetup, coming=False, plus_one=True)
+        Meetup.objects.update(rsvp_coming_count=7, rsvp_plus_one_count=7, rsvp_not_coming_count=7)
+
+    def test_recount_rsvps(self):
+        """Test recomputing the counters of the meetups whose counters are wrong"""
+        # a query finding the wrong counters and an UPDATE, within a savepoint
+        with self.assertNumQueries(4):
+            self.assertEqual(recount_rsvps(), 2)
+        self.meetup.refresh_from_db()
+        self.assertEqual((self.meetup.rsvp_coming_count, self.meetup.rsvp_plus_one_count,
+                          self.meetup.rsvp_not_coming_count), (2, 1, 1))
+        self.other_meetup.refresh_from_db()
+        self.assertEqual(self.other_meetup.attendee_count, 0)
+        self.assertEqual(recount_rsvps(), 0)
+
+    def test_recount_rsvps_command(self):
+        """Test the command repairing the counters of some meetups"""
+        out = StringIO()
+        call_command('recount_rsvps', 'bar', stdout=out)
+        self.assertEqual(out.getvalue(), "Repaired the RSVP counters of 1 meetup(s)\n")
+        self.meetup.refresh_from_db()
+        self.assertEqual(self.meetup.rsvp_coming_count, 7)
+
+
+class SaveRsvpTestCase(TestCase):
+    def setUp(self):
+        country = Country.objects.create(name='Bar', continent='AS')
+        location = City.objects.create(name='Baz', display_name='Baz', country=country)
+        self.users = []
+        for username in ('foo', 'bar', 'baz', 'qux'):
+            user = User.objects.create(username=username, password='foobar')
+            self.users.append(SystersUser.objects.get(user=user))
+        self.meetup = Meetup.objects.create(title='Foo', slug='foo', date=timezone.now().date(),
+                                            time=timezone.now().time(),
+                                            description='This is test Meetup',
+                                            meetup_location=location, capacity=3,
+                                            created_by=self.users[0], leader=self.users[0])
+
+    def rsvp(self, user, coming=True, plus_one=False):
+        rsvp, promoted = save_rsvp(self.meetup.pk, self.users[user], coming, plus_one)
+        return get_rsvp_status(rsvp), [promoted_rsvp.user for promoted_rsvp in promoted]
+
+    def test_save_rsvp_capacity(self):
+        """Test admitting RSVPs until the meetup is full, then waitlisting them"""
+        self.assertEqual(self.rsvp(0, plus_one=True), (RSVP_COMING, []))
+        self.assertEqual(self.rsvp(1, plus_one=True), (RSVP_WAITLISTED, []))
+        self.assertEqual(self.rsvp(2), (RSVP_COMING, []))
+        self.assertEqual(self.rsvp(3), (RSVP_WAITLISTED, []))
+        self.assertEqual(self.rsvp(3, coming=False), (RSVP_NOT_COMING, []))
+        self.meetup.refresh_from_db()
+        self.assertEqual(self.meetup.attendee_count, 3)
+        self.assertEqual(self.meetup.available_seats, 0)
+        self.assertEqual(self.meetup.rsvp_waitlist_count, 1)
+        self.assertEqual(self.meetup.rsvp_not_coming_count, 1)
+        self.assertEqual(recount_rsvps(), 0)
+
+    def test_save_rsvp_plus_one_refused(self):
+        """Test that an admitted user keeps the seat when there is no seat for a plus one"""
+        self.rsvp(0, plus_one=True)
+        self.rsvp(1)
+        rsvp, promoted = save_rsvp(self.meetup.pk, self.users[1], plus_one=True)
+        self.assertEqual(get_rsvp_status(rsvp), RSVP_COMING)
+        self.assertFalse(rsvp.plus_one)
+        self.assertEqual(rsvp.meetup.attendee_count, 3)
+
+    def test_promote_waitlist(self):
+        """Test that freed seats are given to the waitlist in order"""
+        self.rsvp(0, plus_one=True)
+        self.rsvp(1)
+        self.rsvp(2, plus_one=True)
+        self.rsvp(3)
+        # the plus one of the first user frees a seat, too small for the next waitlisted RSVP
+        self.assertEqual(self.rsvp(0), (RSVP_COMING, [self.users[3]]))
+        self.assertEqual(self.rsvp(1, coming=False), (RSVP_NOT_COMING, []))
+        Rsvp.objects.get(user=self.users[3]).delete()
+        self.assertEqual(get_rsvp_status(Rsvp.objects.get(user=self.users[2])), RSVP_COMING)
+        self.meetup.refresh_from_db()
+        self.assertEqual((self.meetup.attendee_count, self.meetup.rsvp_waitlist_count), (3, 0))
+
+    def test_promote_waitlist_capacity_raised(self):
+        """Test that raising the capacity admits waitlisted RSVPs"""
+        self.rsvp(0, plus_one=True)
+        self.rsvp(1)
+        self.rsvp(2)
+        meetup = Meetup.objects.get(pk=self.meetup.pk)
+        meetup.capacity = None
+        meetup.save()
+        self.assertEqual(get_rsvp_status(Rsvp.objects.get(user=self.users[2])), RSVP_COMING)
+        meetup.refresh_from_db()
+        self.assertEqual(meetup.attendee_count, 4)
+
+
+class SaveRsvpConcurrencyTestCase(TransactionTestCase):
+    CAPACITY = 50
+    RSVPS = 300
+
+    def setUp(self):
+        country = Country.objects.create(name='Bar', continent='AS')
+        location = City.objects.create(name='Baz', display_name='Baz', country=country)
+        User.objects.bulk_create([User(username='user{0}'.format(i), password='foobar')
+                                  for i in range(self.RSVPS)])
+        users = User.objects.filter(username__startswith='user')
+        SystersUser.objects.bulk_create([SystersUser(user=user) for user in users])
+        self.systers_users = list(SystersUser.objects.filter(user__in=users))
+        self.meetup = Meetup.objects.create(title='Foo', slug='foo', date=timezone.now().date(),
+                                            time=timezone.now().time(),
+                                            description='This is test Meetup',
+                                            meetup_location=location, capacity=self.CAPACITY,
+                                            created_by=self.systers_users[0],
+                                            leader=self.systers_users[0])
+
+    def _rsvp(self, index):
+        try:
+            # every third user brings someone, every seventh cancels right away
+            systers_user = self.systers_users[index]
+            rsvp, promoted = save_rsvp(self.meetup.pk, systers_user, plus_one=index % 3 == 0)
+            if index % 7 == 0:
+                save_rsvp(self.meetup.pk, systers_user, coming=False)
+            return get_rsvp_status(rsvp)
+        finally:
+            connection.close()
+
+    def test_concurrent_rsvps(self):
+        """Test that parallel RSVPs never admit more people than the capacity"""
+        with ThreadPoolExecutor(max_workers=20) as executor:
+            statuses = list(executor.map(self._rsvp, range(self.RSVPS)))
+        self.assertEqual(len(statuses), self.RSVPS)
+        self.assertIn(RSVP_WAITLISTED, statuses)
+        self.meetup.refresh_from_db()
+        admitted = Rsvp.objects.filter(meetup=self.meetup, coming=True,
+                                       waitlisted_at__isnull=True)
+        seats = sum(1 + rsvp.plus_one for rsvp in admitted)
+        self.assertLessEqual(seats, self.CAPACITY)
+        self.assertEqual(self.meetup.attendee_count, seats)
+        # seats freed by cancellations went to the waitlist
+        self.assertGreaterEqual(seats, self.CAPACITY - 1)
+        self.assertEqual(recount_rsvps(), 0)
@@ -6,6 +6,7 @@ from django.utils import timezone
 from cities_light.models import City, Country
 from django.contrib.contenttypes.models import ContentType
 
+from meetup.constants import SEARCH_RESULTS_PER_PAGE
 from meetup.models import (Meetup, Rsvp, SupportRequest,
                            RequestMeetup)
 from users.models import SystersUser
@@ -71,6 +72,17 @@ class MeetupViewTestCase(MeetupBaseCase, TestCase):
         response = self.client.get(nonexistent_url)
         self.assertEqual(response.status_code, 404)
 
+    def test_view_meetup_rsvp_counts(self):
+        """Test that the RSVP counts are read from the meetup counters"""
+        Rsvp.objects.create(user=self.systers_user, meetup=self.meetup, plus_one=True)
+        user = User.objects.create_user(username='bar', password='foobar')
+        Rsvp.objects.create(user=SystersUser.objects.get(user=user), meetup=self.meetup,
+                            coming=False, plus_one=True)
+        url = reverse('view_meetup', kwargs={'slug': 'foo-bar-baz'})
+        response = self.client.get(url)
+        self.assertEqual(response.context['coming_no'], 2)
+        self.assertEqual(response.context['not_coming_no'], 1)
+
 
 class AddMeetupViewTestCase(MeetupBaseCase, TestCase):
     def test_get_add_meetup_view(self):
@@ -650,6 +662,25 @@ class RsvpMeetupViewTestCase(MeetupBaseCase, TestCase):
         self.assertTrue(rsvp[0].user, self.systers_user)
         self.assertTrue(rsvp[0].meetup, self.meetup)
 
+    def test_post_rsvp_meetup_view_ajax(self):
+        """Test AJAX RSVPs to a meetup with a capacity"""
+        self.meetup.capacity = 1
+        self.meetup.save()
+        url = reverse("rsvp_meetup", kwargs={'meetup_slug': 'foo-bar-baz'})
+        self.client.login(username='foo', password='foobar')
+        response = self.client.post(url, data={'coming': True, 'plus_one': True},
+                                    HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'status': 'waitlisted', 'plus_one': True,
+            'message': 'The meetup is full, you have been added to the waitlist.',
+            'attendee_count': 0, 'capacity': 1, 'available_seats': 1, 'waitlist_count': 1})
+        response = self.client.post(url, data={'coming': True},
+                                    HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(response.json()['status'], 'coming')
+        self.assertEqual(response.json()['available_seats'], 0)
+        self.assertEqual(Rsvp.objects.get().user, self.systers_user)
+
 
 class RsvpGoingViewTestCase(MeetupBaseCase, TestCase):
     def setUp(self):
@@ -1141,7 +1172,10 @@ class UpcomingMeetupsSearchViewTestCase(MeetupBaseCase, TestCase):
                                              email='user@test.com')
         self.systers_user = SystersUser.objects.get(user=self.user)
         country = Country.objects.create(name='Bar', continent='AS')
-        self.location = City.objects.create(name='Baz', display_name='Baz', country=country)
+        self.location = City.objects.create(name='Baz', display_name='Baz', country=country,
+                                            latitude=10, longitude=20)
+        self.other_location = City.objects.create(name='Qux', display_name='Qux',
+                                                  country=country, latitude=10, longitude=22)
         self.meetup = Meetup.objects.create(title='Foo Bar Baz', slug='foo-bar-baz',
                                             date=(timezone.now() + timezone.timedelta(4)).date(),
                                             time=timezone.now().time(),
@@ -1167,7 +1201,7 @@ class UpcomingMeetupsSearchViewTestCase(MeetupBaseCase, TestCase):
                                              time=timezone.now().time(),
                                              description='This is test Meetup',
                                              venue='Foo Systers',
-                                             meetup_location=self.location,
+                                             meetup_location=self.other_location,
                                              leader=self.systers_user,
                                              created_by=self.systers_user,
                                              last_updated=timezone.now())
@@ -1175,69 +1209,112 @@ class UpcomingMeetupsSearchViewTestCase(MeetupBaseCase, TestCase):
     def test_post_view(self):
         """Test post view for all search requests"""
         url = reverse('search_meetups')
-        data = {'keyword': 'Foo Baz'}
+        data = {'keyword': 'Foob'}
         response = self.client.post(url, data, format='json')
         self.assertEqual(json.loads(response.content.decode('utf-8')),
-                         {'search_results': [{'date': self.meetup2.date.isoformat(),
-                                              'meetup': 'Foo Baz',
-                                              'location': 'Baz',
-                                              'meetup_slug': 'foobar',
-                                              'distance': 900}],
-                          'unit': 'kilometers from your location'})
+                         {'search_results': [{'date': self.meetup3.date.isoformat(),
+                                              'meetup': 'Foob Baz',
+                                              'location': 'Qux',
+                                              'meetup_slug': 'foobarbaz',
+                                              'distance': None}],
+                          'unit': '', 'page': 1, 'num_pages': 1, 'has_next': False})
 
-        data1 = {'keyword': 'Foo Bar'}
+        data1 = {'keyword': 'Foo Bar', 'location': 'Baz'}
         response = self.client.post(url, data1, format='json')
         self.assertEqual(json.loads(response.content.decode('utf-8')),
                          {'search_results': [{'date': self.meetup.date.isoformat(),
                                               'meetup': 'Foo Bar Baz',
                                               'location': 'Baz',
                                               'meetup_slug': 'foo-bar-baz',
-                                              'distance': 900}],
-                          'unit': 'kilometers from your location'})
+                                              'distance': 0}],
+                          'unit': 'kilometers from your location',
+                          'page': 1, 'num_pages': 1, 'has_next': False})
 
-        data2 = {'keyword': 'Foo Bar', 'location': 'Baz'}
+        data2 = {'keyword': 'new', 'location': 'Baz'}
         response = self.client.post(url, data2, format='json')
         self.assertEqual(json.loads(response.content.decode('utf-8')),
-                         {'search_results': [{'date': self.meetup.date.isoformat(),
-                                              'meetup': 'Foo Bar Baz',
+                         {'search_results': [{'date': self.meetup2.date.isoformat(),
+                                              'meetup': 'Foo Baz',
                                               'location': 'Baz',
-                                              'meetup_slug': 'foo-bar-baz',
+                                              'meetup_slug': 'foobar',
                                               'distance': 0}],
-                          'unit': 'kilometers from your location'})
+                          'unit': 'kilometers from your location',
+                          'page': 1, 'num_pages': 1, 'has_next': False})
 
-        data3 = {'keyword': 'new'}
+        data3 = {'keyword': 'Foo', 'location': 'Qux'}
         response = self.client.post(url, data3, format='json')
-        self.assertEqual(json.loads(response.content.decode('utf-8')),
-                         {'search_results': [],
-                          'unit': ''})
-
-        data4 = {'keyword': 'Foob'}
-        response = self.client.post(url, data4, format='json')
         self.assertEqual(json.loads(response.content.decode('utf-8')),
                          {'search_results': [{'date': self.meetup3.date.isoformat(),
                                               'meetup': 'Foob Baz',
-                                              'location': 'Baz',
+                                              'location': 'Qux',
                                               'meetup_slug': 'foobarbaz',
-                                              'distance': 900}],
-                          'unit': 'kilometers from your location'})
-
-        data5 = {'keyword': 'Foo', 'location': 'Baz'}
-        response = self.client.post(url, data5, format='json')
-        self.assertEqual(json.loads(response.content.decode('utf-8')),
-                         {'search_results': [{'date': self.meetup2.date.isoformat(),
+                                              'distance': 0},
+                                             {'date': self.meetup2.date.isoformat(),
                                               'meetup': 'Foo Baz',
                                               'location': 'Baz',
                                               'meetup_slug': 'foobar',
-                                              'distance': 0},
-                                             {'date': self.meetup3.date.isoformat(),
-                                              'meetup': 'Foob Baz',
-                                              'location': 'Baz',
-                                              'meetup_slug': 'foobarbaz',
-                                              'distance': 0},
+                                              'distance': 219},
                                              {'date': self.meetup.date.isoformat(),
                                               'meetup': 'Foo Bar Baz',
                                               'location': 'Baz',
                                               'meetup_slug': 'foo-bar-baz',
-                                              'distance': 0},
+                                              'distance': 219},
                                              ],
-                          'unit': 'kilometers from your location'})
+                          'unit': 'kilometers from your location',
+                          'page': 1, 'num_pages': 1, 'has_next': False})
+
+        data4 = {'keyword': 'Foo', 'location': 'Qux', 'radius': '100'}
+        response = self.client.post(url, data4, format='json')
+        results = json.loads(response.content.decode('utf-8'))['search_results']
+        self.assertEqual([result['meetup_slug'] for result in results], ['foobarbaz'])
+
+    def test_post_view_relevance(self):
+        """Test that search results match all the words of the keyword, even partially typed,
+        and rank title matches over venue and description matches"""
+        url = reverse('search_meetups')
+        Meetup.objects.create(title='Systers Hackathon', slug='systers-hackathon',
+                              date=(timezone.now() + timezone.timedelta(10)).date(),
+                              time=timezone.now().time(),
+                              description='Hacking together',
+                              meetup_location=self.location,
+                              created_by=self.systers_user,
+                              leader=self.systers_user)
+        response = self.client.post(url, {'keyword': 'syst'})
+        results = json.loads(response.content.decode('utf-8'))['search_results']
+        self.assertEqual([result['meetup_slug'] for result in results],
+                         ['systers-hackathon', 'foobar', 'foobarbaz', 'foo-bar-baz'])
+        response = self.client.post(url, {'keyword': 'systers hack'})
+        results = json.loads(response.content.decode('utf-8'))['search_results']
+        self.assertEqual([result['meetup_slug'] for result in results], ['systers-hackathon'])
+        response = self.client.post(url, {'keyword': '!&|'})
+        results = json.loads(response.content.decode('utf-8'))['search_results']
+        self.assertEqual(len(results), 4)
+
+    def test_post_view_pagination(self):
+        """Test that search results are paginated"""
+        url = reverse('search_meetups')
+        for i in range(SEARCH_RESULTS_PER_PAGE):
+            Meetup.objects.create(title='Foo {0}'.format(i), slug='foo-{0}'.format(i),
+                                  date=timezone.now().date(),
+                                  time=timezone.now().time(),
+                                  description='This is test Meetup',
+                                  meetup_location=self.location,
+                                  created_by=self.systers_user,
+                                  leader=self.systers_user)
+        response = self.client.post(url, {'keyword': 'Foo', 'location': 'Baz'})
+        content = json.loads(response.content.decode('utf-8'))
+        self.assertEqual(len(content['search_results']), SEARCH_RESULTS_PER_PAGE)
+        self.assertTrue(content['has_next'])
+        self.assertEqual(content['num_pages'], 2)
+        response = self.client.post(url, {'keyword': 'Foo', 'location': 'Baz', 'page': 2})
+        content = json.loads(response.content.decode('utf-8'))
+        self.assertEqual(len(content['search_results']), 3)
+        self.assertEqual(content['search_results'][-1]['meetup_slug'], 'foobarbaz')
+        self.assertFalse(content['has_next'])
+
+    def test_post_view_queries(self):
+        """Test that the search does not query per matching meetup"""
+        url = reverse('search_meetups')
+        data = {'keyword': 'Foo', 'location': 'Baz'}
+        with self.assertNumQueries(2):
+            self.client.post(url, data, format='json')
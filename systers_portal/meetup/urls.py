@@ -11,7 +11,8 @@ from .views import (MeetupView, AddMeetupView, DeleteMeetupView,
                     ApproveRequestMeetupView, RejectMeetupRequestView, ApiForVmsView,
                     AllUpcomingMeetupsView, AddSupportRequestCommentView,
                     EditSupportRequestCommentView, DeleteSupportRequestCommentView,
-                    UpcomingMeetupsSearchView)
+                    UpcomingMeetupsSearchView, ApiForVmsSyncView, MeetupCalendarView,
+                    CityMeetupCalendarView, UserMeetupCalendarView)
 
 urlpatterns = [
     url(r'^upcoming/$', UpcomingMeetupsView.as_view(),
@@ -37,6 +38,12 @@ urlpatterns = [
         name='search_meetups'),
     url(r'^all/$', AllUpcomingMeetupsView.as_view(),
         name='all_upcoming_meetups'),
+    url(r'^calendar/upcoming\.ics$', MeetupCalendarView.as_view(),
+        name='meetup_calendar'),
+    url(r'^calendar/city/(?P<city_id>\d+)\.ics$', CityMeetupCalendarView.as_view(),
+        name='city_meetup_calendar'),
+    url(r'^calendar/user/(?P<token>[\w:-]+)\.ics$', UserMeetupCalendarView.as_view(),
+        name='user_meetup_calendar'),
     url(r'^(?P<meetup_slug>[\w-]+)/add_comment/$', AddMeetupCommentView.as_view(),
         name="add_meetup_comment"),
     url(r'^(?P<meetup_slug>[\w-]+)/edit_comment/(?P<comment_pk>\d+)/$',
@@ -86,4 +93,5 @@ urlpatterns = [
         name="delete_support_request_comment"),
     url(r'^(?P<slug>[\w-]+)/$', MeetupView.as_view(), name="view_meetup"),
     url(r'^api/v1/request_meetup_data/$', ApiForVmsView.as_view(), name='vms_api'),
+    url(r'^api/v2/meetup_changes/$', ApiForVmsSyncView.as_view(), name='vms_sync_api'),
 ]
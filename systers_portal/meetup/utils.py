@@ -1,6 +1,13 @@
-from django.contrib.auth.models import Group, Permission
+from django.contrib.auth.models import Group
 from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
 
+from common.provisioning import bulk_create_groups, bulk_assign_permissions
+
+from meetup.constants import RSVP_COMING, RSVP_NOT_COMING, RSVP_WAITLISTED
+from meetup.models import Meetup, Rsvp
 from meetup.permissions import groups_templates, group_permissions
 
 
@@ -12,39 +19,176 @@ def create_groups(meetup):
     :param meetup_location: string name of meetup location
     :return: list of meetup location Group objects
     """
-    meetup_groups = []
-    for key, group_name in groups_templates.items():
-        group, created = Group.objects.get_or_create(
-            name=group_name.format(meetup))
-        meetup_groups.append(group)
-    return meetup_groups
+    return bulk_create_groups([group_name.format(meetup)
+                               for group_name in groups_templates.values()])
 
 
 @transaction.atomic
 def remove_groups(meetup):
-    """Remove groups for a particular Meetup Location instance using its name
+    """Remove groups of a particular Meetup instance
+
+    :param meetup: Meetup object
     """
-    name = "{0}:".format(meetup)
-    Group.objects.filter(name__startswith=name).delete()
+    Group.objects.filter(meetups=meetup).delete()
 
 
 def get_groups(meetup):
-    """Get groups of a particular Meetup Location instance using its name
+    """Get groups of a particular Meetup instance
 
-    :param meetup:
-    :return: list of Group objects
+    :param meetup: Meetup object
+    :return: QuerySet of Group objects
     """
-    name = "{0}:".format(meetup)
-    return Group.objects.filter(name__startswith=name)
+    return meetup.groups.all()
 
 
 def assign_permissions(meetup, groups):
     """Assign row-level permissions to meetup location groups and meetup location object
     :param groups: list of Group objects
     """
-    for key, group_name in groups_templates.items():
-        group = next(
-            g for g in groups if g.name == group_name.format(meetup.title))
-        for perm in group_permissions[key]:
-            group.permissions.add(Permission.objects.filter(codename=perm).first())
-            group.save()
+    groups_by_name = {group.name: group for group in groups}
+    bulk_assign_permissions(
+        [(groups_by_name[group_name.format(meetup.title)], group_permissions[key])
+         for key, group_name in groups_templates.items()])
+
+
+def update_rsvp_counters(meetup_id, counts, sign=1):
+    """Add or subtract RSVP counts to the counters of a meetup with a single UPDATE. The
+    counters are incremented in the database, so concurrent RSVPs don't overwrite each other.
+
+    :param meetup_id: int primary key of the Meetup
+    :param counts: dict mapping Meetup counter field names to counts, as returned by
+                   Rsvp.get_counts
+    :param sign: 1 to add the counts, -1 to subtract them
+    """
+    # counters never go below zero, even if they drifted from the Rsvp rows
+    changes = {field: Greatest(F(field) + sign * count, 0)
+               for field, count in counts.items() if count}
+    if changes:
+        Meetup.objects.filter(pk=meetup_id).update(**changes)
+
+
+def _count_rsvps(**filters):
+    rsvps = Rsvp.objects.filter(meetup=OuterRef('pk'), **filters).order_by()
+    return Coalesce(Subquery(rsvps.values('meetup').annotate(count=Count('pk'))
+                             .values('count')), 0)
+
+
+def recount_rsvps(meetups=None):
+    """Recompute the RSVP counters of meetups from their Rsvp rows. The meetups whose counters
+    are wrong are found with one query and repaired with one UPDATE.
+
+    :param meetups: Meetup QuerySet, all meetups by default
+    :return: int number of meetups whose counters were wrong
+    """
+    if meetups is None:
+        meetups = Meetup.objects.all()
+    counts = {'rsvp_coming_count': _count_rsvps(coming=True, waitlisted_at__isnull=True),
+              'rsvp_plus_one_count': _count_rsvps(coming=True, plus_one=True,
+                                                  waitlisted_at__isnull=True),
+              'rsvp_not_coming_count': _count_rsvps(coming=False),
+              'rsvp_waitlist_count': _count_rsvps(coming=True, waitlisted_at__isnull=False)}
+    stale = Q()
+    for field in counts:
+        stale |= ~Q(**{field: F('actual_' + field)})
+    with transaction.atomic():
+        stale_meetups = meetups.annotate(
+            **{'actual_' + field: count for field, count in counts.items()}).filter(stale)
+        pks = list(stale_meetups.values_list('pk', flat=True))
+        if not pks:
+            return 0
+        return Meetup.objects.filter(pk__in=pks).update(**counts)
+
+
+def get_rsvp_status(rsvp):
+    """Get the status of an RSVP
+
+    :param rsvp: Rsvp object
+    :return: RSVP_COMING, RSVP_WAITLISTED or RSVP_NOT_COMING
+    """
+    if not rsvp.coming:
+        return RSVP_NOT_COMING
+    return RSVP_WAITLISTED if rsvp.is_waitlisted else RSVP_COMING
+
+
+def _refresh_counters(meetup):
+    meetup.refresh_from_db(fields=Meetup.RSVP_COUNTER_FIELDS)
+
+
+def _promote_waitlist(meetup):
+    """Admit waitlisted RSVPs in the order they were waitlisted, as long as their seats fit.
+    The meetup row must be locked by the current transaction.
+
+    :return: list of admitted Rsvp objects
+    """
+    promoted = []
+    available_seats = meetup.available_seats
+    if not meetup.rsvp_waitlist_count or available_seats == 0:
+        return promoted
+    waitlist = Rsvp.objects.filter(meetup=meetup, coming=True, waitlisted_at__isnull=False)
+    for rsvp in waitlist.order_by('waitlisted_at', 'pk'):
+        if available_seats is not None:
+            if rsvp.seats > available_seats:
+                continue
+            available_seats -= rsvp.seats
+        rsvp.waitlisted_at = None
+        rsvp.save()
+        promoted.append(rsvp)
+        if available_seats == 0:
+            break
+    if promoted:
+        _refresh_counters(meetup)
+    return promoted
+
+
+@transaction.atomic
+def promote_waitlist(meetup_id):
+    """Admit the waitlisted RSVPs of a meetup that fit in its available seats, for example after
+    an attendee cancelled or the capacity was raised
+
+    :param meetup_id: int primary key of the Meetup
+    :return: list of admitted Rsvp objects
+    """
+    meetup = Meetup.objects.select_for_update().filter(pk=meetup_id).first()
+    if meetup is None:
+        return []
+    return _promote_waitlist(meetup)
+
+
+@transaction.atomic
+def save_rsvp(meetup_id, systers_user, coming=True, plus_one=False):
+    """Create or change the RSVP of a user and admit or waitlist it. The meetup row is locked
+    for the whole transaction, so concurrent RSVPs to a meetup are decided one after the other
+    and the capacity is never exceeded. An admitted user asking for a plus one keeps the seat
+    when there is no seat left for the plus one. Seats freed by the change are given to the
+    waitlist.
+
+    :param meetup_id: int primary key of the Meetup
+    :param systers_user: SystersUser object
+    :param coming: bool whether the user is coming
+    :param plus_one: bool whether the user brings someone
+    :return: tuple (Rsvp object, list of Rsvp objects promoted from the waitlist)
+    :raises Meetup.DoesNotExist: if the meetup does not exist
+    """
+    meetup = Meetup.objects.select_for_update().get(pk=meetup_id)
+    rsvp = Rsvp.objects.filter(user=systers_user, meetup=meetup).first()
+    if rsvp is None:
+        rsvp = Rsvp(user=systers_user)
+    # the returned RSVP gives access to the up to date counters of the meetup
+    rsvp.meetup = meetup
+    admitted = rsvp.pk is not None and rsvp.coming and not rsvp.is_waitlisted
+    held_seats = rsvp.seats if admitted else 0
+    rsvp.coming = coming
+    rsvp.plus_one = plus_one
+    if not coming or meetup.capacity is None:
+        rsvp.waitlisted_at = None
+    else:
+        available_seats = meetup.available_seats + held_seats
+        if rsvp.seats > available_seats and admitted:
+            rsvp.plus_one = False
+        if rsvp.seats <= available_seats:
+            rsvp.waitlisted_at = None
+        elif not rsvp.is_waitlisted:
+            rsvp.waitlisted_at = timezone.now()
+    rsvp.save()
+    _refresh_counters(meetup)
+    return rsvp, _promote_waitlist(meetup)
@@ -1,23 +1,27 @@
 import datetime
-import operator
+import hashlib
+import json
 
-from django.contrib.gis.geoip2 import GeoIP2
-from django.contrib.gis.geos import Point
+import numpy as np
+from django.core.paginator import Paginator
 from django.urls import reverse
-from django.db.models import Q
 from django.shortcuts import get_object_or_404
 from django.views.decorators.csrf import csrf_exempt
-from django.views.generic import DeleteView, RedirectView
+from django.views.generic import DeleteView, RedirectView, View
 from django.views.generic.detail import DetailView
 from django.views.generic.edit import CreateView, UpdateView, FormView
 from django.views.generic.list import ListView
 from braces.views import LoginRequiredMixin, PermissionRequiredMixin
 from django.contrib import messages
 from django.contrib.contenttypes.models import ContentType
-from django.http import JsonResponse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import (HttpResponse, HttpResponseRedirect, JsonResponse,
+                         StreamingHttpResponse)
+from django.db.models import Count, Max, Sum
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from cities_light.models import City
 from braces.views import FormValidMessageMixin, FormInvalidMessageMixin
-from geopy import Nominatim
-from ipware import get_client_ip
 
 from .forms import (AddMeetupForm, EditMeetupForm, AddMeetupCommentForm,
                     EditMeetupCommentForm, RsvpForm, AddSupportRequestForm,
@@ -27,11 +31,19 @@ from .forms import (AddMeetupForm, EditMeetupForm, AddMeetupCommentForm,
 from .models import (Meetup, Rsvp, SupportRequest,
                      RequestMeetup)
 from .constants import (OK, SLUG_ALREADY_EXISTS, SLUG_ALREADY_EXISTS_MSG,
-                        ERROR_MSG, SUCCESS_MEETUP_MSG)
+                        ERROR_MSG, SUCCESS_MEETUP_MSG, SEARCH_RESULTS_PER_PAGE,
+                        RSVP_WAITLISTED, RSVP_NOT_COMING, RSVP_COMING_MSG,
+                        RSVP_PLUS_ONE_REFUSED_MSG, RSVP_WAITLISTED_MSG, RSVP_NOT_COMING_MSG,
+                        VMS_SYNC_PAGE_SIZE, VMS_SYNC_MAX_PAGE_SIZE, CALENDAR_MAX_AGE)
+from .geo import get_client_location, get_user_coordinates
+from .ical import get_user_id, iter_calendar
+from .ranking import MeetupRanking
+from .search import search_meetups
+from .sync import InvalidCursor, get_meetup_changes, iter_meetups_json
+from .utils import get_rsvp_status, save_rsvp
 from users.models import SystersUser
 from common.models import Comment
 from rest_framework.views import APIView
-from cities_light.models import City
 
 
 class RequestMeetupView(LoginRequiredMixin, CreateView):
@@ -193,14 +205,8 @@ class AllUpcomingMeetupsView(ListView):
         meetup_list = Meetup.objects.filter(
             date__gte=datetime.date.today()).order_by('date', 'time')
         context = super(AllUpcomingMeetupsView, self).get_context_data(**kwargs)
-        context['cities_list'] = City.objects.all()
         context['meetup_list'] = meetup_list
-        g = GeoIP2()
-        client_ip, is_routable = get_client_ip(self.request)
-        if is_routable:
-            context['current_city'] = g.city(client_ip)['city']
-        else:
-            context['current_city'] = g.city("google.com")['city']
+        context['current_city'] = get_client_location(self.request).city
         return context
 
 
@@ -218,11 +224,9 @@ class MeetupView(DetailView):
             content_type=ContentType.objects.get(app_label='meetup', model='meetup'),
             object_id=self.object.id,
             is_approved=True).order_by('date_created')
-        coming_list = Rsvp.objects.filter(meetup=self.object, coming=True)
-        plus_one_list = Rsvp.objects.filter(meetup=self.object, plus_one=True)
-        not_coming_list = Rsvp.objects.filter(meetup=self.object, coming=False)
-        context['coming_no'] = len(coming_list) + len(plus_one_list)
-        context['not_coming_no'] = len(not_coming_list)
+        context['coming_no'] = self.object.attendee_count
+        context['not_coming_no'] = self.object.rsvp_not_coming_count
+        context['waitlist_no'] = self.object.rsvp_waitlist_count
         context['share_message'] = self.object.title + " @systers_org "
         return context
 
@@ -412,11 +416,11 @@ class DeleteMeetupCommentView(LoginRequiredMixin, PermissionRequiredMixin, Delet
 
 class RsvpMeetupView(FormValidMessageMixin, FormInvalidMessageMixin, LoginRequiredMixin,
                      CreateView):
-    """RSVP for a meetup"""
+    """RSVP for a meetup. The RSVP is admitted or waitlisted depending on the capacity of the
+    meetup. AJAX requests get the outcome as JSON instead of a redirect."""
     template_name = "meetup/rsvp_meetup.html"
     model = Rsvp
     form_class = RsvpForm
-    form_valid_message = (u"Success")
     form_invalid_message = ERROR_MSG
     raise_exception = True
 
@@ -431,9 +435,9 @@ class RsvpMeetupView(FormValidMessageMixin, FormInvalidMessageMixin, LoginRequir
         self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
         kwargs.update({'user': self.request.user})
         kwargs.update({'meetup': self.meetup})
-        currState = Rsvp.objects.filter(user__user=self.request.user, meetup=self.meetup)
-        if currState.exists():
-            kwargs.update({'instance': currState.first()})
+        rsvp = Rsvp.objects.filter(user__user=self.request.user, meetup=self.meetup).first()
+        if rsvp is not None:
+            kwargs.update({'instance': rsvp})
         return kwargs
 
     def get_context_data(self, **kwargs):
@@ -442,6 +446,44 @@ class RsvpMeetupView(FormValidMessageMixin, FormInvalidMessageMixin, LoginRequir
         context['meetup'] = self.meetup
         return context
 
+    def get_form_valid_message(self):
+        """Tell the user whether the RSVP was admitted or waitlisted"""
+        status = get_rsvp_status(self.object)
+        if status == RSVP_WAITLISTED:
+            return RSVP_WAITLISTED_MSG
+        if status == RSVP_NOT_COMING:
+            return RSVP_NOT_COMING_MSG
+        if self.plus_one_requested and not self.object.plus_one:
+            return RSVP_PLUS_ONE_REFUSED_MSG
+        return RSVP_COMING_MSG
+
+    def form_valid(self, form):
+        """Save the RSVP through save_rsvp, which decides atomically whether it fits in the
+        meetup, instead of saving the form"""
+        systers_user = get_object_or_404(SystersUser, user=self.request.user)
+        self.plus_one_requested = form.cleaned_data['plus_one']
+        self.object, promoted = save_rsvp(self.meetup.pk, systers_user,
+                                          coming=form.cleaned_data['coming'],
+                                          plus_one=self.plus_one_requested)
+        message = self.get_form_valid_message()
+        if self.request.is_ajax():
+            meetup = self.object.meetup
+            return JsonResponse({'status': get_rsvp_status(self.object),
+                                 'plus_one': self.object.plus_one,
+                                 'message': message,
+                                 'attendee_count': meetup.attendee_count,
+                                 'capacity': meetup.capacity,
+                                 'available_seats': meetup.available_seats,
+                                 'waitlist_count': meetup.rsvp_waitlist_count})
+        self.messages.success(message, fail_silently=True)
+        return HttpResponseRedirect(self.get_success_url())
+
+    def form_invalid(self, form):
+        """Return the form errors as JSON to AJAX requests"""
+        if self.request.is_ajax():
+            return JsonResponse({'errors': form.errors}, status=400)
+        return super(RsvpMeetupView, self).form_invalid(form)
+
 
 class RsvpGoingView(LoginRequiredMixin, ListView):
     """List of members whose rsvp status is 'coming'"""
@@ -452,7 +494,8 @@ class RsvpGoingView(LoginRequiredMixin, ListView):
     def get_queryset(self, **kwargs):
         """Set ListView queryset to all rsvps whose 'coming' attribute is set to True"""
         self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
-        rsvp_list = Rsvp.objects.filter(meetup=self.meetup, coming=True)
+        rsvp_list = Rsvp.objects.filter(meetup=self.meetup, coming=True,
+                                        waitlisted_at__isnull=True)
         return rsvp_list
 
     def get_context_data(self, **kwargs):
@@ -745,24 +788,14 @@ class ApiForVmsView(APIView):
 
     @classmethod
     def return_meetup_data(self, meetups):
-        """function to return all or filtered meetup data"""
-        meetup_list = list()
-        for meetup in meetups:
-            meetup_data = {}
-            meetup_data['meetup_id'] = meetup.pk
-            meetup_data['event_name'] = meetup.title
-            meetup_data['start_date'] = meetup.date
-            meetup_data['venue'] = meetup.venue
-            meetup_data['end_date'] = meetup.end_date
-            meetup_data['description'] = meetup.description
-
-            meetup_list.append(meetup_data)
-        return JsonResponse(meetup_list, safe=False)
+        """function to stream all or filtered meetup data as a JSON array"""
+        return StreamingHttpResponse(iter_meetups_json(meetups),
+                                     content_type='application/json')
 
     @classmethod
     def get(self, request):
         # fetching all meetups
-        meetups = Meetup.objects.all().order_by('date')
+        meetups = Meetup.objects.all().order_by('date', 'pk')
         apiforvmsview = ApiForVmsView()
         return (apiforvmsview.return_meetup_data(meetups))
 
@@ -770,11 +803,99 @@ class ApiForVmsView(APIView):
     def post(self, request):
         ID = request.data['meetup_id']
         # fetching all meetups whose id is greater than or equal to the date posted
-        meetups = Meetup.objects.filter(pk__gte=ID).order_by('date')
+        meetups = Meetup.objects.filter(pk__gte=ID).order_by('date', 'pk')
         apiforvmsview = ApiForVmsView()
         return (apiforvmsview.return_meetup_data(meetups))
 
 
+class ApiForVmsSyncView(APIView):
+    """Incremental sync of meetups for the volunteer management system. Each page lists the
+    meetups changed and deleted since the cursor of the previous page. Responses carry an ETag,
+    so a poll that finds no change gets an empty 304 response."""
+
+    def get(self, request):
+        try:
+            limit = min(max(int(request.GET.get('limit', VMS_SYNC_PAGE_SIZE)), 1),
+                        VMS_SYNC_MAX_PAGE_SIZE)
+        except ValueError:
+            limit = VMS_SYNC_PAGE_SIZE
+        try:
+            changes = get_meetup_changes(request.GET.get('cursor'), limit)
+        except InvalidCursor as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        content = json.dumps(changes, cls=DjangoJSONEncoder)
+        etag = '"{0}"'.format(hashlib.md5(content.encode('utf-8')).hexdigest())
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(content, content_type='application/json')
+        response['ETag'] = etag
+        return response
+
+
+class MeetupCalendarView(View):
+    """iCalendar feed of the upcoming meetups. The feed is validated with the newest
+    last_updated of its meetups and an ETag of the set of meetups, so the calendar clients
+    polling it get a 304 response as long as nothing changed."""
+    calendar_name = "Systers Meetups"
+    cache_control = {'public': True, 'max_age': CALENDAR_MAX_AGE}
+
+    def get_queryset(self):
+        return Meetup.objects.filter(date__gte=datetime.date.today())
+
+    def get_calendar_name(self):
+        return self.calendar_name
+
+    def get_meetup_url(self, meetup):
+        return self.request.build_absolute_uri(
+            reverse('view_meetup', kwargs={'slug': meetup.slug}))
+
+    def get(self, request, *args, **kwargs):
+        meetups = self.get_queryset()
+        state = meetups.aggregate(count=Count('pk'), checksum=Sum('pk'),
+                                  last_modified=Max('last_updated'))
+        etag = '"{0}"'.format(hashlib.md5(
+            "{count}:{checksum}:{last_modified}".format(**state).encode('utf-8')).hexdigest())
+        last_modified = state['last_modified'] and int(state['last_modified'].timestamp())
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = StreamingHttpResponse(
+                iter_calendar(meetups.order_by('date', 'time', 'pk'), self.get_calendar_name(),
+                              request.get_host(), self.get_meetup_url),
+                content_type='text/calendar; charset=utf-8')
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, **self.cache_control)
+        return response
+
+
+class CityMeetupCalendarView(MeetupCalendarView):
+    """iCalendar feed of the upcoming meetups in a city"""
+
+    def get_queryset(self):
+        self.city = get_object_or_404(City, pk=self.kwargs['city_id'])
+        return super(CityMeetupCalendarView, self).get_queryset().filter(
+            meetup_location=self.city)
+
+    def get_calendar_name(self):
+        return "Systers Meetups in {0}".format(self.city)
+
+
+class UserMeetupCalendarView(MeetupCalendarView):
+    """iCalendar feed of the upcoming meetups a user is coming to. The URL holds a token
+    signed for the user instead of the username, since calendar clients can't log in."""
+    cache_control = {'private': True, 'max_age': CALENDAR_MAX_AGE}
+
+    def get_queryset(self):
+        user_id = get_user_id(self.kwargs['token'])
+        self.systersuser = get_object_or_404(SystersUser, user_id=user_id)
+        return super(UserMeetupCalendarView, self).get_queryset().filter(
+            rsvp__user=self.systersuser, rsvp__coming=True, rsvp__waitlisted_at__isnull=True)
+
+    def get_calendar_name(self):
+        return "Systers Meetups of {0}".format(self.systersuser)
+
+
 class UpcomingMeetupsSearchView(ListView):
     """Search Upcoming Meetups By  Keyword and Filter Date and Distance"""
     template_name = "meetup/list_meetup.html"
@@ -783,39 +904,41 @@ class UpcomingMeetupsSearchView(ListView):
     @csrf_exempt
     def post(self, request):
         if request.method == 'POST':
-            keyword = request.POST.get('keyword')
+            keyword = request.POST.get('keyword', '')
             location = request.POST.get('location')
-            searched_meetups = Meetup.objects.filter(Q(date__gte=datetime.date.today()),
-                                                     Q(title__icontains=keyword))
-            results = list()
+            try:
+                radius = float(request.POST.get('radius'))
+            except (TypeError, ValueError):
+                radius = None
+            searched_meetups = search_meetups(
+                Meetup.objects.filter(date__gte=datetime.date.today()), keyword)
+            ranking = MeetupRanking.from_queryset(
+                searched_meetups,
+                fields=('title', 'slug', 'meetup_location__name', 'search_rank'))
+            relevance = np.fromiter((row[-1] for row in ranking.rows), dtype=np.float64,
+                                    count=len(ranking))
             unit = ''
-            for meetup in searched_meetups:
-                distance = ''
-                geolocator = Nominatim(user_agent="Anita-B Portal", timeout=6)
-                g = GeoIP2()
-                if location == "Current Location":
-                    client_ip, is_routable = get_client_ip(request)
-                    if is_routable:
-                        lat, long = g.lat_lon(client_ip)
-                    else:
-                        lat, long = g.lat_lon("google.com")
-                    user_point = Point(float(long),
-                                       float(lat))
-                else:
-                    user_loc = geolocator.geocode(location)
-                    user_point = Point(float(user_loc.raw['lon']), float(user_loc.raw['lat']))
-                meetup_loc = geolocator.geocode(meetup.meetup_location)
-                meetup_point = Point(float(meetup_loc.raw['lon']),
-                                     float(meetup_loc.raw['lat']))
-                distance = int(user_point.distance(meetup_point)) * 100
+            user_coordinates = get_user_coordinates(request, location)
+            if user_coordinates is not None:
+                latitude, longitude = user_coordinates
                 unit = 'kilometers from your location'
+            else:
+                latitude = longitude = radius = None
+            indices, distances = ranking.rank(latitude, longitude, radius=radius,
+                                              relevance=relevance)
+            page = Paginator(list(zip(indices, distances)),
+                             SEARCH_RESULTS_PER_PAGE).get_page(request.POST.get('page'))
 
-                results.append({'date': meetup.date,
-                                'meetup': meetup.title,
-                                'distance': distance,
-                                'location': meetup.meetup_location.name,
-                                'meetup_slug': meetup.slug})
-
-            results.sort(key=operator.itemgetter('date'))
-            results.sort(key=operator.itemgetter('distance'))
-            return JsonResponse({'search_results': results, 'unit': unit}, safe=False)
+            results = list()
+            for index, distance in page:
+                pk, date, time, lat, lon, title, slug, location_name, rank = ranking.rows[index]
+                results.append({'date': date,
+                                'meetup': title,
+                                'distance': None if np.isnan(distance) else int(round(distance)),
+                                'location': location_name,
+                                'meetup_slug': slug})
+            return JsonResponse({'search_results': results,
+                                 'unit': unit,
+                                 'page': page.number,
+                                 'num_pages': page.paginator.num_pages,
+                                 'has_next': page.has_next()}, safe=False)
@@ -1 +1,2 @@
+default_app_config = 'membership.apps.MembershipConfig'
 __author__ = 'ana'
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class MembershipConfig(AppConfig):
+    name = 'membership'
+
+    def ready(self):
+        import membership.signals  # noqa # pylint: disable=unused-variable
@@ -35,3 +35,7 @@ REMOVE_NOT_MEMBER_MSG = "{0} is not a member of {1} community, hence the " \
                         "user can't be removed from the community members."
 REMOVE_IS_ADMIN_MSG = "{0} is the {1} community admin. It is not possible " \
                       "to remove the admin from community members."
+
+# cache of the membership state of a user towards a community
+MEMBERSHIP_STATE_CACHE_KEY = "membership:state:{0}:{1}"
+MEMBERSHIP_STATE_CACHE_TIMEOUT = 60 * 60
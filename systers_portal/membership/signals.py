@@ -0,0 +1,34 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from community.models import Community
+from membership.models import JoinRequest
+from membership.utils import clear_membership_state
+from users.models import SystersUser
+
+
+@receiver(post_save, sender=JoinRequest, dispatch_uid="clear_membership_state_on_save")
+@receiver(post_delete, sender=JoinRequest, dispatch_uid="clear_membership_state_on_delete")
+def clear_join_request_membership_state(sender, instance, **kwargs):
+    """Invalidate the cached membership state of the user who made a join request"""
+    clear_membership_state(instance.user.user_id, instance.community)
+
+
+@receiver(m2m_changed, sender=Community.members.through,
+          dispatch_uid="clear_membership_state_on_members_change")
+def clear_members_membership_state(sender, instance, action, reverse, pk_set, **kwargs):
+    """Invalidate the cached membership state of users who joined or left a community"""
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if reverse:
+        # instance is a SystersUser whose communities changed
+        communities = instance.communities.all() if pk_set is None else \
+            Community.objects.filter(pk__in=pk_set)
+        for community in communities:
+            clear_membership_state(instance.user_id, community)
+    else:
+        # instance is a Community whose members changed
+        members = instance.members.all() if pk_set is None else \
+            SystersUser.objects.filter(pk__in=pk_set)
+        for user_id in members.values_list('user_id', flat=True):
+            clear_membership_state(user_id, instance)
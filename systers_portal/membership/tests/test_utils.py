@@ -0,0 +1,72 @@
+from unittest.mock import patch
+
+from cities_light.models import Country, City
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from common.constants import LOCAL_CACHE_TIMEOUT
+from community.models import Community
+from membership.models import JoinRequest
+from membership.utils import get_membership_state
+from users.models import SystersUser
+
+
+class MembershipStateTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        admin = User.objects.create(username='foo', password='foobar')
+        self.user = User.objects.create(username='bar', password='foobar')
+        self.systers_user = SystersUser.objects.get(user=self.user)
+        country = Country.objects.create(name='Bar', continent='AS')
+        location = City.objects.create(name='Foo', display_name='Foo',
+                                       country=country)
+        self.community = Community.objects.create(name="Foo", slug="foo",
+                                                  order=1, location=location,
+                                                  admin=SystersUser.objects.get(user=admin))
+
+    def test_get_membership_state(self):
+        """Test reading the membership state with a single query and caching it"""
+        with self.assertNumQueries(1):
+            state = get_membership_state(self.user.pk, self.community)
+        self.assertEqual(state, (False, None))
+        with self.assertNumQueries(0):
+            get_membership_state(self.user.pk, self.community)
+
+        JoinRequest.objects.create(user=self.systers_user, community=self.community)
+        last_join_request = JoinRequest.objects.create(user=self.systers_user,
+                                                       community=self.community)
+        with self.assertNumQueries(1):
+            state = get_membership_state(self.user.pk, self.community)
+        self.assertFalse(state.is_member)
+        self.assertEqual(state.join_request, last_join_request)
+        self.assertFalse(state.join_request.is_approved)
+
+    def test_membership_state_local_cache_timeout(self):
+        """Test that the membership state expires shortly in a cache local to each process"""
+        with patch.object(cache, 'set', wraps=cache.set) as cache_set:
+            get_membership_state(self.user.pk, self.community)
+        self.assertEqual(cache_set.call_args[0][2], LOCAL_CACHE_TIMEOUT)
+
+    def test_membership_state_invalidation(self):
+        """Test that changing members or join requests invalidates the membership state"""
+        join_request = JoinRequest.objects.create(user=self.systers_user,
+                                                  community=self.community)
+        self.assertEqual(get_membership_state(self.user.pk, self.community),
+                         (False, join_request))
+
+        join_request.approve()
+        self.community.add_member(self.systers_user)
+        state = get_membership_state(self.user.pk, self.community)
+        self.assertTrue(state.is_member)
+        self.assertTrue(state.join_request.is_approved)
+
+        self.systers_user.communities.remove(self.community)
+        self.assertEqual(get_membership_state(self.user.pk, self.community),
+                         (False, join_request))
+        join_request.delete()
+        self.assertEqual(get_membership_state(self.user.pk, self.community), (False, None))
+
+        self.community.add_member(self.systers_user)
+        self.community.members.clear()
+        self.assertEqual(get_membership_state(self.user.pk, self.community), (False, None))
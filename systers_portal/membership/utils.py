@@ -0,0 +1,70 @@
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Subquery
+
+from common.cache import get_cache_timeout
+from community.models import Community
+from membership.constants import MEMBERSHIP_STATE_CACHE_KEY, MEMBERSHIP_STATE_CACHE_TIMEOUT
+from membership.models import JoinRequest
+
+MembershipState = namedtuple('MembershipState', ['is_member', 'join_request'])
+
+# JoinRequest fields loaded along with the membership of the user
+JOIN_REQUEST_FIELDS = ('pk', 'user', 'approved_by', 'date_created', 'is_approved')
+
+
+def _get_cache_key(user_id, community):
+    return MEMBERSHIP_STATE_CACHE_KEY.format(user_id, community.pk)
+
+
+def get_membership_state(user_id, community):
+    """Get whether a user is a member of a community and the last join request the user made to
+    it. Both are read with a single query and cached until the membership views change them,
+    or at most LOCAL_CACHE_TIMEOUT seconds when the cache is local to each worker process.
+
+    :param user_id: int primary key of a User
+    :param community: Community object
+    :return: MembershipState tuple (is_member, join_request), where join_request is a JoinRequest
+             object or None if the user has made no requests
+    """
+    key = _get_cache_key(user_id, community)
+    state = cache.get(key)
+    if state is not None:
+        return state
+
+    members = Community.members.through.objects.filter(community=OuterRef('pk'),
+                                                       systersuser__user_id=user_id)
+    join_requests = JoinRequest.objects.filter(community=OuterRef('pk'),
+                                               user__user_id=user_id) \
+        .order_by('-date_created', '-pk')
+    annotations = {'join_request_{0}'.format(field):
+                   Subquery(join_requests.values(field)[:1]) for field in JOIN_REQUEST_FIELDS}
+    values = Community.objects.filter(pk=community.pk) \
+        .annotate(is_member=Exists(members), **annotations) \
+        .values('is_member', *annotations).first()
+
+    join_request = None
+    if values is not None and values['join_request_pk'] is not None:
+        join_request = JoinRequest(pk=values['join_request_pk'],
+                                   user_id=values['join_request_user'],
+                                   approved_by_id=values['join_request_approved_by'],
+                                   community_id=community.pk,
+                                   date_created=values['join_request_date_created'],
+                                   is_approved=values['join_request_is_approved'])
+    state = MembershipState(bool(values and values['is_member']), join_request)
+    cache.set(key, state, get_cache_timeout(MEMBERSHIP_STATE_CACHE_TIMEOUT))
+    return state
+
+
+def clear_membership_state(user_id, community):
+    """Invalidate the cached membership state of a user towards a community. The cache is
+    cleared right away and once more after the current transaction commits.
+
+    :param user_id: int primary key of a User
+    :param community: Community object
+    """
+    key = _get_cache_key(user_id, community)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
@@ -6,6 +6,7 @@ from django.views.generic import RedirectView, ListView, FormView
 from django.views.generic.detail import SingleObjectMixin
 from braces.views import LoginRequiredMixin, PermissionRequiredMixin
 
+from common.mixins import IdentityMapMixin, CommunityObjectMixin
 from community.models import Community
 from membership.constants import *  # NOQA
 from membership.forms import TransferOwnershipForm
@@ -13,7 +14,7 @@ from membership.models import JoinRequest
 from users.models import SystersUser
 
 
-class CommunityJoinRequestListView(LoginRequiredMixin, PermissionRequiredMixin,
+class CommunityJoinRequestListView(IdentityMapMixin, LoginRequiredMixin, PermissionRequiredMixin,
                                    ListView):
     """List of not yet approved JoinRequest(s) to a Community"""
     template_name = "membership/join_requests.html"
@@ -35,12 +36,12 @@ class CommunityJoinRequestListView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to approve join
         requests. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
+        self.community = self.get_url_community()
         return request.user.has_perm("approve_community_joinrequest",
                                      self.community)
 
 
-class ApproveCommunityJoinRequestView(LoginRequiredMixin,
+class ApproveCommunityJoinRequestView(IdentityMapMixin, LoginRequiredMixin,
                                       PermissionRequiredMixin, RedirectView):
     """Approve a JoinRequest to a Community"""
     permanent = False
@@ -81,12 +82,12 @@ class ApproveCommunityJoinRequestView(LoginRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to approve join
         requests. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
+        self.community = self.get_url_community()
         return request.user.has_perm("approve_community_joinrequest",
                                      self.community)
 
 
-class RejectCommunityJoinRequestView(LoginRequiredMixin,
+class RejectCommunityJoinRequestView(IdentityMapMixin, LoginRequiredMixin,
                                      PermissionRequiredMixin, RedirectView):
     """Reject a JoinRequest to a community"""
     permanent = False
@@ -125,12 +126,12 @@ class RejectCommunityJoinRequestView(LoginRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to approve/reject join
         requests. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
+        self.community = self.get_url_community()
         return request.user.has_perm("approve_community_joinrequest",
                                      self.community)
 
 
-class RequestJoinCommunityView(LoginRequiredMixin, SingleObjectMixin,
+class RequestJoinCommunityView(CommunityObjectMixin, LoginRequiredMixin, SingleObjectMixin,
                                RedirectView):
     """Request to join a community view"""
     model = Community
@@ -146,7 +147,7 @@ class RequestJoinCommunityView(LoginRequiredMixin, SingleObjectMixin,
     def get(self, request, *args, **kwargs):
         """Attempt to create a join request and add a message about the result.
         """
-        systers_user = get_object_or_404(SystersUser, user=self.request.user)
+        systers_user = self.get_systers_user()
         community = self.get_object()
         join_request, status = JoinRequest.objects.create_join_request(
             systers_user, community)
@@ -166,7 +167,7 @@ class RequestJoinCommunityView(LoginRequiredMixin, SingleObjectMixin,
                                                          **kwargs)
 
 
-class CancelCommunityJoinRequestView(LoginRequiredMixin, SingleObjectMixin,
+class CancelCommunityJoinRequestView(CommunityObjectMixin, LoginRequiredMixin, SingleObjectMixin,
                                      RedirectView):
     """Cancel a join request to a community view"""
     model = Community
@@ -181,7 +182,7 @@ class CancelCommunityJoinRequestView(LoginRequiredMixin, SingleObjectMixin,
 
     def get(self, request, *args, **kwargs):
         """Attempt to cancel user join request towards a community"""
-        systers_user = get_object_or_404(SystersUser, user=self.request.user)
+        systers_user = self.get_systers_user()
         community = self.get_object()
         status = JoinRequest.objects.cancel_join_request(systers_user,
                                                          community)
@@ -201,7 +202,7 @@ class CancelCommunityJoinRequestView(LoginRequiredMixin, SingleObjectMixin,
                                                                **kwargs)
 
 
-class LeaveCommunityView(LoginRequiredMixin, SingleObjectMixin, RedirectView):
+class LeaveCommunityView(CommunityObjectMixin, LoginRequiredMixin, SingleObjectMixin, RedirectView):
     """Leave a community view"""
     model = Community
     permanent = False
@@ -215,7 +216,7 @@ class LeaveCommunityView(LoginRequiredMixin, SingleObjectMixin, RedirectView):
 
     def get(self, request, *args, **kwargs):
         """Attempt to leave a community"""
-        systers_user = get_object_or_404(SystersUser, user=self.request.user)
+        systers_user = self.get_systers_user()
         community = self.get_object()
         status = systers_user.leave_community(community)
         if status == OK:
@@ -233,7 +234,7 @@ class LeaveCommunityView(LoginRequiredMixin, SingleObjectMixin, RedirectView):
         return super(LeaveCommunityView, self).get(request, *args, **kwargs)
 
 
-class TransferOwnershipView(LoginRequiredMixin, PermissionRequiredMixin,
+class TransferOwnershipView(IdentityMapMixin, LoginRequiredMixin, PermissionRequiredMixin,
                             FormView):
     """Transfer community ownership to another member."""
     template_name = "membership/transfer_ownership.html"
@@ -277,11 +278,11 @@ class TransferOwnershipView(LoginRequiredMixin, PermissionRequiredMixin,
         """Check if the request user is the community admin. Only the admin
         has the permission to transfer community ownership to another member
         of the community."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
+        self.community = self.get_url_community()
         return request.user == self.community.admin.user
 
 
-class RemoveCommunityMemberView(LoginRequiredMixin, PermissionRequiredMixin,
+class RemoveCommunityMemberView(IdentityMapMixin, LoginRequiredMixin, PermissionRequiredMixin,
                                 RedirectView):
     """Remove a user from community members view"""
     permanent = False
@@ -328,6 +329,6 @@ class RemoveCommunityMemberView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permission to remove systers users
         from a community. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
+        self.community = self.get_url_community()
         return request.user.has_perm('delete_community_systersuser',
                                      self.community)
@@ -0,0 +1,18 @@
+// Turning the City selects into search boxes that query the city autocomplete endpoint
+$("select[data-autocomplete-url]").each(function () {
+    const select = $(this)
+    select.select2({
+        ajax: {
+            url: select.data('autocomplete-url'),
+            dataType: 'json',
+            delay: 250,
+            data: params => ({
+                query: params.term,
+                page: params.page || 1,
+                country: select.data('country'),
+            }),
+        },
+        minimumInputLength: 1,
+        placeholder: select.attr('placeholder') || 'Search for a city',
+    })
+})
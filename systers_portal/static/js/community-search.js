@@ -4,13 +4,63 @@ const endpoint = '/community/search'
 const delay_by_in_ms =300
 let scheduled_function = false
 
+let escape_html = function (text) {
+    return $('<div>').text(text === null ? '' : text).html()
+}
+
+let render_cards = function (results) {
+    if (!results.length) {
+        return '<h3>No communities found</h3>'
+    }
+    let html = '<div class="row">'
+    results.forEach(community => {
+        html += '<div><a href="' + escape_html(community.url) + '">' +
+            '<div class="panel panel-primary col-md-4">' +
+            '<div class="panel-heading"><h3 class="panel-title">' + escape_html(community.name) +
+            '</h3></div>' +
+            '<div class="panel-body">' + escape_html(community.location) + '</div>' +
+            '</div></a></div>'
+    })
+    return html + '</div>'
+}
+
+let render_markers = function (results) {
+    if (typeof map === 'undefined' || typeof google === 'undefined') {
+        return
+    }
+    markers.forEach(marker => marker.setMap(null))
+    markers = []
+    results.forEach(community => {
+        if (community.lat === null || community.lng === null) {
+            return
+        }
+        let marker = new google.maps.Marker({
+            position: new google.maps.LatLng(community.lat, community.lng),
+            map: map,
+            title: community.name,
+        })
+        marker['infowindow'] = new google.maps.InfoWindow({
+            content: "<a href='" + escape_html(community.url) + "'>" +
+                escape_html(community.name) + "</a>",
+        })
+        google.maps.event.addListener(marker, 'click', function () {
+            this['infowindow'].open(map, this)
+        })
+        markers.push(marker)
+    })
+}
+
 let ajax_call = function (endpoint, request_parameters) {
     $.getJSON(endpoint, request_parameters)
         .done(response => {
+            // ignore responses to queries that are no longer in the search box
+            if (response['query'] !== input.val().trim().replace(/\s+/g, ' ').toLowerCase()) {
+                return
+            }
             result_div.fadeTo('fast', 0).promise().then(() => {
-                result_div.html(response['html'])
+                result_div.html(render_cards(response['results']))
+                render_markers(response['results'])
                 result_div.fadeTo('fast', 1)
-
             })
         })
 }
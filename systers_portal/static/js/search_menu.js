@@ -15,8 +15,31 @@ function getCookie(name) {
             return cookieValue;
         }
 
+// Rendering one page of search results
+function renderMeetups(a) {
+	let x = "";
+	for(var i of a.search_results){
+	  let link = `../${i.meetup_slug}/`;
+	  let distance = i.distance === null ? "" : `<h5> ${i.distance}  ${a.unit} </h5>`;
+	  x = x + `<div class="col-sm-6 col-md-4">
+	             <div class="thumbnail">
+	                  <div class="caption">
+	                     <h3> ${i.meetup} </h3>
+	                      <h4> ${i.date}  </h4>
+	                      <h5> ${i.location} </h5>
+	                      ${distance}
+	                      <p align="right">
+	                        <a href=${link} class="btn btn-primary" role="button">Checkout</a>
+	                      </p>
+	                  </div>
+	             </div>
+	            </div>`;
+	}
+	return x;
+}
+
 // Getting data from the search bars
-$("#go-btn").click(function() {
+function searchMeetups(page) {
 
 	let Keyword = document.getElementById("keyword-input").value;
 	let Location = document.getElementById("location").options[document.getElementById("location").selectedIndex].text;
@@ -24,39 +47,35 @@ $("#go-btn").click(function() {
 	let Data = {
 	  "csrfmiddlewaretoken": csrftoken,
 		"keyword": Keyword,
-		"location": Location
+		"location": Location,
+		"page": page
 	};
 	$.ajax({
 		type: "POST",
 		url: "search/",
 		data: Data,
 		success(a){
-		let x="";
+		  $("#more-meetups").remove();
 		  if(a.search_results.length==0){
-		     x = `<h3>No Meetups Found</h3>`;
+		     $("#meetups-list").html(`<h3>No Meetups Found</h3>`);
+		     return;
+		  }
+		  if(a.page==1){
+		     $("#meetups-list").html(`<div class="row"></div>`);
+		  }
+		  $("#meetups-list .row").append(renderMeetups(a));
+		  if(a.has_next){
+		     $("#meetups-list").append(`<p align="center" id="more-meetups">
+		         <button class="btn btn-default" type="button">More Meetups</button></p>`);
+		     $("#more-meetups button").click(function() {
+		         searchMeetups(a.page + 1);
+		     });
 		  }
-			else{
-			   x = `<div class="row">`;
-			for(var i of a.search_results){
-			  let link = `../${i.meetup_slug}/`;
-			  x = x + `<div class="col-sm-6 col-md-4">
-			             <div class="thumbnail">
-			                  <div class="caption">
-			                     <h3> ${i.meetup} </h3>
-			                      <h4> ${i.date}  </h4>
-			                      <h5> ${i.location} </h5>
-			                      <h5> ${i.distance}  ${a.unit} </h5>
-			                      <p align="right">
-			                        <a href=${link} class="btn btn-primary" role="button">Checkout</a>
-			                      </p>
-			                  </div>
-			             </div>
-			            </div>`;
-			}
-			x = x + `</div>`;
-			}
-		$("#meetups-list").html(x);
 		},
 		dataType:"json",
 	});
+}
+
+$("#go-btn").click(function() {
+	searchMeetups(1);
 });
@@ -46,7 +46,6 @@ INSTALLED_APPS = (
     'guardian',
     'crispy_forms',
     'cities_light',
-    'imagekit',
     'blog',
     'common',
     'community',
@@ -62,6 +61,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'common.middleware.IdentityMapMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'django.middleware.locale.LocaleMiddleware',
@@ -133,6 +133,11 @@ ACCOUNT_ADAPTER = 'users.adapter.SystersUserAccountAdapter'
 ACCOUNT_EMAIL_VERIFICATION = "mandatory"
 ACCOUNT_FORMS = {'change_password': 'users.forms.SystersChangePasswordForm'}
 
+# Emails are written to an outbox table in the transaction of the request that sends them, and
+# delivered by the send_queued_emails command with the OUTBOX_DELIVERY_BACKEND
+EMAIL_BACKEND = 'common.mail.OutboxEmailBackend'
+OUTBOX_DELIVERY_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+
 # Ckeditor configuration
 CKEDITOR_UPLOAD_PATH = "uploads/"
 CKEDITOR_IMAGE_BACKEND = 'pillow'
@@ -142,6 +147,8 @@ CKEDITOR_RESTRICT_BY_USER = True
 CKEDITOR_CONFIGS = {
     'default': {
         'width': '100%',
+        'filebrowserUploadUrl': '/ckeditor/upload/',
+        'filebrowserBrowseUrl': '/ckeditor/browse/',
         'toolbar': [
             ['Styles', 'Format', 'Font', 'FontSize', 'Bold', 'Italic',
              'Underline', 'Strike', 'Subscript', 'Superscript', '-', 'Undo',
@@ -166,3 +173,17 @@ ANONYMOUS_USER_ID = None
 CRISPY_TEMPLATE_PACK = 'bootstrap3'
 
 GEOIP_PATH = os.path.join(BASE_DIR, "GeoLite2-City_20200616/GeoLite2-City.mmdb")
+
+# Number of client IP geolocations cached per worker process
+GEOIP_CACHE_SIZE = 1024
+# Seconds between checks whether the GeoLite2 database file was replaced
+GEOIP_CHECK_INTERVAL = 60
+
+# The cache is local to each worker process, values invalidated by a change in one process are
+# then cached at most LOCAL_CACHE_TIMEOUT seconds (see common/constants.py). Configure a cache
+# shared by the worker processes, like Memcached, to keep them until they are invalidated.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
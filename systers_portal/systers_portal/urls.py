@@ -1,15 +1,14 @@
 from django.conf import settings
 from django.conf.urls import include, url
 from django.contrib import admin
-from django.contrib.auth.decorators import login_required
-from django.views.decorators.cache import never_cache
-from ckeditor_uploader import views
 from django.views.static import serve
 
 from common.views import IndexView, Logout
 from common.views import ContactView
 from common.views import AboutUsView
 from common.views import NewCommunityProposalView
+from common.views import CityAutocompleteView
+from common.views import EditorUploadView, EditorBrowseView
 
 try:
     admin.autodiscover()
@@ -26,14 +25,16 @@ urlpatterns = [
     url(r'^admin/', admin.site.urls),
     url(r'^logout/', Logout.as_view(), name='logout'),
     url(r'^accounts/', include('allauth.urls')),
-    url(r'^ckeditor/upload/', login_required(views),
+    url(r'^ckeditor/upload/', EditorUploadView.as_view(),
         name='ckeditor_upload'),
-    url(r'^ckeditor/browse/', never_cache(login_required(views.browse)),
+    url(r'^ckeditor/browse/', EditorBrowseView.as_view(),
         name='ckeditor_browse'),
     url(r'^contact/$', ContactView.as_view(), name='contact'),
     url(r'^about-us/$', AboutUsView.as_view(), name='about-us'),
     url(r'^propose/newcommunity/$', NewCommunityProposalView.as_view(),
         name='new-community-proposal'),
+    url(r'^cities/autocomplete/$', CityAutocompleteView.as_view(),
+        name='city_autocomplete'),
     url(r'^notifications/', include('pinax.notifications.urls')),
 ]
 
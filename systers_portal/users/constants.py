@@ -0,0 +1,9 @@
+# weekly digest of the communities of a user
+DIGEST_PERIOD_DAYS = 7
+DIGEST_BATCH_SIZE = 500
+DIGEST_SUBJECT = "Your weekly Systers digest"
+DIGEST_GREETING = "Hi {0},\n\nHere is what happened this week in your Systers communities.\n\n"
+DIGEST_FOOTER = "\nTo stop receiving weekly digests, change your settings: {0}\n"
+
+# sizes in pixels of the square variants of profile pictures
+PROFILE_PICTURE_SIZES = (100, 200, 400)
@@ -0,0 +1,172 @@
+import datetime
+import logging
+import time
+from collections import defaultdict
+from itertools import groupby
+from operator import itemgetter
+
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.core.mail import EmailMessage
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from blog.models import News, Resource
+from common.mail import get_delivery_connection
+from community.models import Community, CommunityPage
+from meetup.models import Meetup
+from users.constants import (DIGEST_PERIOD_DAYS, DIGEST_BATCH_SIZE, DIGEST_SUBJECT,
+                             DIGEST_GREETING, DIGEST_FOOTER)
+
+logger = logging.getLogger(__name__)
+
+
+def get_base_url():
+    """Scheme and domain of the current site, prepended to the links of emails
+
+    :return: string base URL without trailing slash
+    """
+    protocol = getattr(settings, 'DEFAULT_HTTP_PROTOCOL', 'http')
+    return "{0}://{1}".format(protocol, Site.objects.get_current().domain)
+
+
+def _group_by_community(queryset, field='community_id'):
+    grouped = defaultdict(list)
+    for obj in queryset:
+        grouped[getattr(obj, field)].append(obj)
+    return grouped
+
+
+def get_digest_sections(today=None, days=DIGEST_PERIOD_DAYS, base_url=None):
+    """Render the digest section of every community with new posts or upcoming meetups. Each
+    kind of content is fetched with a single query for all the communities, and each section is
+    rendered once, whatever the number of members of the community.
+
+    :param today: date the digest is sent, today by default
+    :param days: int length of the period covered by the digest
+    :param base_url: string prepended to the links, the current site by default
+    :return: dict mapping community ids to string sections, in the order of the communities
+    """
+    today = today or datetime.date.today()
+    since = today - datetime.timedelta(days=days)
+    until = today + datetime.timedelta(days=days)
+    base_url = base_url if base_url is not None else get_base_url()
+
+    news = _group_by_community(News.objects.filter(
+        is_public=True, date_created__gt=since).order_by('date_created', 'pk'))
+    resources = _group_by_community(Resource.objects.filter(
+        is_public=True, date_created__gt=since).order_by('date_created', 'pk'))
+    pages = _group_by_community(CommunityPage.objects.filter(
+        date_created__gt=since).order_by('order'))
+    communities = list(Community.objects.select_related('location').order_by('order'))
+    meetups = _group_by_community(Meetup.objects.filter(
+        date__gte=today, date__lt=until,
+        meetup_location_id__in=set(community.location_id for community in communities)
+    ).order_by('date', 'time', 'pk'), field='meetup_location_id')
+
+    sections = {}
+    for community in communities:
+        context = {'community': community, 'base_url': base_url,
+                   'news': news.get(community.pk), 'resources': resources.get(community.pk),
+                   'pages': pages.get(community.pk),
+                   'meetups': meetups.get(community.location_id)}
+        if any(context[section] for section in ('news', 'resources', 'pages', 'meetups')):
+            sections[community.pk] = render_to_string('users/email/digest_community.txt',
+                                                      context)
+    return sections
+
+
+def iter_digest_recipients(community_ids, chunk_size=DIGEST_BATCH_SIZE):
+    """Stream the active members who did not opt out of the weekly digest, with a single query
+    over the community memberships fetched in chunks. Members without settings get the digest,
+    as it is enabled by default.
+
+    :param community_ids: iterable of int ids of the communities with a digest section
+    :param chunk_size: int number of memberships fetched at once
+    :return: iterator of tuples (username, name, email, list of community ids in community order)
+    """
+    memberships = Community.members.through.objects.filter(
+        community_id__in=community_ids, systersuser__user__is_active=True
+    ).exclude(systersuser__user__email='').exclude(
+        systersuser__usersetting__weekly_digest=False
+    ).order_by('systersuser_id', 'community__order').values_list(
+        'systersuser_id', 'community_id', 'systersuser__user__username',
+        'systersuser__user__first_name', 'systersuser__user__last_name',
+        'systersuser__user__email')
+    for user_id, rows in groupby(memberships.iterator(chunk_size=chunk_size), key=itemgetter(0)):
+        rows = list(rows)
+        _, _, username, first_name, last_name, email = rows[0]
+        name = "{0} {1}".format(first_name, last_name) if first_name and last_name else username
+        yield username, name, email, [community_id for _, community_id, *_ in rows]
+
+
+def send_weekly_digest(today=None, days=DIGEST_PERIOD_DAYS, batch_size=DIGEST_BATCH_SIZE,
+                       connection=None, dry_run=False, progress=None):
+    """Send the weekly digest to the members of the communities with new content. The messages
+    are assembled from the sections rendered once per community and handed to the email
+    backend in batches over a single connection. A batch the backend fails to send is logged
+    with its recipients and counted as failed, then the connection is reopened and the send
+    goes on with the next batch.
+
+    :param today: date the digest is sent, today by default
+    :param days: int length of the period covered by the digest
+    :param batch_size: int number of messages sent at once, also the number of memberships
+                       fetched at once
+    :param connection: email backend object, the backend delivering emails by default
+    :param dry_run: True to build the messages without sending them
+    :param progress: callable called with the number of messages handled after each batch
+    :return: dict with the number of communities with a section, of messages sent and failed
+             and the duration of the send in seconds
+    """
+    started = time.monotonic()
+    base_url = get_base_url()
+    sections = get_digest_sections(today, days, base_url)
+    # the digest is already sent in the background, it does not go through the outbox
+    connection = connection or get_delivery_connection()
+    sent = failed = 0
+    batch = []
+
+    def flush():
+        """Send the batch, return the numbers of sent and failed messages"""
+        if dry_run:
+            return len(batch), 0
+        try:
+            return connection.send_messages(batch) or 0, 0
+        except Exception as error:
+            logger.error("Failed to send the digest to %s: %s",
+                         ", ".join(message.to[0] for message in batch), error)
+        # the connection may have been lost with the batch, start a new one
+        try:
+            connection.close()
+            connection.open()
+        except Exception as error:
+            logger.warning("Failed to reopen the email connection: %s", error)
+        return 0, len(batch)
+
+    if sections and not dry_run:
+        connection.open()
+    try:
+        for username, name, email, community_ids in iter_digest_recipients(list(sections),
+                                                                           batch_size):
+            settings_url = base_url + reverse('edit_settings', kwargs={'username': username})
+            parts = [DIGEST_GREETING.format(name)]
+            parts.extend(sections[community_id] for community_id in community_ids)
+            parts.append(DIGEST_FOOTER.format(settings_url))
+            batch.append(EmailMessage(DIGEST_SUBJECT, "".join(parts), to=[email],
+                                      connection=connection))
+            if len(batch) >= batch_size:
+                batch_sent, batch_failed = flush()
+                sent, failed = sent + batch_sent, failed + batch_failed
+                batch = []
+                if progress is not None:
+                    progress(sent)
+        if batch:
+            batch_sent, batch_failed = flush()
+            sent, failed = sent + batch_sent, failed + batch_failed
+            if progress is not None:
+                progress(sent)
+    finally:
+        if sections and not dry_run:
+            connection.close()
+    return {'communities': len(sections), 'sent': sent, 'failed': failed,
+            'seconds': time.monotonic() - started}
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from users.constants import DIGEST_PERIOD_DAYS, DIGEST_BATCH_SIZE
+from users.digest import send_weekly_digest
+
+
+class Command(BaseCommand):
+    help = "Send the weekly digest of their communities to the members who subscribed to it"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=DIGEST_PERIOD_DAYS,
+                            help="number of days covered by the digest")
+        parser.add_argument('--batch-size', type=int, default=DIGEST_BATCH_SIZE,
+                            help="number of messages sent to the email backend at once")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="build the messages without sending them")
+
+    def progress(self, sent):
+        if self.verbosity > 1:
+            self.stdout.write("{0} digest(s) sent".format(sent))
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        report = send_weekly_digest(days=options['days'], batch_size=options['batch_size'],
+                                    dry_run=options['dry_run'], progress=self.progress)
+        rate = report['sent'] / report['seconds'] if report['seconds'] else 0
+        self.stdout.write(
+            "{verb} {sent} digest(s) for {communities} community(ies), {failed} failed, in "
+            "{seconds:.1f}s ({rate:.0f} messages/s)".format(
+                verb="Built" if options['dry_run'] else "Sent", rate=rate, **report))
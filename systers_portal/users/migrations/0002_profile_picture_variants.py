@@ -0,0 +1,19 @@
+# Generated by Django 3.0.8 on 2026-10-18 18:54
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='systersuser',
+            name='profile_picture_variants',
+            field=django.contrib.postgres.fields.jsonb.JSONField(blank=True, default=dict, editable=False, verbose_name='Profile picture variants'),
+        ),
+    ]
@@ -1,11 +1,10 @@
 from django.contrib.auth.models import User
+from django.contrib.postgres.fields import JSONField
 from django.urls import reverse
 from django.db import models
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from cities_light.models import Country
-from imagekit.models import ImageSpecField
-from imagekit.processors import ResizeToFill
 
 from community.utils import get_groups
 from membership.constants import (NO_PENDING_JOIN_REQUEST, OK, NOT_MEMBER,
@@ -24,13 +23,25 @@ class SystersUser(models.Model):
                                         blank=True,
                                         null=True,
                                         verbose_name="Profile picture")
-    profile_picture_thumbnail = ImageSpecField(source='profile_picture',
-                                               processors=[ResizeToFill(100, 100)],
-                                               options={'quality': 100})
+    # resized copies of the profile picture, see common.images
+    profile_picture_variants = JSONField(default=dict, blank=True, editable=False,
+                                         verbose_name="Profile picture variants")
+
+    # maintained by the task creating the picture variants, see common.images
+    IMAGE_VARIANT_FIELDS = ('profile_picture_variants',)
 
     def __str__(self):
         return str(self.user)
 
+    def save(self, *args, **kwargs):
+        """Override save to leave the picture variants out of the UPDATE of an existing user, so
+        that saving a user does not overwrite the variants created since it was loaded"""
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.IMAGE_VARIANT_FIELDS]
+        super(SystersUser, self).save(*args, **kwargs)
+
     def get_absolute_url(self):
         """Absolute URL to a SystersUser object"""
         return reverse('user', kwargs={'username': self.user.username})
@@ -49,14 +60,12 @@ class SystersUser(models.Model):
         """
         group.user_set.remove(self.user)
 
-    def leave_groups(self, community_name):
+    def leave_groups(self, community):
         """Leave all groups that are related to a community.
 
-        :param community: string name of Community
+        :param community: Community object
         """
-        groups = get_groups(community_name)
-        for group in groups:
-            self.leave_group(group)
+        self.user.groups.remove(*get_groups(community))
 
     def get_fields(self):
         """Get model fields of a SystersUser object
@@ -158,7 +167,7 @@ class SystersUser(models.Model):
             return NOT_MEMBER
         if self == community.admin:
             return IS_ADMIN
-        self.leave_groups(community.name)
+        self.leave_groups(community)
         community.remove_member(self)
         community.save()
         return OK
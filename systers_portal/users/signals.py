@@ -1,6 +1,8 @@
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
+from common.images import register_picture_field
+from users.constants import PROFILE_PICTURE_SIZES
 from users.models import SystersUser, UserSetting
 
 
@@ -8,3 +10,6 @@ from users.models import SystersUser, UserSetting
 def create_user_settings(sender, instance, created, **kwargs):
     if created:
         UserSetting.objects.create(user=instance)
+
+
+register_picture_field(SystersUser, 'profile_picture', PROFILE_PICTURE_SIZES, crop=True)
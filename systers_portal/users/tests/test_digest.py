@@ -0,0 +1,144 @@
+import datetime
+from io import StringIO
+
+from cities_light.models import Country, City
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+
+from blog.models import News, Resource
+from common.tests.test_mail import FailingEmailBackend
+from community.models import Community, CommunityPage
+from meetup.models import Meetup
+from users.digest import get_digest_sections, iter_digest_recipients, send_weekly_digest
+from users.models import SystersUser, UserSetting
+
+
+class WeeklyDigestTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='foo', password='foobar',
+                                             email='foo@example.com')
+        self.systers_user = SystersUser.objects.get(user=self.user)
+        country = Country.objects.create(name='Bar', continent='AS')
+        self.location = City.objects.create(name='Foo', display_name='Foo', country=country)
+        other_location = City.objects.create(name='Baz', display_name='Baz', country=country)
+        self.community = Community.objects.create(name="Foo", slug="foo", order=1,
+                                                  location=self.location,
+                                                  admin=self.systers_user)
+        self.other_community = Community.objects.create(name="Bar", slug="bar", order=2,
+                                                        location=other_location,
+                                                        admin=self.systers_user)
+        self.quiet_community = Community.objects.create(name="Quiet", slug="quiet", order=3,
+                                                        location=other_location,
+                                                        admin=self.systers_user)
+        News.objects.create(slug="foo-news", title="Foo News", author=self.systers_user,
+                            content="Hi", community=self.community)
+        News.objects.create(slug="private", title="Private News", author=self.systers_user,
+                            content="Hi", community=self.community, is_public=False)
+        Resource.objects.create(slug="bar-resource", title="Bar Resource",
+                                author=self.systers_user, content="Hi",
+                                community=self.other_community)
+        CommunityPage.objects.create(slug="bar-page", title="Bar Page", order=1,
+                                     author=self.systers_user, content="Hi",
+                                     community=self.other_community)
+        today = datetime.date.today()
+        Meetup.objects.create(title="Foo Meetup", slug="foo-meetup",
+                              date=today + datetime.timedelta(days=2),
+                              time=datetime.time(18, 0), description="Hi",
+                              meetup_location=self.location, created_by=self.systers_user,
+                              leader=self.systers_user)
+        Meetup.objects.create(title="Later Meetup", slug="later-meetup",
+                              date=today + datetime.timedelta(days=30),
+                              time=datetime.time(18, 0), description="Hi",
+                              meetup_location=self.location, created_by=self.systers_user,
+                              leader=self.systers_user)
+
+    def _create_member(self, username, *communities, **kwargs):
+        user = User.objects.create_user(username=username, password='foobar',
+                                        email=kwargs.pop('email', username + '@example.com'),
+                                        **kwargs)
+        systers_user = SystersUser.objects.get(user=user)
+        for community in communities:
+            community.add_member(systers_user)
+        return systers_user
+
+    def test_get_digest_sections(self):
+        """Test that a section is rendered for each community with new content"""
+        with self.assertNumQueries(5):
+            sections = get_digest_sections(base_url="http://example.com")
+        self.assertEqual(list(sections), [self.community.pk, self.other_community.pk])
+        section = sections[self.community.pk]
+        self.assertIn("== Foo ==", section)
+        self.assertIn("- Foo News: http://example.com/community/foo/news/foo-news/", section)
+        self.assertIn("Upcoming meetups in Foo:", section)
+        self.assertIn("Foo Meetup", section)
+        self.assertNotIn("Later Meetup", section)
+        self.assertNotIn("Private News", section)
+        section = sections[self.other_community.pk]
+        self.assertIn("- Bar Resource: http://example.com/community/bar/resources/bar-resource/",
+                      section)
+        self.assertIn("- Bar Page: http://example.com/community/bar/p/bar-page/", section)
+
+        future = datetime.date.today() + datetime.timedelta(days=60)
+        self.assertEqual(get_digest_sections(today=future, base_url=""), {})
+
+    def test_iter_digest_recipients(self):
+        """Test that opted-out, inactive and email-less members get no digest"""
+        self._create_member('both', self.community, self.other_community,
+                            first_name="Ada", last_name="Lovelace")
+        opted_out = self._create_member('opted-out', self.community)
+        UserSetting.objects.filter(user=opted_out).update(weekly_digest=False)
+        without_settings = self._create_member('no-settings', self.community)
+        UserSetting.objects.filter(user=without_settings).delete()
+        self._create_member('inactive', self.community, is_active=False)
+        self._create_member('no-email', self.community, email='')
+        self._create_member('quiet', self.quiet_community)
+
+        recipients = list(iter_digest_recipients(
+            [self.community.pk, self.other_community.pk], chunk_size=2))
+        self.assertEqual(sorted(recipients), [
+            ('both', 'Ada Lovelace', 'both@example.com',
+             [self.community.pk, self.other_community.pk]),
+            ('foo', 'foo', 'foo@example.com', [self.community.pk, self.other_community.pk]),
+            ('no-settings', 'no-settings', 'no-settings@example.com', [self.community.pk]),
+        ])
+
+    def test_send_weekly_digest(self):
+        """Test sending the digests in batches"""
+        for i in range(4):
+            self._create_member('member{0}'.format(i), self.other_community)
+        progress = []
+        report = send_weekly_digest(batch_size=2, progress=progress.append)
+        self.assertEqual(report['communities'], 2)
+        self.assertEqual(report['sent'], 5)
+        self.assertEqual(progress, [2, 4, 5])
+        self.assertEqual(len(mail.outbox), 5)
+        message = next(message for message in mail.outbox if message.to == ['foo@example.com'])
+        self.assertTrue(message.body.startswith("Hi foo,\n"))
+        self.assertLess(message.body.index("== Foo =="), message.body.index("== Bar =="))
+        self.assertIn("http://example.com/users/foo/settings/", message.body)
+        message = next(message for message in mail.outbox
+                       if message.to == ['member0@example.com'])
+        self.assertNotIn("== Foo ==", message.body)
+
+    def test_send_weekly_digest_failed_batch(self):
+        """Test that a batch the backend fails to send does not stop the send"""
+        self._create_member('a-fail', self.other_community, email='fail@example.com')
+        self._create_member('member', self.other_community)
+        with self.assertLogs('users.digest', level='ERROR') as logs:
+            report = send_weekly_digest(batch_size=1, connection=FailingEmailBackend())
+        self.assertEqual((report['sent'], report['failed']), (2, 1))
+        self.assertIn("fail@example.com", logs.output[0])
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox),
+                         ['foo@example.com', 'member@example.com'])
+
+    def test_send_weekly_digest_command(self):
+        """Test the management command sending the weekly digest"""
+        out = StringIO()
+        call_command('send_weekly_digest', '--dry-run', stdout=out)
+        self.assertIn("Built 1 digest(s) for 2 community(ies)", out.getvalue())
+        self.assertEqual(len(mail.outbox), 0)
+        call_command('send_weekly_digest', stdout=out)
+        self.assertIn("Sent 1 digest(s) for 2 community(ies), 0 failed", out.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
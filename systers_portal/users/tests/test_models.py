@@ -41,24 +41,29 @@ class SystersUserTestCase(TestCase):
 
     def test_leave_groups(self):
         """Test SystersUser leaving all Community groups"""
-        name = "Baz"
-        self.systers_user.leave_groups(name)
+        country = Country.objects.create(name='Bar', continent='AS')
+        location = City.objects.create(name='Foo', display_name='Foo',
+                                       country=country)
+        community = Community.objects.create(name="Baz", slug="baz", order=1,
+                                             location=location, admin=self.systers_user)
+        self.systers_user.leave_groups(community)
         self.assertSequenceEqual(self.systers_user.user.groups.all(), [])
-        create_groups(name, groups_templates)
         content_manager_group = Group.objects.get(name="Baz: Content Manager")
         self.systers_user.join_group(content_manager_group)
         self.assertSequenceEqual(self.systers_user.user.groups.all(),
                                  [content_manager_group])
-        self.systers_user.leave_groups(name)
+        self.systers_user.leave_groups(community)
         self.assertSequenceEqual(self.systers_user.user.groups.all(), [])
-        other_name = "Foo"
-        create_groups(other_name, groups_templates)
+        other_community = Community.objects.create(name="Foo", slug="foo", order=2,
+                                                   location=location,
+                                                   admin=self.systers_user)
+        self.systers_user.leave_groups(other_community)
         admin_group = Group.objects.get(name="Foo: Community Admin")
         self.systers_user.join_group(admin_group)
         self.systers_user.join_group(content_manager_group)
         self.assertCountEqual(list(self.systers_user.user.groups.all()),
                               [content_manager_group, admin_group])
-        self.systers_user.leave_groups(name)
+        self.systers_user.leave_groups(community)
         self.assertSequenceEqual(self.systers_user.user.groups.all(),
                                  [admin_group])
 
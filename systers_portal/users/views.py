@@ -5,6 +5,7 @@ from django.views.generic import TemplateView
 from django.views.generic.edit import UpdateView
 from braces.views import LoginRequiredMixin, MultiplePermissionsRequiredMixin
 
+from meetup.ical import get_calendar_token
 from membership.models import JoinRequest
 from users.forms import UserForm, EditUserSettings
 from users.models import SystersUser, UserSetting
@@ -21,6 +22,7 @@ class UserView(LoginRequiredMixin, TemplateView):
         * Community objects SystersUser is member of
         * SystersUser JoinRequest objects not (yet) approved
         * Group objects SystersUser is member of
+        * URL of the calendar of the meetups the user is coming to, on the user's own profile
         """
         context = super(UserView, self).get_context_data(**kwargs)
         username = context['username']
@@ -33,6 +35,9 @@ class UserView(LoginRequiredMixin, TemplateView):
                         'community_list': communities,
                         'join_requests': join_requests,
                         'permission_groups': permission_groups}
+        if systersuser.user == self.request.user:
+            context_dict['meetup_calendar_url'] = self.request.build_absolute_uri(reverse(
+                'user_meetup_calendar', kwargs={'token': get_calendar_token(self.request.user)}))
         for key, value in context_dict.items():
             context[key] = value
         return context